@@ -0,0 +1,160 @@
+"""Decode cost and memory of a review: typed model vs. the previous plain dicts.
+
+The baseline is the whole previous path: `_parse_ai_response` (json.loads
+and a required-keys check) followed by the .get() and len() reads the
+review service and comment renderer made. The candidate is
+decode_analysis followed by the same reads as attribute access.
+
+decode_analysis validates and coerces every finding, which the previous
+path did not do at all. That costs CPU: it is slower than the baseline,
+and the benchmark reports it as a regression. What it buys is less
+memory per review kept alive (cache, database rows) and values that are
+safe to use without checks.
+
+Run from the repository root:
+
+    python -m final_project.benchmarks.bench_review_model
+"""
+import gc
+import json
+import statistics
+import timeit
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from final_project.src.ai.models import REQUIRED_KEYS, decode_analysis
+
+FINDINGS = 25
+REVIEWS = 2000
+
+
+def sample_response(findings: int = FINDINGS) -> bytes:
+    """A review as models return it: mostly well-formed, every fifth finding needs coercion."""
+    return json.dumps({
+        "success": True,
+        "summary": "Refactors the session handling and adds retries to the HTTP client.",
+        "overall_quality_score": 78,
+        "critical_issues": [
+            {
+                "file": f"src/module_{i}.py",
+                "line": f"L{i * 7}-{i * 7 + 3}" if i % 5 == 0 else i * 7,
+                "issue": "Connection is not closed when the request fails",
+                "severity": "critical" if i % 5 == 0 else "high",
+                "suggestion": "Use a context manager",
+            }
+            for i in range(findings)
+        ],
+        "suggestions": [
+            {
+                "filename": f"src/module_{i}.py",
+                "line": i * 11,
+                "suggestion": "Extract the retry loop into a helper",
+                "type": "refactor",
+                "priority": "low",
+            }
+            for i in range(findings)
+        ],
+    }).encode("utf-8")
+
+
+def decode_dicts(raw: bytes) -> Dict[str, Any]:
+    """The previous `_parse_ai_response`: json.loads and a required-keys check.
+
+    Nothing was coerced; consumers read the raw values with .get().
+    """
+    data = json.loads(raw)
+    if not isinstance(data, dict):
+        raise ValueError("Invalid response format")
+    if not all(key in data for key in REQUIRED_KEYS):
+        raise ValueError("Missing required fields")
+    return data
+
+
+def use_dicts(raw: bytes) -> Tuple[Any, ...]:
+    """Decode as before, then read what the service and comment renderer read."""
+    data = decode_dicts(raw)
+    if not data.get("success", False):
+        return ()
+    critical_issues = data.get("critical_issues", [])
+    suggestions = data.get("suggestions", [])
+    return (
+        len(critical_issues),
+        len(suggestions),
+        data.get("overall_quality_score", 0),
+        data.get("summary", ""),
+        [(i.get("file"), i.get("line"), i.get("issue"), i.get("suggestion"))
+         for i in critical_issues[:5]],
+        [(s.get("file"), s.get("line"), s.get("suggestion")) for s in suggestions[:5]],
+    )
+
+
+def use_analysis(raw: bytes) -> Tuple[Any, ...]:
+    """decode_analysis, then the same reads on the typed result."""
+    analysis = decode_analysis(raw, required=REQUIRED_KEYS)
+    if not analysis.success:
+        return ()
+    return (
+        len(analysis.critical_issues),
+        len(analysis.suggestions),
+        analysis.overall_quality_score,
+        analysis.summary,
+        [(i.file, i.line, i.issue, i.suggestion) for i in analysis.critical_issues[:5]],
+        [(s.file, s.line, s.suggestion) for s in analysis.suggestions[:5]],
+    )
+
+
+def measure_time(
+        baseline: Callable[[bytes], Any],
+        candidate: Callable[[bytes], Any],
+        raw: bytes,
+        number: int = 100,
+        rounds: int = 50
+) -> Tuple[float, float, float]:
+    """Best microseconds per decode of each, and the median candidate/baseline ratio.
+
+    The two decoders alternate round by round, so the ratio holds up on a
+    noisy machine even when the absolute timings do not.
+    """
+    baseline_times, candidate_times, ratios = [], [], []
+    for _ in range(rounds):
+        base = timeit.timeit(lambda: baseline(raw), number=number)
+        cand = timeit.timeit(lambda: candidate(raw), number=number)
+        baseline_times.append(base / number * 1e6)
+        candidate_times.append(cand / number * 1e6)
+        ratios.append(cand / base)
+    return min(baseline_times), min(candidate_times), statistics.median(ratios)
+
+
+def measure_memory(decode: Callable[[bytes], Any], raw: bytes, reviews: int = REVIEWS) -> float:
+    """Bytes retained per decoded review while `reviews` of them are alive."""
+    gc.collect()
+    tracemalloc.start()
+    kept: List[Any] = [decode(raw) for _ in range(reviews)]
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return retained / reviews
+
+
+def main() -> None:
+    raw = sample_response()
+    assert use_analysis(raw)[:2] == use_dicts(raw)[:2]
+
+    dict_time, typed_time, ratio = measure_time(use_dicts, use_analysis, raw)
+    dict_memory = measure_memory(decode_dicts, raw)
+    typed_memory = measure_memory(decode_analysis, raw)
+
+    print(f"Review with {FINDINGS} critical issues and {FINDINGS} suggestions, {len(raw)} bytes")
+    print(f"{'':<32}{'decode + reads, us':>20}{'memory, bytes':>16}")
+    print(f"{'json.loads + dict reads (before)':<32}{dict_time:>20.1f}{dict_memory:>16.0f}")
+    print(f"{'decode_analysis + attributes':<32}{typed_time:>20.1f}{typed_memory:>16.0f}")
+    verdict = "CPU regression" if ratio > 1 else "CPU improvement"
+    print(
+        f"{verdict}: decode_analysis takes {ratio:.2f}x the time of the previous path "
+        f"({typed_time - dict_time:+.1f} us per review); "
+        f"it retains {typed_memory / dict_memory:.0%} of the memory"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Review worker pool: runs queued review jobs outside the web process.
+
+    python run_worker.py --processes 4 --concurrency 4
+
+Every process claims jobs from the `review_jobs` table on its own, so
+throughput grows with the number of processes until the AI endpoint or
+the GitHub rate limit is the bottleneck. Point all processes and the web
+app at the same database with DATABASE_URL (PostgreSQL for more than one
+machine, e.g. postgresql+asyncpg://...), and set REVIEW_WORKER_IN_PROCESS=false
+for the web app. Jobs for the same branch never run in two processes at
+once; the queue holds the later one back until the first has finished.
+
+SIGTERM or Ctrl+C stops claiming jobs and waits for running ones to
+finish (REVIEW_WORKER_DRAIN_TIMEOUT seconds), then exits.
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import signal
+
+from src.config import settings
+
+logger = logging.getLogger("run_worker")
+
+
+async def serve(index: int, concurrency: int) -> None:
+    from src.clients import client_pool
+    from src.github.webhook import JOB_HANDLERS
+    from src.review.queue import review_queue
+    from src.review.worker import ReviewWorker, default_worker_id
+
+    await client_pool.start(warm_up=settings.http_warm_up)
+    worker = ReviewWorker(
+        review_queue,
+        JOB_HANDLERS,
+        concurrency=concurrency,
+        worker_id=f"{default_worker_id()}:{index}",
+    )
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    worker.start()
+    await stop.wait()
+    logger.info(f"Worker {worker.worker_id} stopping")
+    await worker.stop()
+    await client_pool.close()
+
+
+async def prepare_database() -> None:
+    from src.database import engine, init_db
+
+    await init_db()
+    # Do not hand open connections to the forked workers.
+    await engine.dispose()
+
+
+def run_process(index: int, concurrency: int) -> None:
+    logging.basicConfig(
+        level=logging.DEBUG if settings.debug else logging.INFO,
+        format=f"%(asctime)s - worker {index} - %(name)s - %(levelname)s - %(message)s"
+    )
+    asyncio.run(serve(index, concurrency))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run review worker processes")
+    parser.add_argument("--processes", type=int, default=settings.review_worker_processes)
+    parser.add_argument("--concurrency", type=int, default=settings.review_worker_concurrency)
+    args = parser.parse_args()
+
+    asyncio.run(prepare_database())
+
+    processes = [
+        multiprocessing.Process(target=run_process, args=(index, args.concurrency))
+        for index in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+
+    def forward_sigterm(_signum, _frame):
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    # Ctrl+C already reaches every process in the group; SIGTERM is forwarded.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, forward_sigterm)
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+import fnmatch
+import posixpath
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..github.diff import estimate_tokens, split_diff, split_hunks
+
+LOCKFILES = {
+    "package-lock.json", "npm-shrinkwrap.json", "yarn.lock", "pnpm-lock.yaml",
+    "poetry.lock", "pipfile.lock", "pdm.lock", "uv.lock", "cargo.lock",
+    "composer.lock", "gemfile.lock", "go.sum", "packages.lock.json", "podfile.lock",
+}
+MINIFIED_SUFFIXES = (".min.js", ".min.css", ".min.mjs", ".js.map", ".css.map")
+# Hand-written code: a long line here is a SQL string, a regex or a constant,
+# not minified output, so only the hunk holding it is left out.
+SOURCE_SUFFIXES = (
+    ".py", ".pyi", ".go", ".java", ".kt", ".scala", ".rb", ".rs", ".c", ".h", ".cc",
+    ".cpp", ".hpp", ".cs", ".swift", ".php", ".ts", ".tsx", ".sql", ".sh",
+)
+GENERATED_SUFFIXES = (
+    "_pb2.py", "_pb2.pyi", "_pb2_grpc.py", ".pb.go", ".pb.cc", ".pb.h",
+    ".g.dart", ".freezed.dart", ".designer.cs", "_generated.go", ".generated.ts",
+)
+GENERATED_MARKERS = ("@generated", "do not edit", "autogenerated", "auto-generated")
+SNAPSHOT_SUFFIXES = (".snap", ".ambr")
+SNAPSHOT_DIRS = {"__snapshots__", "snapshots"}
+VENDORED_DIRS = {"vendor", "vendors", "third_party", "thirdparty", "node_modules", "bower_components"}
+TEST_DIRS = {"test", "tests", "testing", "spec", "__tests__"}
+DOC_SUFFIXES = (".md", ".rst", ".txt", ".adoc")
+RISKY_PATTERN = re.compile(
+    r"password|secret|token|auth|crypt|sql|exec|eval|subprocess|pickle|lock|thread|"
+    r"async|await|except|raise|permission|sanitize|escape",
+    re.IGNORECASE
+)
+MINIFIED_LINE_LENGTH = 500
+HUNK_NEW_START = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)")
+BINARY_HEADER = re.compile(r"^(?:Binary files .* differ|GIT binary patch)$", re.MULTILINE)
+
+
+class GitAttributes:
+    """The `linguist-generated` and `linguist-vendored` markers of a `.gitattributes` file.
+
+    Patterns follow gitattributes rules closely enough for path matching:
+    a pattern without a slash matches the basename at any depth, and the
+    last matching line wins. `-attr` and `attr=false` clear a marker, which
+    also overrides the built-in path heuristics.
+    """
+
+    MARKERS = {"linguist-generated": "generated", "linguist-vendored": "vendored"}
+
+    def __init__(self, text: str = ""):
+        self.rules: List[Tuple[str, Dict[str, bool]]] = []
+        for line in text.splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            pattern, *attrs = line.split()
+            markers: Dict[str, bool] = {}
+            for attr in attrs:
+                value = not attr.startswith(("-", "!"))
+                name = attr.lstrip("-!")
+                if "=" in name:
+                    name, raw = name.split("=", 1)
+                    value = raw.lower() not in ("false", "0")
+                if name in self.MARKERS:
+                    markers[self.MARKERS[name]] = value
+            if markers:
+                self.rules.append((pattern, markers))
+
+    def markers(self, path: str) -> Dict[str, bool]:
+        result: Dict[str, bool] = {}
+        for pattern, markers in self.rules:
+            if self._matches(pattern, path):
+                result.update(markers)
+        return result
+
+    @staticmethod
+    def _matches(pattern: str, path: str) -> bool:
+        if pattern.endswith("/"):
+            pattern += "**"
+        if "/" not in pattern:
+            return fnmatch.fnmatchcase(posixpath.basename(path), pattern)
+        pattern = pattern.lstrip("/")
+        if pattern.startswith("**/"):
+            return fnmatch.fnmatchcase(path, pattern[3:]) or fnmatch.fnmatchcase(path, pattern)
+        return fnmatch.fnmatchcase(path, pattern)
+
+
+@dataclass
+class OmittedFile:
+    filename: str
+    reason: str
+    tokens: int
+    partial: bool = False
+
+
+@dataclass
+class BudgetedDiff:
+    diff_text: str
+    files_changed: List[Dict[str, Any]]
+    omitted: List[OmittedFile] = field(default_factory=list)
+    tokens: int = 0
+
+    def omitted_summary(self) -> str:
+        """One line per omitted file, for the prompt."""
+        if not self.omitted:
+            return ""
+        lines = ["Omitted from this diff (not shown to you, do not review):"]
+        for item in self.omitted:
+            detail = "some hunks" if item.partial else "whole file"
+            lines.append(f"- {item.filename}: {item.reason}, {detail}, ~{item.tokens} tokens")
+        return "\n".join(lines) + "\n"
+
+
+def classify_file(
+        filename: str,
+        segment_text: str = "",
+        file_info: Optional[Dict[str, Any]] = None,
+        attributes: Optional[GitAttributes] = None
+) -> Optional[str]:
+    """Return why a file is not worth reviewing, or None when it is."""
+    markers = attributes.markers(filename) if attributes else {}
+    for marker in ("vendored", "generated"):
+        if markers.get(marker):
+            return marker
+
+    parts = filename.lower().split("/")
+    basename = parts[-1]
+    directories = set(parts[:-1])
+
+    if BINARY_HEADER.search(segment_text) or (
+            file_info and "patch" not in file_info and file_info.get("changes") == 0
+            and file_info.get("status") != "renamed"
+    ):
+        return "binary"
+    if basename in LOCKFILES:
+        return "lockfile"
+    if directories & VENDORED_DIRS and markers.get("vendored") is not False:
+        return "vendored"
+    if markers.get("generated") is not False:
+        if basename.endswith(GENERATED_SUFFIXES) or "generated" in directories:
+            return "generated"
+        if _has_generated_marker(segment_text):
+            return "generated"
+    if basename.endswith(SNAPSHOT_SUFFIXES) or directories & SNAPSHOT_DIRS:
+        return "snapshot"
+    if basename.endswith(MINIFIED_SUFFIXES):
+        return "minified"
+    if not is_source_file(basename) and _looks_minified(segment_text):
+        return "minified"
+    return None
+
+
+def is_source_file(filename: str) -> bool:
+    return filename.lower().endswith(SOURCE_SUFFIXES)
+
+
+def _has_generated_marker(segment_text: str) -> bool:
+    """A generated-code banner in the first lines of the file, not of any hunk."""
+    _, hunks = split_hunks(segment_text)
+    if not hunks:
+        return False
+    start = HUNK_NEW_START.match(hunks[0])
+    if start is None or int(start.group(1)) > 1:
+        return False
+    head = "\n".join(hunks[0].splitlines()[:6]).lower()
+    return any(marker in head for marker in GENERATED_MARKERS)
+
+
+def _looks_minified(segment_text: str) -> bool:
+    added = [line for line in segment_text.splitlines() if line.startswith("+")]
+    return bool(added) and max(len(line) for line in added) > MINIFIED_LINE_LENGTH
+
+
+def file_weight(filename: str) -> float:
+    parts = filename.lower().split("/")
+    if set(parts[:-1]) & TEST_DIRS or parts[-1].startswith("test_") or ".test." in parts[-1]:
+        return 0.7
+    if parts[-1].endswith(DOC_SUFFIXES):
+        return 0.3
+    return 1.0
+
+
+def hunk_value(filename: str, hunk: str) -> float:
+    """Review value per token of one hunk: added code counts most."""
+    added = removed = risky = 0
+    for line in hunk.splitlines()[1:]:
+        if line.startswith("+"):
+            added += 1
+            if RISKY_PATTERN.search(line):
+                risky += 1
+        elif line.startswith("-"):
+            removed += 1
+    value = (added + 0.3 * removed + 0.5 * risky) * file_weight(filename)
+    return value / max(estimate_tokens(hunk), 1)
+
+
+def apply_budget(
+        diff_text: str,
+        files_changed: List[Dict[str, Any]],
+        max_tokens: int,
+        attributes: Optional[GitAttributes] = None
+) -> BudgetedDiff:
+    """Drop low-value files, then fill `max_tokens` with the most valuable hunks.
+
+    Files are kept in diff order and each kept hunk keeps its file header, so
+    the result is still a valid diff. Everything left out is returned in
+    `omitted`, with the reason.
+    """
+    file_info = {f.get("filename"): f for f in files_changed}
+    omitted: List[OmittedFile] = []
+    candidates: List[Tuple[float, int, int]] = []
+    files: List[Tuple[str, str, List[str]]] = []
+
+    for segment in split_diff(diff_text):
+        reason = classify_file(
+            segment.filename, segment.text, file_info.get(segment.filename), attributes
+        )
+        if reason:
+            omitted.append(OmittedFile(segment.filename, reason, estimate_tokens(segment.text)))
+            continue
+        header, hunks = split_hunks(segment.text)
+        if is_source_file(segment.filename):
+            long_lines = [hunk for hunk in hunks if _looks_minified(hunk)]
+            if long_lines:
+                tokens = estimate_tokens("".join(long_lines))
+                if len(long_lines) == len(hunks):
+                    omitted.append(OmittedFile(segment.filename, "long lines", tokens))
+                    continue
+                omitted.append(OmittedFile(segment.filename, "long lines", tokens, partial=True))
+                hunks = [hunk for hunk in hunks if not _looks_minified(hunk)]
+        index = len(files)
+        files.append((segment.filename, header, hunks))
+        for position, hunk in enumerate(hunks):
+            candidates.append((hunk_value(segment.filename, hunk), index, position))
+
+    used = sum(estimate_tokens(header) for _, header, _ in files)
+    selected = set()
+    for _, index, position in sorted(candidates, key=lambda c: (-c[0], c[1], c[2])):
+        tokens = estimate_tokens(files[index][2][position])
+        if used + tokens <= max_tokens:
+            selected.add((index, position))
+            used += tokens
+
+    parts: List[str] = []
+    for index, (filename, header, hunks) in enumerate(files):
+        chosen = [hunk for position, hunk in enumerate(hunks) if (index, position) in selected]
+        dropped = [hunk for position, hunk in enumerate(hunks) if (index, position) not in selected]
+        if hunks and not chosen:
+            used -= estimate_tokens(header)
+            omitted.append(OmittedFile(
+                filename, "token budget", estimate_tokens(header + "".join(hunks))
+            ))
+            continue
+        if dropped:
+            omitted.append(OmittedFile(
+                filename, "token budget", estimate_tokens("".join(dropped)), partial=True
+            ))
+        parts.append(header + "".join(chosen))
+
+    dropped_files = {item.filename for item in omitted if not item.partial}
+    return BudgetedDiff(
+        diff_text="".join(parts),
+        files_changed=[f for f in files_changed if f.get("filename") not in dropped_files],
+        omitted=omitted,
+        tokens=used,
+    )
@@ -0,0 +1,175 @@
+import hashlib
+import logging
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+
+from ..config import settings
+from ..database import AsyncSessionLocal, ReviewCacheEntry
+from .models import ReviewAnalysis, decode_analysis, encode_analysis
+
+logger = logging.getLogger(__name__)
+
+HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+\d+(?:,\d+)? @@.*$")
+
+
+def normalize_diff(diff_text: str) -> str:
+    """Drop the parts of a diff that change without the code changing.
+
+    Blob SHAs (`index` lines), hunk line numbers and the function context
+    after `@@` differ between a rebase and the original push, and trailing
+    whitespace is noise.
+    """
+    lines = []
+    for line in diff_text.splitlines():
+        if line.startswith("index "):
+            continue
+        if HUNK_HEADER.match(line):
+            lines.append("@@")
+            continue
+        lines.append(line.rstrip())
+    return "\n".join(lines)
+
+
+def review_cache_key(diff_text: str, model: str, temperature: float, prompt_template: str) -> str:
+    parts = [
+        hashlib.sha256(normalize_diff(diff_text).encode("utf-8")).hexdigest(),
+        model,
+        repr(float(temperature)),
+        hashlib.sha256(prompt_template.encode("utf-8")).hexdigest(),
+    ]
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def file_findings_key(
+        filename: str,
+        patch: str,
+        model: str,
+        temperature: float,
+        prompt_template: str
+) -> str:
+    return "file:" + review_cache_key(
+        f"{filename}\n{patch}", model, temperature, prompt_template
+    )
+
+
+class ReviewCache:
+    """Two-tier cache of AI analyses keyed by `review_cache_key`.
+
+    Recent entries live in an in-memory LRU; with `persist` enabled every
+    entry is also stored in the `review_cache_entries` table, which is trimmed
+    to `db_max_entries` rows. Entries older than `ttl` seconds are misses.
+    """
+
+    def __init__(
+            self,
+            max_entries: Optional[int] = None,
+            ttl: Optional[float] = None,
+            persist: Optional[bool] = None,
+            db_max_entries: Optional[int] = None
+    ):
+        self.max_entries = max_entries or settings.ai_review_cache_max_entries
+        self.ttl = ttl or settings.ai_review_cache_ttl
+        self.persist = persist if persist is not None else settings.ai_review_cache_persist
+        self.db_max_entries = db_max_entries or settings.ai_review_cache_db_max_entries
+        self._entries: "OrderedDict[str, Tuple[float, ReviewAnalysis]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    async def get(self, key: str) -> Optional[ReviewAnalysis]:
+        analysis = self._get_memory(key)
+        if analysis is None and self.persist:
+            analysis = await self._load(key)
+
+        if analysis is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        logger.info(f"Review cache hit, hit ratio {self.hit_ratio:.0%}")
+        return analysis
+
+    async def set(self, key: str, analysis: ReviewAnalysis, model: str) -> None:
+        self._remember(key, analysis, time.time())
+        if self.persist:
+            await self._save(key, analysis, model)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hit_ratio, 3),
+        }
+
+    def _get_memory(self, key: str) -> Optional[ReviewAnalysis]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, analysis = entry
+        if time.time() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return analysis
+
+    def _remember(self, key: str, analysis: ReviewAnalysis, stored_at: float) -> None:
+        self._entries[key] = (stored_at, analysis)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _load(self, key: str) -> Optional[ReviewAnalysis]:
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(ReviewCacheEntry).where(ReviewCacheEntry.cache_key == key)
+                )
+                row = result.scalar_one_or_none()
+        except Exception as e:
+            logger.warning(f"Failed to load cached review: {e}")
+            return None
+
+        if row is None or datetime.utcnow() - row.created_at > timedelta(seconds=self.ttl):
+            return None
+        analysis = decode_analysis(row.analysis)
+        self._remember(key, analysis, row.created_at.timestamp())
+        return analysis
+
+    async def _save(self, key: str, analysis: ReviewAnalysis, model: str) -> None:
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(
+                    delete(ReviewCacheEntry).where(ReviewCacheEntry.cache_key == key)
+                )
+                session.add(ReviewCacheEntry(
+                    cache_key=key, model=model, analysis=encode_analysis(analysis)
+                ))
+                await session.flush()
+
+                count = (await session.execute(
+                    select(func.count()).select_from(ReviewCacheEntry)
+                )).scalar_one()
+                if count > self.db_max_entries:
+                    oldest = select(ReviewCacheEntry.id).order_by(
+                        ReviewCacheEntry.created_at, ReviewCacheEntry.id
+                    ).limit(count - self.db_max_entries)
+                    await session.execute(
+                        delete(ReviewCacheEntry).where(ReviewCacheEntry.id.in_(oldest))
+                    )
+                await session.commit()
+        except Exception as e:
+            logger.warning(f"Failed to persist cached review: {e}")
+
+
+review_cache = ReviewCache()
+file_findings_cache = ReviewCache()
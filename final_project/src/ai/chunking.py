@@ -0,0 +1,175 @@
+from typing import List, Optional, Tuple, TypeVar
+
+from ..github.diff import estimate_tokens, split_diff, split_hunks
+from .budget import OmittedFile
+from .models import ReviewAnalysis
+
+SEVERITY_RANK = {"high": 0, "medium": 1, "low": 2}
+
+Finding = TypeVar("Finding")
+
+
+def chunk_diff(diff_text: str, max_tokens: int) -> List[Tuple[str, List[str]]]:
+    """Split a diff into chunks of at most `max_tokens` along file and hunk boundaries.
+
+    Returns (chunk diff, filenames in the chunk) pairs. Whole files are packed
+    together while they fit; a file larger than the budget is split between
+    hunks, and every part repeats the file header so it stays a valid diff.
+    """
+    chunks: List[Tuple[str, List[str]]] = []
+    parts: List[str] = []
+    filenames: List[str] = []
+    used = 0
+
+    def flush() -> None:
+        nonlocal parts, filenames, used
+        if parts:
+            chunks.append(("".join(parts), filenames))
+        parts, filenames, used = [], [], 0
+
+    for segment in split_diff(diff_text):
+        for piece in _fit_segment(segment.text, max_tokens):
+            tokens = estimate_tokens(piece)
+            if used and used + tokens > max_tokens:
+                flush()
+            parts.append(piece)
+            if segment.filename not in filenames:
+                filenames.append(segment.filename)
+            used += tokens
+    flush()
+    return chunks
+
+
+def _fit_segment(segment_text: str, max_tokens: int) -> List[str]:
+    if estimate_tokens(segment_text) <= max_tokens:
+        return [segment_text]
+
+    header, hunks = split_hunks(segment_text)
+    budget = max(max_tokens - estimate_tokens(header), 1)
+    pieces: List[str] = []
+    current = ""
+    for hunk in hunks:
+        for part in _split_lines(hunk, budget):
+            if current and estimate_tokens(current + part) > budget:
+                pieces.append(header + current)
+                current = ""
+            current += part
+    if current or not pieces:
+        pieces.append(header + current)
+    return pieces
+
+
+def _split_lines(text: str, max_tokens: int) -> List[str]:
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+    parts: List[str] = []
+    current = ""
+    for line in text.splitlines(keepends=True):
+        if current and estimate_tokens(current + line) > max_tokens:
+            parts.append(current)
+            current = ""
+        current += line
+    if current:
+        parts.append(current)
+    return parts
+
+
+def merge_analyses(
+        analyses: List[ReviewAnalysis],
+        weights: List[int],
+        filenames: Optional[List[List[str]]] = None
+) -> ReviewAnalysis:
+    """Reduce per-chunk analyses into one result in the single-prompt format.
+
+    Findings are de-duplicated and ordered by severity, file and line, so the
+    merged result does not depend on the order in which chunks finished.
+    The review fails when most chunks failed; otherwise the files of failed
+    chunks (given `filenames`, the files of each chunk) are listed as not
+    reviewed, so the comment does not pass them off as clean.
+    """
+    succeeded = [
+        (analysis, weight) for analysis, weight in zip(analyses, weights)
+        if analysis.success
+    ]
+    failed = len(analyses) - len(succeeded)
+    if not succeeded or failed * 2 > len(analyses):
+        errors = "; ".join(dict.fromkeys(
+            a.error or "unknown error" for a in analyses if not a.success
+        ))
+        if succeeded:
+            errors = f"{failed} of {len(analyses)} chunks failed: {errors}"
+        return ReviewAnalysis.failure(errors or "No chunks analyzed")
+
+    critical_issues = _merge_findings(
+        [a.critical_issues for a, _ in succeeded], "severity", "issue"
+    )
+    suggestions = _merge_findings(
+        [a.suggestions for a, _ in succeeded], "priority", "suggestion"
+    )
+
+    total_weight = sum(weight for _, weight in succeeded) or 1
+    score = sum(
+        analysis.overall_quality_score * weight for analysis, weight in succeeded
+    ) / total_weight
+
+    return ReviewAnalysis(
+        summary=_merge_summaries([a.summary for a, _ in succeeded]),
+        critical_issues=critical_issues,
+        suggestions=suggestions,
+        overall_quality_score=round(score),
+        chunks=len(analyses),
+        failed_chunks=failed,
+        omitted_files=_unreviewed_files(analyses, filenames or []),
+        partial=any(a.partial for a, _ in succeeded),
+        stopped_early=any(a.stopped_early for a, _ in succeeded),
+        truncated_lists=sorted({name for a, _ in succeeded for name in a.truncated_lists}),
+    )
+
+
+def _merge_summaries(summaries: List[str]) -> str:
+    """One summary as is; several as a list, one item per part of the diff."""
+    distinct = list(dict.fromkeys(s.strip() for s in summaries if s.strip()))
+    if len(distinct) <= 1:
+        return "".join(distinct)
+    return f"Reviewed in {len(distinct)} parts:\n" + "\n".join(f"- {s}" for s in distinct)
+
+
+def _unreviewed_files(
+        analyses: List[ReviewAnalysis],
+        filenames: List[List[str]]
+) -> List[OmittedFile]:
+    reviewed = {
+        name for analysis, names in zip(analyses, filenames) if analysis.success for name in names
+    }
+    unreviewed: List[OmittedFile] = []
+    for analysis, names in zip(analyses, filenames):
+        if analysis.success:
+            continue
+        for name in names:
+            if all(item.filename != name for item in unreviewed):
+                unreviewed.append(OmittedFile(
+                    filename=name, reason="review failed", tokens=0, partial=name in reviewed
+                ))
+    return unreviewed
+
+
+def _merge_findings(
+        finding_lists: List[List[Finding]],
+        rank_field: str,
+        text_field: str
+) -> List[Finding]:
+    seen = set()
+    merged = []
+    for findings in finding_lists:
+        for finding in findings:
+            key = (finding.file, finding.line, getattr(finding, text_field))
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(finding)
+    return sorted(merged, key=lambda finding: (
+        SEVERITY_RANK.get(getattr(finding, rank_field), 3),
+        finding.file,
+        finding.line,
+        getattr(finding, text_field),
+    ))
@@ -1,113 +1,635 @@
+import asyncio
 import os
-import json
-from typing import Dict, Any, List
+import logging
+import time
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Union
+
+import httpx
 from openai import AsyncOpenAI
 from ..config import settings
+from ..github.diff import estimate_tokens, split_diff
+from ..http_client import create_http_client
+from .budget import GitAttributes, apply_budget
+from .cache import (
+    ReviewCache,
+    file_findings_cache,
+    file_findings_key,
+    review_cache,
+    review_cache_key,
+)
+from .chunking import chunk_diff, merge_analyses
+from .limiter import AdaptiveLimiter, ai_hedge_limiter, ai_limiter
+from .models import (
+    REQUIRED_KEYS,
+    CriticalIssue,
+    MissingFieldsError,
+    ReviewAnalysis,
+    Suggestion,
+    decode_analysis,
+    to_analysis,
+)
+from .routing import ModelRoute, ModelRouter, model_router
+from .streaming import FindingsStreamParser, salvage_review
+
+logger = logging.getLogger(__name__)
+
+CONTINUATION_PROMPT = (
+    "Your previous answer was cut off. Continue the JSON exactly where it stopped. "
+    "Output only the remaining characters, without repeating anything or adding code fences."
+)
+
+
+@lru_cache(maxsize=None)
+def load_prompt_template(name: str = "prompt_template.txt") -> str:
+    dir_path = os.path.dirname(os.path.abspath(__file__))
+    template_path = os.path.join(dir_path, name)
+    with open(template_path, "r", encoding="utf-8") as file:
+        return file.read()
+
+
+def _usage_count(usage: Any, name: str) -> int:
+    value = getattr(usage, name, 0) if usage is not None else 0
+    return value if isinstance(value, int) else 0
 
 
 class AIClient:
-    def __init__(self):
+    def __init__(
+            self,
+            http_client: Optional[httpx.AsyncClient] = None,
+            cache: Optional[ReviewCache] = None,
+            file_cache: Optional[ReviewCache] = None,
+            limiter: Optional[AdaptiveLimiter] = None,
+            router: Optional[ModelRouter] = None,
+            hedge_limiter: Optional[AdaptiveLimiter] = None
+    ):
+        self.base_url = settings.ai_base_url
+        self.http_client = http_client or create_http_client(timeout=600.0)
         self.client = AsyncOpenAI(
             api_key=settings.ai_api_key,
-            base_url=settings.ai_base_url,
+            base_url=self.base_url,
+            http_client=self.http_client,
         )
+        self.hedge_client: Optional[AsyncOpenAI] = None
+        if settings.ai_hedge_base_url:
+            self.hedge_client = AsyncOpenAI(
+                api_key=settings.ai_hedge_api_key or settings.ai_api_key,
+                base_url=settings.ai_hedge_base_url,
+                http_client=self.http_client,
+            )
+        self.hedge_min_samples = settings.ai_hedge_min_samples
+        self.limiter = limiter or ai_limiter
+        self.hedge_limiter = hedge_limiter or ai_hedge_limiter
+        self.router = router or model_router
+        self._route_clients: Dict[str, AsyncOpenAI] = {}
 
         self.model = settings.ai_model
         self.max_tokens = settings.ai_max_tokens
         self.temperature = settings.ai_temperature
-        self._prompt_template = self._load_prompt_template()
+        self.chunk_max_tokens = settings.ai_chunk_max_tokens
+        self.chunk_concurrency = settings.ai_chunk_concurrency
+        self.prompt_token_budget = settings.ai_prompt_token_budget
+        self.continuation_max_tokens = settings.ai_continuation_max_tokens
+        self.stream = settings.ai_stream
+        self.stream_max_findings = settings.ai_stream_max_findings
+        self._prompt_template = load_prompt_template()
+        self.review_cache = cache or review_cache
+        self.file_cache = file_cache or file_findings_cache
+
+    async def warm_up(self) -> None:
+        try:
+            await self.http_client.head(self.base_url)
+        except Exception as e:
+            logger.warning(f"AI endpoint connection warm-up failed: {e}")
 
-    def _load_prompt_template(self) -> str:
-        dir_path = os.path.dirname(os.path.abspath(__file__))
-        template_path = os.path.join(dir_path, "prompt_template.txt")
-        with open(template_path, "r", encoding="utf-8") as file:
-            return file.read()
+    async def close(self) -> None:
+        await self.client.close()
 
     async def analyze_code_diff(
             self,
             diff_text: str,
             pr_title: str,
             repo_name: str,
-            files_changed: List[Dict[str, Any]]
-    ) -> Dict[str, Any]:
-        prompt = self._build_review_prompt(diff_text, pr_title, repo_name, files_changed)
+            files_changed: List[Dict[str, Any]],
+            previous_review: str = "",
+            gitattributes: str = "",
+            summary_only: bool = False
+    ) -> ReviewAnalysis:
+        budgeted = apply_budget(
+            diff_text, files_changed, self.prompt_token_budget, GitAttributes(gitattributes)
+        )
+        omitted = budgeted.omitted
+        if omitted:
+            logger.info(
+                f"Token budget: sending ~{budgeted.tokens} tokens, "
+                f"omitting {len(omitted)} files or parts of files"
+            )
+        context = "\n\n".join(
+            part.strip() for part in (previous_review, budgeted.omitted_summary()) if part.strip()
+        )
+        if summary_only:
+            route = self.router.summary
+        else:
+            route = self.router.select(
+                estimate_tokens(budgeted.diff_text),
+                [f.get("filename", "") for f in budgeted.files_changed]
+            )
+        logger.info(f"Routing '{pr_title}' to {route.name} ({route.model}, max_tokens={route.max_tokens})")
+
+        cache_key = review_cache_key(
+            budgeted.diff_text, route.model, self.temperature,
+            load_prompt_template(route.prompt) + context
+        )
+        cached = await self.review_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        if budgeted.diff_text or not omitted:
+            analysis = await self._analyze_changed_files(
+                budgeted.diff_text, pr_title, repo_name, budgeted.files_changed, context, route
+            )
+        else:
+            analysis = ReviewAnalysis(
+                summary="Only generated, vendored or other low-value files changed."
+            )
+        if omitted:
+            analysis.omitted_files = omitted + analysis.omitted_files
+        analysis.summary_only = summary_only
+
+        if analysis.is_complete:
+            await self.review_cache.set(cache_key, analysis, route.model)
+        return analysis
+
+    async def _analyze_changed_files(
+            self,
+            diff_text: str,
+            pr_title: str,
+            repo_name: str,
+            files_changed: List[Dict[str, Any]],
+            context: str = "",
+            route: Optional[ModelRoute] = None
+    ) -> ReviewAnalysis:
+        """Review only files whose patch has no cached findings yet.
+
+        Findings are cached per file, keyed by the file's patch, so a
+        follow-up commit that touches one file sends only that file to the
+        model and reuses the stored findings for the others.
+        """
+        route = route or self.router.default
+        template = load_prompt_template(route.prompt)
+        segments = split_diff(diff_text)
+        patches = {segment.filename: segment.text for segment in segments}
+        patches.update({
+            f["filename"]: f["patch"] for f in files_changed
+            if f.get("filename") in patches and f.get("patch")
+        })
+        keys = {
+            filename: file_findings_key(
+                filename, patch, route.model, self.temperature, template
+            )
+            for filename, patch in patches.items()
+        }
+
+        cached: Dict[str, ReviewAnalysis] = {}
+        for filename, key in keys.items():
+            findings = await self.file_cache.get(key)
+            if findings is not None:
+                cached[filename] = findings
+
+        if cached:
+            logger.info(f"Reusing cached findings for {len(cached)} of {len(keys)} files")
+        changed_diff = "".join(s.text for s in segments if s.filename not in cached)
+        changed_files = [f for f in files_changed if f.get("filename") not in cached]
+
+        if cached and not changed_diff:
+            analysis = ReviewAnalysis(
+                summary=f"All {len(cached)} files were reviewed before; previous findings reused."
+            )
+        else:
+            analysis = await self._analyze_diff(
+                changed_diff or diff_text, pr_title, repo_name, changed_files, context, route
+            )
+            if analysis.is_complete:
+                for filename, key in keys.items():
+                    if filename not in cached:
+                        await self.file_cache.set(
+                            key, self._findings_for_file(analysis, filename), route.model
+                        )
+
+        if not cached or not analysis.success:
+            return analysis
+
+        previous_scores = [f.overall_quality_score for f in cached.values()]
+        previous = ReviewAnalysis(
+            critical_issues=[i for f in cached.values() for i in f.critical_issues],
+            suggestions=[s for f in cached.values() for s in f.suggestions],
+            overall_quality_score=round(sum(previous_scores) / len(previous_scores)),
+        )
+        changed_count = len(keys) - len(cached)
+        if changed_count == 0:
+            analysis.overall_quality_score = previous.overall_quality_score
+        merged = merge_analyses([analysis, previous], [changed_count, len(cached)])
+        merged.chunks = analysis.chunks
+        merged.failed_chunks = analysis.failed_chunks
+        merged.omitted_files = analysis.omitted_files
+        merged.cached_files = len(cached)
+        return merged
+
+    @staticmethod
+    def _findings_for_file(analysis: ReviewAnalysis, filename: str) -> ReviewAnalysis:
+        def belongs(finding: Union[CriticalIssue, Suggestion]) -> bool:
+            path = finding.file
+            return bool(path) and (path == filename or filename.endswith("/" + path.lstrip("/")))
+
+        return ReviewAnalysis(
+            critical_issues=[i for i in analysis.critical_issues if belongs(i)],
+            suggestions=[s for s in analysis.suggestions if belongs(s)],
+            overall_quality_score=analysis.overall_quality_score,
+        )
+
+    async def _analyze_diff(
+            self,
+            diff_text: str,
+            pr_title: str,
+            repo_name: str,
+            files_changed: List[Dict[str, Any]],
+            context: str = "",
+            route: Optional[ModelRoute] = None
+    ) -> ReviewAnalysis:
+        if estimate_tokens(diff_text) <= self.chunk_max_tokens:
+            return await self._analyze(
+                diff_text, pr_title, repo_name, files_changed, context, route
+            )
+        return await self._analyze_chunked(
+            diff_text, pr_title, repo_name, files_changed, context, route
+        )
+
+    async def _analyze_chunked(
+            self,
+            diff_text: str,
+            pr_title: str,
+            repo_name: str,
+            files_changed: List[Dict[str, Any]],
+            context: str = "",
+            route: Optional[ModelRoute] = None
+    ) -> ReviewAnalysis:
+        """Map-reduce review of a diff that does not fit into one prompt."""
+        chunks = chunk_diff(diff_text, self.chunk_max_tokens)
+        logger.info(f"Reviewing diff for '{pr_title}' in {len(chunks)} chunks")
+        semaphore = asyncio.Semaphore(self.chunk_concurrency)
+
+        async def analyze_chunk(chunk: str, filenames: List[str]) -> ReviewAnalysis:
+            chunk_files = [f for f in files_changed if f.get("filename") in filenames]
+            async with semaphore:
+                return await self._analyze(
+                    chunk, pr_title, repo_name, chunk_files, context, route
+                )
+
+        analyses = await asyncio.gather(*(
+            analyze_chunk(chunk, filenames) for chunk, filenames in chunks
+        ))
+        return merge_analyses(
+            list(analyses),
+            [estimate_tokens(chunk) for chunk, _ in chunks],
+            [filenames for _, filenames in chunks]
+        )
+
+    async def _analyze(
+            self,
+            diff_text: str,
+            pr_title: str,
+            repo_name: str,
+            files_changed: List[Dict[str, Any]],
+            context: str = "",
+            route: Optional[ModelRoute] = None
+    ) -> ReviewAnalysis:
+        route = route or self.router.default
+        prompt = self._build_review_prompt(
+            diff_text, pr_title, repo_name, files_changed, context, route
+        )
+        messages = [
+            {"role": "system", "content": "You are an expert code reviewer."},
+            {"role": "user", "content": prompt}
+        ]
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert code reviewer."},
-                    {"role": "user", "content": prompt}
-                ],
+            if self.stream:
+                return await self._analyze_streaming(messages, route)
+            response = await self._create_completion(
+                route,
+                model=route.model,
+                messages=messages,
                 temperature=self.temperature,
-                max_tokens=self.max_tokens,
+                max_tokens=route.max_tokens,
                 response_format={"type": "json_object"}
             )
-            content = response.choices[0].message.content
+            content = response.choices[0].message.content or ""
+            if response.choices[0].finish_reason == "length":
+                content = await self._continue_truncated(messages, content, route)
             return self._parse_ai_response(content)
         except Exception as e:
-            return self._create_error_response(str(e))
+            return ReviewAnalysis.failure(str(e))
+
+    async def _create_completion(self, route: ModelRoute, **kwargs) -> Any:
+        """Call the route's AI endpoint within the adaptive concurrency limit.
+
+        With a secondary endpoint configured, a call to the default endpoint
+        still running the route's p95 latency after it got its limiter slot
+        is duplicated there and the first answer wins. Hedges hold a slot of
+        `hedge_limiter` and are skipped when none is free.
+        """
+        acquired = asyncio.get_running_loop().create_future()
+        primary = asyncio.ensure_future(self._limited_completion(route, acquired, **kwargs))
+        delay = None
+        if self.hedge_client is not None and not route.base_url:
+            delay = self.router.p95(route, self.hedge_min_samples)
+        if delay is None:
+            return await primary
+
+        pending = {primary}
+        try:
+            await asyncio.wait({primary, acquired}, return_when=asyncio.FIRST_COMPLETED)
+            if not primary.done():
+                await asyncio.wait({primary}, timeout=delay)
+            if primary.done():
+                return primary.result()
+            if not self.hedge_limiter.has_capacity():
+                self.limiter.hedges_skipped += 1
+                return await primary
+
+            self.limiter.hedges_sent += 1
+            logger.info(f"AI call exceeded p95 latency of {delay:.1f}s, sending hedged request")
+            hedge = asyncio.ensure_future(self._hedged_completion(**kwargs))
+            pending = {primary, hedge}
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.limiter.hedges_won += 1
+                        return task.result()
+                if not pending:
+                    raise done.pop().exception()
+                logger.warning(f"AI call failed, waiting for the other one: {done.pop().exception()}")
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _limited_completion(
+            self,
+            route: ModelRoute,
+            acquired: Optional["asyncio.Future[None]"] = None,
+            **kwargs
+    ) -> Any:
+        async with self.limiter.slot():
+            if acquired is not None and not acquired.done():
+                acquired.set_result(None)
+            started = time.perf_counter()
+            try:
+                response = await self._client_for(route).chat.completions.create(**kwargs)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.router.record(route, time.perf_counter() - started, success=False)
+                raise
+        usage = getattr(response, "usage", None)
+        self.router.record(
+            route,
+            time.perf_counter() - started,
+            input_tokens=_usage_count(usage, "prompt_tokens"),
+            output_tokens=_usage_count(usage, "completion_tokens"),
+        )
+        return response
+
+    async def _hedged_completion(self, **kwargs) -> Any:
+        async with self.hedge_limiter.slot():
+            return await self.hedge_client.chat.completions.create(**kwargs)
+
+    def _client_for(self, route: ModelRoute) -> AsyncOpenAI:
+        if not route.base_url:
+            return self.client
+        client = self._route_clients.get(route.base_url)
+        if client is None:
+            client = AsyncOpenAI(
+                api_key=route.api_key or settings.ai_api_key,
+                base_url=route.base_url,
+                http_client=self.http_client,
+            )
+            self._route_clients[route.base_url] = client
+        return client
+
+    async def _continue_truncated(
+            self,
+            messages: List[Dict[str, str]],
+            partial: str,
+            route: ModelRoute
+    ) -> str:
+        """Ask for just the missing tail of a completion that hit max_tokens."""
+        if self.continuation_max_tokens <= 0:
+            return partial
+        logger.warning(
+            f"AI response stopped at max_tokens after {len(partial)} chars, "
+            f"requesting the rest"
+        )
+        try:
+            response = await self._create_completion(
+                route,
+                model=route.model,
+                messages=messages + [
+                    {"role": "assistant", "content": partial},
+                    {"role": "user", "content": CONTINUATION_PROMPT}
+                ],
+                temperature=self.temperature,
+                max_tokens=self.continuation_max_tokens
+            )
+        except Exception as e:
+            logger.warning(f"Continuation request failed: {e}")
+            return partial
+        return partial + (response.choices[0].message.content or "")
+
+    async def _analyze_streaming(
+            self,
+            messages: List[Dict[str, str]],
+            route: ModelRoute
+    ) -> ReviewAnalysis:
+        """Stream the completion and collect findings as they complete.
+
+        Stops reading once each findings list is closed or already holds
+        `stream_max_findings` items, since the comment renders no more than that.
+        Lists cut off that way are named in `truncated_lists`: their length is
+        only a lower bound on what the model found, so the result is not
+        cached. Reading only stops while a list is still open and once the
+        other required fields have arrived.
+        The limiter slot is held until the stream ends; streams are not hedged.
+        """
+        started = time.perf_counter()
+        timings: Dict[str, float] = {}
+        parser = FindingsStreamParser()
+        stopped_early = False
+        finish_reason = None
+
+        async with self.limiter.slot():
+            stream = await self._client_for(route).chat.completions.create(
+                model=route.model,
+                messages=messages,
+                temperature=self.temperature,
+                max_tokens=route.max_tokens,
+                response_format={"type": "json_object"},
+                stream=True
+            )
+            try:
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    finish_reason = chunk.choices[0].finish_reason or finish_reason
+                    delta = chunk.choices[0].delta.content
+                    if not delta:
+                        continue
+                    if "time_to_first_token" not in timings:
+                        timings["time_to_first_token"] = time.perf_counter() - started
+                    if parser.feed(delta) and "time_to_first_finding" not in timings:
+                        timings["time_to_first_finding"] = time.perf_counter() - started
+                    if parser.closed:
+                        break
+                    if (
+                            self.stream_max_findings > 0
+                            and parser.open_lists()
+                            and parser.lists_done(self.stream_max_findings)
+                            and parser.has_fields(REQUIRED_KEYS)
+                    ):
+                        stopped_early = True
+                        break
+            finally:
+                await stream.close()
+
+        timings["total"] = time.perf_counter() - started
+        self.router.record(
+            route,
+            timings["total"],
+            input_tokens=estimate_tokens(messages[-1]["content"]),
+            output_tokens=estimate_tokens(parser.text),
+        )
+        logger.info(
+            f"Streamed review: first token after {timings.get('time_to_first_token', 0):.2f}s, "
+            f"first finding after {timings.get('time_to_first_finding', 0):.2f}s, "
+            f"{parser.findings_count} findings in {timings['total']:.2f}s"
+            + (" (stopped early)" if stopped_early else "")
+        )
+
+        if stopped_early:
+            analysis = to_analysis(parser.result())
+            analysis.stopped_early = True
+            analysis.truncated_lists = parser.open_lists()
+        else:
+            text = parser.text
+            if finish_reason == "length":
+                text = await self._continue_truncated(messages, text, route)
+            analysis = self._parse_ai_response(text)
+        analysis.stream_timings = timings
+        return analysis
 
     def _build_review_prompt(
             self,
             diff_text: str,
             pr_title: str,
             repo_name: str,
-            files_changed: List[Dict[str, Any]]
+            files_changed: List[Dict[str, Any]],
+            context: str = "",
+            route: Optional[ModelRoute] = None
     ) -> str:
         file_list = "\n".join([f"- {f.get('filename', 'unknown')}: {f.get('changes', 0)} changes"
                                for f in files_changed])
-        return self._prompt_template.format(
+        template = load_prompt_template(route.prompt) if route else self._prompt_template
+        return template.format(
             repository=repo_name,
             pr_title=pr_title,
             files_count=len(files_changed),
             file_list=file_list,
+            context=context,
             diff_text=diff_text
         )
 
-    def _parse_ai_response(self, response_text: str) -> Dict[str, Any]:
+    def _parse_ai_response(self, response_text: str) -> ReviewAnalysis:
         try:
-            data = json.loads(response_text)
-            if not isinstance(data, dict):
-                return self._create_error_response("Invalid response format")
-            required_keys = ["success", "summary", "critical_issues", "suggestions"]
-            if not all(key in data for key in required_keys):
-                return self._create_error_response("Missing required fields in response")
-            data["success"] = True
-            return data
-        except json.JSONDecodeError:
-            return self._create_error_response("Failed to parse JSON response")
-
-    def _create_error_response(self, error_msg: str) -> Dict[str, Any]:
-        return {
-            "success": False,
-            "error": error_msg,
-            "critical_issues": [],
-            "suggestions": [],
-            "summary": "Analysis failed"
-        }
+            analysis = decode_analysis(response_text, required=REQUIRED_KEYS)
+        except MissingFieldsError:
+            return ReviewAnalysis.failure("Missing required fields in response")
+        except ValueError:
+            return self._salvage_response(response_text)
+        analysis.success = True
+        return analysis
 
-    async def generate_comment_text(self, analysis: Dict[str, Any]) -> str:
-        if not analysis.get("success", False):
+    def _salvage_response(self, response_text: str) -> ReviewAnalysis:
+        data = salvage_review(response_text)
+        analysis = to_analysis(data) if data is not None else None
+        if analysis is None or analysis.is_empty:
+            return ReviewAnalysis.failure("Failed to parse JSON response")
+        analysis.success = True
+        if analysis.partial:
+            logger.warning(
+                f"Salvaged {len(analysis.critical_issues) + len(analysis.suggestions)} "
+                f"findings from an incomplete AI response"
+            )
+        return analysis
+
+    async def generate_comment_text(self, analysis: ReviewAnalysis) -> str:
+        analysis = to_analysis(analysis)
+        if not analysis.success:
             return "❌ Failed to analyze code changes."
-        critical_count = len(analysis.get("critical_issues", []))
-        suggestions_count = len(analysis.get("suggestions", []))
-        score = analysis.get("overall_quality_score", 0)
+        critical_count = len(analysis.critical_issues)
+        suggestions_count = len(analysis.suggestions)
+        truncated = analysis.truncated_lists
+        score = analysis.overall_quality_score
         comment = "## 🤖 AI Code Review\n\n"
-        comment += f"**Summary:** {analysis.get('summary', 'No summary provided')}\n\n"
+        incremental = analysis.incremental
+        if incremental:
+            comment = "## 🤖 AI Code Review (update)\n\n"
+            comment += (
+                f"Changes since the previous review: "
+                f"`{incremental['base'][:7]}..{incremental['head'][:7]}`\n\n"
+            )
+        comment += f"**Summary:** {analysis.summary or 'No summary provided'}\n\n"
+        if analysis.summary_only:
+            comment += (
+                "> ℹ️ The reviewer is under heavy load, so this is a summary-only review. "
+                "Push a new commit later for a full review.\n\n"
+            )
+        if analysis.partial:
+            comment += "> ⚠️ The model's answer was cut off; this review may be incomplete.\n\n"
+        if analysis.failed_chunks:
+            comment += (
+                f"> ⚠️ {analysis.failed_chunks} of {analysis.chunks} parts of the diff "
+                f"could not be reviewed; their files are listed under *Not reviewed*.\n\n"
+            )
+        if truncated:
+            comment += (
+                "> ℹ️ Reading stopped once enough findings were collected; "
+                "counts marked + are lower bounds.\n\n"
+            )
         comment += f"**Quality Score:** {score}/100\n\n"
         if critical_count > 0:
-            comment += f"### ⚠️ Critical Issues ({critical_count})\n"
-            for issue in analysis.get("critical_issues", [])[:5]:
-                comment += f"- **{issue.get('file')}:{issue.get('line')}** - {issue.get('issue')}\n"
-                if issue.get('suggestion'):
-                    comment += f"  *Suggestion:* {issue.get('suggestion')}\n"
+            more = "+" if "critical_issues" in truncated else ""
+            comment += f"### ⚠️ Critical Issues ({critical_count}{more})\n"
+            for issue in analysis.critical_issues[:5]:
+                comment += f"- **{issue.file}:{issue.line}** - {issue.issue}\n"
+                if issue.suggestion:
+                    comment += f"  *Suggestion:* {issue.suggestion}\n"
             comment += "\n"
         if suggestions_count > 0:
-            comment += f"### 💡 Suggestions ({suggestions_count})\n"
-            for suggestion in analysis.get("suggestions", [])[:5]:
-                comment += f"- **{suggestion.get('file')}:{suggestion.get('line')}** - {suggestion.get('suggestion')}\n"
+            more = "+" if "suggestions" in truncated else ""
+            comment += f"### 💡 Suggestions ({suggestions_count}{more})\n"
+            for suggestion in analysis.suggestions[:5]:
+                comment += f"- **{suggestion.file}:{suggestion.line}** - {suggestion.suggestion}\n"
             comment += "\n"
         if critical_count == 0 and suggestions_count == 0:
             comment += "✅ No issues found. Code looks good!\n"
+        omitted = analysis.omitted_files
+        if omitted:
+            comment += f"\n<details><summary>⏭️ Not reviewed ({len(omitted)})</summary>\n\n"
+            for item in omitted[:20]:
+                detail = "some hunks" if item.partial else "whole file"
+                comment += f"- `{item.filename}` - {item.reason} ({detail})\n"
+            if len(omitted) > 20:
+                comment += f"- ...and {len(omitted) - 20} more\n"
+            comment += "\n</details>\n\n"
         comment += "*This review was generated by AI. Please verify critical issues manually.*"
         return comment
\ No newline at end of file
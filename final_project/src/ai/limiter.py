@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+import httpx
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+OVERLOAD_STATUS_CODES = {429, 500, 502, 503, 504, 529}
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """True for errors that mean the AI endpoint is overloaded, not that the request is bad."""
+    if isinstance(error, (asyncio.TimeoutError, httpx.TimeoutException)):
+        return True
+    if type(error).__name__ == "APITimeoutError":
+        return True
+    return getattr(error, "status_code", None) in OVERLOAD_STATUS_CODES
+
+
+class AdaptiveLimiter:
+    """AIMD limit on concurrent calls to the AI endpoint.
+
+    Every call that finishes within `latency_target` without an overload
+    error raises the limit by 1/limit, so about one slot per round of
+    calls. A 429, a 5xx, a timeout or a slow call multiplies the limit by
+    `backoff`, at most once per round: only calls started after the last
+    decrease can trigger the next one. Recent latencies are kept to compute
+    the p95 that hedged requests wait for.
+    """
+
+    def __init__(
+            self,
+            initial_limit: float = 4,
+            min_limit: float = 1,
+            max_limit: float = 32,
+            latency_target: float = 60.0,
+            backoff: float = 0.5,
+            window: int = 200
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.in_flight = 0
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.successes = 0
+        self.overloads = 0
+        self.decreases = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self.hedges_skipped = 0
+        self._last_decrease = 0.0
+        self._waiters: List[asyncio.Future] = []
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one concurrency slot for the duration of a call."""
+        while self.in_flight >= max(1, math.floor(self.limit)):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.in_flight += 1
+
+        started = time.monotonic()
+        outcome = "ok"
+        try:
+            yield
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        except BaseException as e:
+            outcome = "overload" if is_overload_error(e) else "error"
+            raise
+        finally:
+            if outcome in ("ok", "overload"):
+                self._record(started, time.monotonic() - started, outcome == "overload")
+            self.in_flight -= 1
+            waiters, self._waiters = self._waiters, []
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+
+    def _record(self, started: float, latency: float, overloaded: bool) -> None:
+        if overloaded:
+            self.overloads += 1
+        else:
+            self.successes += 1
+            self.latencies.append(latency)
+
+        if overloaded or latency > self.latency_target:
+            if started >= self._last_decrease:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = time.monotonic()
+                self.decreases += 1
+                logger.warning(
+                    f"AI endpoint {'overloaded' if overloaded else 'slow'} "
+                    f"({latency:.1f}s), concurrency limit lowered to {self.limit:.1f}"
+                )
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def has_capacity(self) -> bool:
+        """True when a slot is free right now."""
+        return not self._waiters and self.in_flight < max(1, math.floor(self.limit))
+
+    @property
+    def waiting(self) -> int:
+        """Calls queued for a slot."""
+        return len(self._waiters)
+
+    def p95(self, min_samples: int = 20) -> Optional[float]:
+        if len(self.latencies) < min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "successes": self.successes,
+            "overloads": self.overloads,
+            "decreases": self.decreases,
+            "p95_latency": self.p95(min_samples=1),
+            "hedges_sent": self.hedges_sent,
+            "hedges_won": self.hedges_won,
+            "hedges_skipped": self.hedges_skipped,
+        }
+
+
+ai_limiter = AdaptiveLimiter(
+    initial_limit=settings.ai_concurrency_initial,
+    min_limit=settings.ai_concurrency_min,
+    max_limit=settings.ai_concurrency_max,
+    latency_target=settings.ai_latency_target,
+)
+
+# Hedged requests go to the secondary endpoint and get a small budget of
+# their own, so they never add load beyond what `ai_limiter` allows.
+ai_hedge_limiter = AdaptiveLimiter(
+    initial_limit=settings.ai_hedge_max_in_flight,
+    min_limit=1,
+    max_limit=settings.ai_hedge_max_in_flight,
+    latency_target=settings.ai_latency_target,
+)
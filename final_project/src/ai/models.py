@@ -0,0 +1,256 @@
+import json
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from .budget import OmittedFile
+
+SEVERITIES = frozenset(("high", "medium", "low"))
+SEVERITY_ALIASES = {
+    "critical": "high", "blocker": "high", "major": "high", "error": "high",
+    "moderate": "medium", "warning": "medium", "normal": "medium",
+    "minor": "low", "info": "low", "trivial": "low", "nit": "low",
+}
+MAX_LINE = 10_000_000
+REQUIRED_KEYS = ("success", "summary", "critical_issues", "suggestions")
+LEADING_NUMBER = re.compile(r"-?\d+")
+
+
+class MissingFieldsError(ValueError):
+    """A JSON review object lacks keys that every complete review has."""
+
+
+def _coerce_text(value: Any) -> str:
+    if value is None:
+        return ""
+    return value if isinstance(value, str) else str(value)
+
+
+def _coerce_line(value: Any) -> int:
+    """Line numbers as the model writes them: 42, "42", "L42", "42-45", [42, 45]."""
+    if isinstance(value, list):
+        value = value[0] if value else 0
+    if isinstance(value, bool) or value is None:
+        return 0
+    if isinstance(value, (int, float)):
+        number = int(value)
+    else:
+        match = LEADING_NUMBER.search(str(value))
+        number = int(match.group()) if match else 0
+    return min(max(number, 0), MAX_LINE)
+
+
+def _coerce_severity(value: Any) -> str:
+    text = _coerce_text(value).strip().lower()
+    text = SEVERITY_ALIASES.get(text, text)
+    return text if text in SEVERITIES else "medium"
+
+
+def _coerce_score(value: Any) -> int:
+    if isinstance(value, str):
+        match = LEADING_NUMBER.search(value)
+        value = int(match.group()) if match else 0
+    try:
+        return min(max(int(value), 0), 100)
+    except (TypeError, ValueError):
+        return 0
+
+
+@dataclass(slots=True)
+class CriticalIssue:
+    file: str = ""
+    line: int = 0
+    issue: str = ""
+    severity: str = "medium"
+    suggestion: str = ""
+
+
+@dataclass(slots=True)
+class Suggestion:
+    file: str = ""
+    line: int = 0
+    suggestion: str = ""
+    kind: str = ""
+    priority: str = "medium"
+
+
+@dataclass(slots=True)
+class ReviewAnalysis:
+    """Typed result of an AI review.
+
+    Decoded and validated from the model's response by
+    `decode_analysis`. Unknown keys are dropped; line numbers, severities
+    and the score are coerced and clamped instead of rejected.
+    """
+
+    success: bool = True
+    summary: str = ""
+    overall_quality_score: int = 0
+    critical_issues: List[CriticalIssue] = field(default_factory=list)
+    suggestions: List[Suggestion] = field(default_factory=list)
+    error: str = ""
+    partial: bool = False
+    stopped_early: bool = False
+    truncated_lists: List[str] = field(default_factory=list)
+    chunks: int = 1
+    failed_chunks: int = 0
+    cached_files: int = 0
+    omitted_files: List[OmittedFile] = field(default_factory=list)
+    incremental: Optional[Dict[str, str]] = None
+    stream_timings: Dict[str, float] = field(default_factory=dict)
+    summary_only: bool = False
+    mock: bool = False
+
+    @classmethod
+    def failure(cls, error: str) -> "ReviewAnalysis":
+        return cls(success=False, error=error, summary="Analysis failed")
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.summary or self.critical_issues or self.suggestions)
+
+    @property
+    def is_complete(self) -> bool:
+        """The whole diff was reviewed and every finding was read, so it may be cached."""
+        return self.success and not (
+            self.partial or self.failed_chunks or self.stopped_early or self.truncated_lists
+        )
+
+
+def _critical_issue(data: Dict[str, Any]) -> CriticalIssue:
+    # Well-formed values skip the coercion calls; this runs once per finding.
+    get = data.get
+    path = get("file") or get("filename") or get("path") or ""
+    line = get("line", 0)
+    issue = get("issue", "")
+    severity = get("severity", "medium")
+    suggestion = get("suggestion", "")
+    if type(path) is not str:
+        path = _coerce_text(path)
+    if type(line) is not int or not 0 <= line <= MAX_LINE:
+        line = _coerce_line(line)
+    if type(issue) is not str:
+        issue = _coerce_text(issue)
+    if severity not in SEVERITIES:
+        severity = _coerce_severity(severity)
+    if type(suggestion) is not str:
+        suggestion = _coerce_text(suggestion)
+    return CriticalIssue(path, line, issue, severity, suggestion)
+
+
+def _suggestion(data: Dict[str, Any]) -> Suggestion:
+    get = data.get
+    path = get("file") or get("filename") or get("path") or ""
+    line = get("line", 0)
+    suggestion = get("suggestion", "")
+    kind = get("type") or get("kind") or ""
+    priority = get("priority", "medium")
+    if type(path) is not str:
+        path = _coerce_text(path)
+    if type(line) is not int or not 0 <= line <= MAX_LINE:
+        line = _coerce_line(line)
+    if type(suggestion) is not str:
+        suggestion = _coerce_text(suggestion)
+    if type(kind) is not str:
+        kind = _coerce_text(kind)
+    if priority not in SEVERITIES:
+        priority = _coerce_severity(priority)
+    return Suggestion(path, line, suggestion, kind, priority)
+
+
+def _critical_issues(value: Any) -> List[CriticalIssue]:
+    if not isinstance(value, list):
+        return []
+    issues = []
+    for item in value:
+        if isinstance(item, CriticalIssue):
+            issues.append(item)
+        elif isinstance(item, Suggestion):
+            issues.append(CriticalIssue(
+                item.file, item.line, "", item.priority, item.suggestion
+            ))
+        elif isinstance(item, dict):
+            issues.append(_critical_issue(item))
+    return issues
+
+
+def _suggestions(value: Any) -> List[Suggestion]:
+    if not isinstance(value, list):
+        return []
+    suggestions = []
+    for item in value:
+        if isinstance(item, Suggestion):
+            suggestions.append(item)
+        elif isinstance(item, CriticalIssue):
+            suggestions.append(Suggestion(
+                item.file, item.line, item.suggestion or item.issue, "", item.severity
+            ))
+        elif isinstance(item, dict):
+            suggestions.append(_suggestion(item))
+    return suggestions
+
+
+def _omitted_files(value: Any) -> List[OmittedFile]:
+    if not isinstance(value, list):
+        return []
+    return [
+        item if isinstance(item, OmittedFile) else OmittedFile(
+            filename=_coerce_text(item.get("filename")),
+            reason=_coerce_text(item.get("reason")),
+            tokens=_coerce_line(item.get("tokens")),
+            partial=bool(item.get("partial", False)),
+        )
+        for item in value if isinstance(item, (OmittedFile, dict))
+    ]
+
+
+def _analysis(data: Dict[str, Any]) -> ReviewAnalysis:
+    get = data.get
+    incremental = get("incremental")
+    timings = get("stream_timings")
+    truncated = get("truncated_lists")
+    return ReviewAnalysis(
+        success=bool(get("success", True)),
+        summary=_coerce_text(get("summary")),
+        overall_quality_score=_coerce_score(get("overall_quality_score", 0)),
+        critical_issues=_critical_issues(get("critical_issues")),
+        suggestions=_suggestions(get("suggestions")),
+        error=_coerce_text(get("error")),
+        partial=bool(get("partial", False)),
+        stopped_early=bool(get("stopped_early", False)),
+        truncated_lists=[str(name) for name in truncated] if isinstance(truncated, list) else [],
+        chunks=_coerce_line(get("chunks", 1)),
+        failed_chunks=_coerce_line(get("failed_chunks", 0)),
+        cached_files=_coerce_line(get("cached_files", 0)),
+        omitted_files=_omitted_files(get("omitted_files")),
+        incremental=incremental if isinstance(incremental, dict) else None,
+        stream_timings=timings if isinstance(timings, dict) else {},
+        summary_only=bool(get("summary_only", False)),
+        mock=bool(get("mock", False)),
+    )
+
+
+def decode_analysis(data: Union[str, bytes], required: Sequence[str] = ()) -> ReviewAnalysis:
+    """Parse and validate a JSON review.
+
+    Raises ValueError when it is not a JSON object, and MissingFieldsError
+    when one of the `required` top-level keys is absent.
+    """
+    decoded = json.loads(data)
+    if not isinstance(decoded, dict):
+        raise ValueError(f"Expected a JSON object, got {type(decoded).__name__}")
+    missing = [key for key in required if key not in decoded]
+    if missing:
+        raise MissingFieldsError(f"Missing required fields: {', '.join(missing)}")
+    return _analysis(decoded)
+
+
+def to_analysis(value: Union[ReviewAnalysis, Dict[str, Any]]) -> ReviewAnalysis:
+    """Accept an analysis or a plain dict, e.g. from a mocked or salvaged response."""
+    if isinstance(value, ReviewAnalysis):
+        return value
+    return _analysis(value)
+
+
+def encode_analysis(analysis: ReviewAnalysis) -> str:
+    return json.dumps(asdict(analysis))
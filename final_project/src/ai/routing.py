@@ -0,0 +1,158 @@
+import logging
+import posixpath
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ModelRoute:
+    """Model, endpoint, output budget and prompt used for one class of PRs.
+
+    A route matches when the diff and file list satisfy every limit that is
+    set; unset limits match anything. Empty `model`, `base_url` and
+    `api_key` fall back to the global AI settings.
+    """
+
+    name: str
+    model: str = ""
+    max_tokens: int = 4000
+    prompt: str = "prompt_template.txt"
+    base_url: str = ""
+    api_key: str = ""
+    max_diff_tokens: Optional[int] = None
+    max_files: Optional[int] = None
+    extensions: Optional[List[str]] = None
+    input_cost_per_1k: float = 0.0
+    output_cost_per_1k: float = 0.0
+
+    def matches(self, diff_tokens: int, filenames: List[str]) -> bool:
+        if self.max_diff_tokens is not None and diff_tokens > self.max_diff_tokens:
+            return False
+        if self.max_files is not None and len(filenames) > self.max_files:
+            return False
+        if self.extensions is not None:
+            allowed = {ext.lower() for ext in self.extensions}
+            if not all(posixpath.splitext(name)[1].lower() in allowed for name in filenames):
+                return False
+        return True
+
+
+@dataclass
+class RouteStats:
+    calls: int = 0
+    failures: int = 0
+    latency_total: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+        succeeded = self.calls - self.failures
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "avg_latency": round(self.latency_total / succeeded, 3) if succeeded else None,
+            "p95_latency": ordered[int(len(ordered) * 0.95)] if ordered else None,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cost": round(self.cost, 4),
+        }
+
+
+class ModelRouter:
+    """Pick a model route from the size and content of a diff.
+
+    Routes are tried in order and the first match wins; the default route,
+    built from `ai_model` and `ai_max_tokens`, catches everything else. The
+    summary route serves summary-only reviews when the reviewer is under load.
+    """
+
+    LATENCY_WINDOW = 500
+
+    def __init__(
+            self,
+            routes: List[ModelRoute],
+            default: ModelRoute,
+            summary: Optional[ModelRoute] = None
+    ):
+        self.routes = routes
+        self.default = default
+        self.summary = summary or default
+        self._stats: Dict[str, RouteStats] = {}
+
+    @classmethod
+    def from_settings(cls) -> "ModelRouter":
+        default = ModelRoute(
+            name="default",
+            model=settings.ai_model,
+            max_tokens=settings.ai_max_tokens,
+            input_cost_per_1k=settings.ai_input_cost_per_1k,
+            output_cost_per_1k=settings.ai_output_cost_per_1k,
+        )
+        routes = [
+            route for route in (cls._route(config, default) for config in settings.ai_routes)
+            if route is not None
+        ]
+        summary = cls._route(settings.ai_summary_route, default) if settings.ai_summary_route else None
+        return cls(routes, default, summary)
+
+    @staticmethod
+    def _route(config: Dict[str, Any], default: ModelRoute) -> Optional[ModelRoute]:
+        try:
+            route = ModelRoute(**config)
+        except TypeError as e:
+            logger.error(f"Ignoring invalid AI route {config!r}: {e}")
+            return None
+        route.model = route.model or default.model
+        return route
+
+    def select(self, diff_tokens: int, filenames: List[str]) -> ModelRoute:
+        for route in self.routes:
+            if route.matches(diff_tokens, filenames):
+                return route
+        return self.default
+
+    def record(
+            self,
+            route: ModelRoute,
+            latency: float,
+            input_tokens: int = 0,
+            output_tokens: int = 0,
+            success: bool = True
+    ) -> None:
+        stats = self._stats.setdefault(route.name, RouteStats())
+        stats.calls += 1
+        if not success:
+            stats.failures += 1
+            return
+        stats.latency_total += latency
+        stats.latencies.append(latency)
+        del stats.latencies[:-self.LATENCY_WINDOW]
+        stats.input_tokens += input_tokens
+        stats.output_tokens += output_tokens
+        stats.cost += (
+            input_tokens * route.input_cost_per_1k + output_tokens * route.output_cost_per_1k
+        ) / 1000
+
+    def p95(self, route: ModelRoute, min_samples: int = 20) -> Optional[float]:
+        """p95 call latency of `route`, once it has `min_samples` calls."""
+        latencies = self._stats.get(route.name, RouteStats()).latencies
+        if len(latencies) < min_samples:
+            return None
+        ordered = sorted(latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            route.name: self._stats.get(route.name, RouteStats()).as_dict()
+            for route in [*self.routes, self.default, self.summary]
+        }
+
+
+model_router = ModelRouter.from_settings()
@@ -0,0 +1,197 @@
+import json
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+FINDING_LISTS = ("critical_issues", "suggestions")
+
+
+class FindingsStreamParser:
+    """Incremental parser for the review JSON object as it streams in.
+
+    Text is fed in arbitrary pieces. Each element of ``critical_issues`` and
+    ``suggestions`` is returned from ``feed`` as soon as its closing brace
+    arrives, and every other top-level field is decoded once its value is
+    complete, so a caller can act on findings before the completion ends.
+    """
+
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}
+        self.findings: Dict[str, List[Dict[str, Any]]] = {name: [] for name in FINDING_LISTS}
+        self.closed = False
+        self.skipped = 0
+        self._pieces: List[str] = []
+        self._buffer = ""
+        self._buffer_start = 0
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._key: Optional[str] = None
+        self._expect_value = False
+        self._in_findings = False
+        self._value_start: Optional[int] = None
+        self._scalar_start: Optional[int] = None
+        self._item_start: Optional[int] = None
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far, joined on demand."""
+        if len(self._pieces) > 1:
+            self._pieces[:] = ["".join(self._pieces)]
+        return self._pieces[0] if self._pieces else ""
+
+    @property
+    def findings_count(self) -> int:
+        return sum(len(items) for items in self.findings.values())
+
+    def lists_done(self, limit: int) -> bool:
+        """True once every findings list is closed or holds `limit` items."""
+        return all(
+            name in self.fields or len(self.findings[name]) >= limit
+            for name in FINDING_LISTS
+        )
+
+    def has_fields(self, keys: Sequence[str]) -> bool:
+        """True once every key has a decoded value or, for a findings list, findings."""
+        return all(key in self.fields or self.findings.get(key) for key in keys)
+
+    def open_lists(self) -> List[str]:
+        """Findings lists whose closing bracket has not arrived yet."""
+        return [name for name in FINDING_LISTS if name not in self.fields]
+
+    def feed(self, piece: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """Consume more text; return the findings completed by it.
+
+        Only the new piece is scanned, and the buffer kept for decoding
+        starts at the oldest value still open, so feeding a long completion
+        in small pieces stays linear.
+        """
+        self._pieces.append(piece)
+        self._buffer += piece
+        completed: List[Tuple[str, Dict[str, Any]]] = []
+
+        for i, char in enumerate(piece, self._pos):
+            if self.closed:
+                break
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        value = self._decode(self._string_start, i + 1)
+                        if self._expect_value:
+                            self._set_field(value)
+                        else:
+                            self._key = value
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = i
+            elif char in "{[":
+                if self._depth == 1 and self._expect_value:
+                    self._value_start = i
+                    self._in_findings = char == "[" and self._key in FINDING_LISTS
+                elif self._depth == 2 and char == "{" and self._in_findings:
+                    self._item_start = i
+                self._depth += 1
+            elif char in "}]":
+                if self._depth == 1:
+                    self._finish_scalar(i)
+                self._depth -= 1
+                if self._depth == 2 and self._item_start is not None:
+                    item = self._decode(self._item_start, i + 1)
+                    self._item_start = None
+                    if isinstance(item, dict):
+                        self.findings[self._key].append(item)
+                        completed.append((self._key, item))
+                    else:
+                        self.skipped += 1
+                elif self._depth == 1 and self._in_findings:
+                    self._set_field(self.findings[self._key])
+                elif self._depth == 1 and self._value_start is not None:
+                    self._set_field(self._decode(self._value_start, i + 1))
+                elif self._depth == 0:
+                    self.closed = True
+            elif self._depth == 1:
+                if char == ":":
+                    self._expect_value = True
+                elif char == ",":
+                    self._finish_scalar(i)
+                elif self._expect_value and not char.isspace() and self._scalar_start is None:
+                    self._scalar_start = i
+
+        self._pos += len(piece)
+        self._trim_buffer()
+        return completed
+
+    def result(self) -> Dict[str, Any]:
+        """Fields decoded so far, with the findings collected from the lists."""
+        data = dict(self.fields)
+        data.update({name: list(items) for name, items in self.findings.items()})
+        return data
+
+    def _trim_buffer(self) -> None:
+        """Drop buffered text that no open value can still need."""
+        starts = [
+            start for start in (
+                self._item_start,
+                self._scalar_start,
+                None if self._in_findings else self._value_start,
+                self._string_start if self._in_string else None,
+            )
+            if start is not None
+        ]
+        keep = min(starts, default=self._pos)
+        if keep > self._buffer_start:
+            self._buffer = self._buffer[keep - self._buffer_start:]
+            self._buffer_start = keep
+
+    def _finish_scalar(self, end: int) -> None:
+        if self._scalar_start is not None:
+            self._set_field(self._decode(self._scalar_start, end))
+
+    def _set_field(self, value: Any) -> None:
+        if self._key is not None:
+            self.fields[self._key] = value
+        self._expect_value = False
+        self._in_findings = False
+        self._value_start = None
+        self._scalar_start = None
+        self._key = None
+
+    def _decode(self, start: int, end: int) -> Any:
+        raw = self._buffer[start - self._buffer_start:end - self._buffer_start]
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError:
+            logger.debug(f"Skipping malformed JSON value: {raw[:80]!r}")
+            return None
+
+
+def salvage_review(text: str) -> Optional[Dict[str, Any]]:
+    """Recover what can be recovered from truncated or malformed review JSON.
+
+    Every complete finding object and top-level field is kept; broken
+    findings are dropped. The result is marked `partial` unless the object
+    was closed and nothing had to be dropped. Returns None when not even one
+    field could be decoded.
+    """
+    parser = FindingsStreamParser()
+    parser.feed(text)
+    if not parser.fields and not parser.findings_count:
+        return None
+    data = parser.result()
+    data["partial"] = (
+        not parser.closed
+        or parser.skipped > 0
+        or bool(parser.open_lists())
+    )
+    return data
@@ -0,0 +1,66 @@
+import asyncio
+import logging
+from typing import Optional
+
+from .config import settings
+from .github.client import GitHubClient
+
+logger = logging.getLogger(__name__)
+
+
+class ClientPool:
+    """App-scoped GitHub and AI clients shared by every webhook delivery.
+
+    Clients are created on first use (or in `start`) and keep their HTTP
+    connection pools alive until `close` is called on shutdown.
+    """
+
+    def __init__(self):
+        self._github_client: Optional[GitHubClient] = None
+        self._ai_client = None
+
+    def get_github_client(self) -> GitHubClient:
+        if self._github_client is None:
+            self._github_client = GitHubClient()
+        return self._github_client
+
+    def get_ai_client(self):
+        if self._ai_client is None:
+            if settings.ai_api_key:
+                from .ai.client import AIClient
+                self._ai_client = AIClient()
+            else:
+                from .ai.mock_client import MockAIClient
+                self._ai_client = MockAIClient()
+        return self._ai_client
+
+    async def start(self, warm_up: bool = True) -> None:
+        github_client = self.get_github_client()
+        ai_client = self.get_ai_client()
+
+        if warm_up:
+            await asyncio.gather(github_client.warm_up(), ai_client.warm_up())
+        logger.info("GitHub and AI clients initialized")
+
+    async def close(self) -> None:
+        github_client, self._github_client = self._github_client, None
+        ai_client, self._ai_client = self._ai_client, None
+
+        for client in (github_client, ai_client):
+            if client is None:
+                continue
+            try:
+                await client.close()
+            except Exception as e:
+                logger.error(f"Failed to close {type(client).__name__}: {e}")
+
+
+client_pool = ClientPool()
+
+
+def get_github_client() -> GitHubClient:
+    return client_pool.get_github_client()
+
+
+def get_ai_client():
+    return client_pool.get_ai_client()
@@ -1,3 +1,5 @@
+from typing import Any, Dict, List
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -8,12 +10,61 @@ class Settings(BaseSettings):
 
     github_access_token: str
     github_webhook_secret: str
+    github_graphql_url: str = Field(default="https://api.github.com/graphql")
+    github_request_timeout: float = Field(default=30.0)
+    github_files_per_page: int = Field(default=100)
+    github_files_max_pages: int = Field(default=30)
+    github_diff_max_bytes: int = Field(default=1_000_000)
+    github_diff_max_tokens: int = Field(default=120_000)
+    github_cache_max_entries: int = Field(default=1024)
+    github_cache_persist: bool = Field(default=False)
+    github_rate_limit_pacing_threshold: float = Field(default=0.5)
+    github_rate_limit_low_priority_reserve: float = Field(default=0.1)
+    github_rate_limit_max_wait: float = Field(default=300.0)
+    github_rate_limit_retries: int = Field(default=2)
+    webhook_delivery_ttl: float = Field(default=3 * 24 * 3600)
+    webhook_delivery_max_entries: int = Field(default=10000)
+    webhook_delivery_persist: bool = Field(default=True)
 
     ai_base_url: str
     ai_api_key: str
     ai_model: str = Field(default="deepseek-chat")
     ai_max_tokens: int = Field(default=4000)
     ai_temperature: float = Field(default=0.2)
+    ai_input_cost_per_1k: float = Field(default=0.0)
+    ai_output_cost_per_1k: float = Field(default=0.0)
+    ai_routes: List[Dict[str, Any]] = Field(default_factory=lambda: [
+        {
+            "name": "small",
+            "max_diff_tokens": 1500,
+            "max_files": 3,
+            "max_tokens": 1200,
+            "prompt": "prompt_template_small.txt",
+        },
+    ])
+    ai_summary_route: Dict[str, Any] = Field(default_factory=lambda: {
+        "name": "summary",
+        "max_tokens": 600,
+        "prompt": "prompt_template_summary.txt",
+    })
+    ai_chunk_max_tokens: int = Field(default=24000)
+    ai_chunk_concurrency: int = Field(default=4)
+    ai_prompt_token_budget: int = Field(default=48000)
+    ai_continuation_max_tokens: int = Field(default=1000)
+    ai_concurrency_initial: int = Field(default=4)
+    ai_concurrency_min: int = Field(default=1)
+    ai_concurrency_max: int = Field(default=32)
+    ai_latency_target: float = Field(default=60.0)
+    ai_hedge_base_url: str = Field(default="")
+    ai_hedge_api_key: str = Field(default="")
+    ai_hedge_min_samples: int = Field(default=20)
+    ai_hedge_max_in_flight: int = Field(default=2)
+    ai_stream: bool = Field(default=False)
+    ai_stream_max_findings: int = Field(default=5)
+    ai_review_cache_max_entries: int = Field(default=256)
+    ai_review_cache_ttl: float = Field(default=7 * 24 * 3600)
+    ai_review_cache_persist: bool = Field(default=True)
+    ai_review_cache_db_max_entries: int = Field(default=10000)
 
     postgres_host: str = Field(default="localhost")
     postgres_port: int = Field(default=5432)
@@ -21,6 +72,35 @@ class Settings(BaseSettings):
     postgres_user: str = Field(default="postgres")
     postgres_password: str
 
+    review_dedup_ttl: float = Field(default=600.0)
+    review_quiet_period: float = Field(default=3.0)
+    review_incremental: bool = Field(default=True)
+    review_queue_lease_seconds: float = Field(default=300.0)
+    review_queue_max_attempts: int = Field(default=5)
+    review_queue_retry_base_delay: float = Field(default=30.0)
+    review_queue_retry_max_delay: float = Field(default=1800.0)
+    review_repo_weights: Dict[str, float] = Field(default_factory=dict)
+    review_scheduler_aging_rate: float = Field(default=10.0)
+    review_job_base_cost: float = Field(default=200.0)
+    review_job_file_cost: float = Field(default=50.0)
+    review_default_job_cost: float = Field(default=1000.0)
+    review_shed_queue_depths: List[int] = Field(default_factory=lambda: [100, 300, 1000])
+    review_shed_running_jobs: List[int] = Field(default_factory=lambda: [16, 64, 256])
+    review_shed_refresh_interval: float = Field(default=2.0)
+    review_shed_retry_after: int = Field(default=120)
+    review_shed_defer_seconds: float = Field(default=1800.0)
+    review_worker_in_process: bool = Field(default=True)
+    review_worker_processes: int = Field(default=2)
+    review_worker_concurrency: int = Field(default=4)
+    review_worker_poll_interval: float = Field(default=2.0)
+    review_worker_drain_timeout: float = Field(default=30.0)
+
+    http_max_connections: int = Field(default=100)
+    http_max_keepalive_connections: int = Field(default=20)
+    http_keepalive_expiry: float = Field(default=30.0)
+    http2_enabled: bool = Field(default=False)
+    http_warm_up: bool = Field(default=True)
+
     api_host: str = Field(default="0.0.0.0")
     api_port: int = Field(default=8000)
 
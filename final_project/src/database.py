@@ -1,15 +1,21 @@
+import logging
 import os
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy import DateTime, String, Text, Integer, Boolean, text
+from sqlalchemy import (
+    Connection, DateTime, String, Text, Integer, Float, Boolean, Index, inspect, literal, text
+)
 from datetime import datetime
 
-DATABASE_URL = "sqlite+aiosqlite:///./ai_reviewer.db"
+logger = logging.getLogger(__name__)
+
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./ai_reviewer.db")
 
 engine = create_async_engine(
     DATABASE_URL,
     echo=True,
-    connect_args={"check_same_thread": False}
+    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
 )
 
 AsyncSessionLocal = async_sessionmaker(
@@ -49,12 +55,62 @@ class Review(BaseModel):
     __tablename__ = "reviews"
 
     pr_id: Mapped[int] = mapped_column(Integer, index=True)
+    repository: Mapped[str] = mapped_column(String(255), default="", index=True)
+    head_commit: Mapped[str] = mapped_column(String(100), default="")
+    summary: Mapped[str] = mapped_column(Text, default="")
     review_text: Mapped[str] = mapped_column(Text)
     critical_issues: Mapped[int] = mapped_column(Integer, default=0)
     suggestions: Mapped[int] = mapped_column(Integer, default=0)
     status: Mapped[str] = mapped_column(String(50), default="pending")
 
 
+class HttpCacheEntry(BaseModel):
+    __tablename__ = "http_cache_entries"
+
+    cache_key: Mapped[str] = mapped_column(String(1024), unique=True, index=True)
+    etag: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    last_modified: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    next_url: Mapped[Optional[str]] = mapped_column(String(1024), nullable=True)
+    body: Mapped[str] = mapped_column(Text)
+
+
+class ReviewCacheEntry(BaseModel):
+    __tablename__ = "review_cache_entries"
+
+    cache_key: Mapped[str] = mapped_column(String(80), unique=True, index=True)
+    model: Mapped[str] = mapped_column(String(255))
+    analysis: Mapped[str] = mapped_column(Text)
+
+
+class ReviewJob(BaseModel):
+    __tablename__ = "review_jobs"
+    __table_args__ = (Index("ix_review_jobs_status_run_after", "status", "run_after"),)
+
+    kind: Mapped[str] = mapped_column(String(50))
+    repository: Mapped[str] = mapped_column(String(255), default="", index=True)
+    pr_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    group_key: Mapped[Optional[str]] = mapped_column(String(512), nullable=True, index=True)
+    head_updated_at: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, default=False)
+    payload: Mapped[str] = mapped_column(Text, default="{}")
+    cost: Mapped[float] = mapped_column(Float, default=0.0)
+    status: Mapped[str] = mapped_column(String(20), default="queued")
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=5)
+    run_after: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    lease_owner: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    lease_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    last_error: Mapped[str] = mapped_column(Text, default="")
+
+
+class WebhookDelivery(BaseModel):
+    __tablename__ = "webhook_deliveries"
+    __table_args__ = (Index("ix_webhook_deliveries_created_at", "created_at"),)
+
+    delivery_id: Mapped[str] = mapped_column(String(100), unique=True, index=True)
+    event: Mapped[str] = mapped_column(String(50), default="")
+
+
 async def get_db() -> AsyncSession:
     async with AsyncSessionLocal() as session:
         try:
@@ -63,6 +119,37 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
+def add_missing_columns(connection: Connection) -> None:
+    """Add columns and indexes that models gained since their table was created.
+
+    `create_all` only creates missing tables, so an existing database would
+    otherwise lack new columns and fail every query that uses them. New
+    columns get their scalar default as the column default.
+    """
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = (
+                f"ALTER TABLE {table.name} ADD COLUMN {column.name} "
+                f"{column.type.compile(dialect=connection.dialect)}"
+            )
+            if column.default is not None and column.default.is_scalar:
+                default = literal(column.default.arg, column.type).compile(
+                    dialect=connection.dialect, compile_kwargs={"literal_binds": True}
+                )
+                ddl += f" DEFAULT {default}"
+            logger.warning(f"Adding missing column {table.name}.{column.name}")
+            connection.execute(text(ddl))
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
 async def init_db():
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
\ No newline at end of file
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(add_missing_columns)
\ No newline at end of file
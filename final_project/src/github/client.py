@@ -1,12 +1,30 @@
+import asyncio
+import base64
+import hashlib
+import json
 import logging
+import re
+import time
+from collections import OrderedDict
 import httpx
-from typing import Dict, Any, Optional, List
-from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Awaitable, TypeVar, AsyncIterator, Tuple
+from dataclasses import dataclass, field
+
+from sqlalchemy import select
 
 from ..config import settings
+from ..database import AsyncSessionLocal, HttpCacheEntry
+from ..http_client import create_http_client
+from .diff import DiffDownload, DiffStreamParser
+from .rate_limit import Priority, RateLimitScheduler, rate_limit_scheduler
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+COMMIT_SHA = re.compile(r"[0-9a-f]{40}")
+MISSING_FILES_MAX_ENTRIES = 4096
+
 
 @dataclass
 class PullRequestData:
@@ -19,83 +37,632 @@ class PullRequestData:
     head_commit: str
     files_changed: List[Dict[str, Any]]
     diff_text: str = ""
+    timings: Dict[str, float] = field(default_factory=dict)
+    diff_truncated: bool = False
+    updated_at: str = ""
+
+
+@dataclass
+class CachedResponse:
+    body: Any
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    next_url: Optional[str] = None
+
+
+class ResponseCache:
+    """LRU cache of GitHub response bodies together with their validators.
+
+    Entries are revalidated with If-None-Match / If-Modified-Since; a 304
+    answer is served from the cache and does not count against the rate
+    limit. With `persist` enabled entries are also written to the database
+    so they survive restarts.
+    """
+
+    def __init__(self, max_entries: int = 1024, persist: bool = False):
+        self.max_entries = max_entries
+        self.persist = persist
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+
+        if self.persist:
+            entry = await self._load(key)
+            if entry is not None:
+                self._remember(key, entry)
+        return entry
+
+    async def set(self, key: str, entry: CachedResponse) -> None:
+        self._remember(key, entry)
+        if self.persist:
+            await self._save(key, entry)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+        }
+
+    def _remember(self, key: str, entry: CachedResponse) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _load(self, key: str) -> Optional[CachedResponse]:
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(HttpCacheEntry).where(HttpCacheEntry.cache_key == key)
+                )
+                row = result.scalar_one_or_none()
+        except Exception as e:
+            logger.warning(f"Failed to load cached GitHub response: {e}")
+            return None
+
+        if row is None:
+            return None
+        return CachedResponse(
+            body=json.loads(row.body),
+            etag=row.etag,
+            last_modified=row.last_modified,
+            next_url=row.next_url
+        )
+
+    async def _save(self, key: str, entry: CachedResponse) -> None:
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(HttpCacheEntry).where(HttpCacheEntry.cache_key == key)
+                )
+                row = result.scalar_one_or_none()
+                if row is None:
+                    row = HttpCacheEntry(cache_key=key)
+                    session.add(row)
+                row.body = json.dumps(entry.body)
+                row.etag = entry.etag
+                row.last_modified = entry.last_modified
+                row.next_url = entry.next_url
+                await session.commit()
+        except Exception as e:
+            logger.warning(f"Failed to persist cached GitHub response: {e}")
+
+
+PULL_REQUESTS_FOR_BRANCH_QUERY = """
+query($owner: String!, $name: String!, $headRefName: String!, $filesPerPr: Int!) {
+  repository(owner: $owner, name: $name) {
+    pullRequests(headRefName: $headRefName, states: OPEN, first: 50) {
+      nodes {
+        number
+        title
+        url
+        author { login }
+        baseRefOid
+        headRefOid
+        headRepository { nameWithOwner }
+        updatedAt
+        files(first: $filesPerPr) {
+          pageInfo { hasNextPage }
+          nodes { path additions deletions changeType }
+        }
+      }
+    }
+  }
+}
+"""
+
+GRAPHQL_CHANGE_TYPES = {
+    "ADDED": "added",
+    "DELETED": "removed",
+    "MODIFIED": "modified",
+    "RENAMED": "renamed",
+    "COPIED": "copied",
+    "CHANGED": "changed",
+}
+
+
+class GraphQLError(Exception):
+    pass
 
 
 class GitHubClient:
-    def __init__(self, access_token: Optional[str] = None):
+    def __init__(
+            self,
+            access_token: Optional[str] = None,
+            request_timeout: Optional[float] = None,
+            http_client: Optional[httpx.AsyncClient] = None,
+            cache: Optional[ResponseCache] = None,
+            scheduler: Optional[RateLimitScheduler] = None
+    ):
         self.access_token = access_token or settings.github_access_token
+        self.request_timeout = request_timeout or settings.github_request_timeout
         self.base_url = "https://api.github.com"
+        self.graphql_url = settings.github_graphql_url
         self.headers = {
             "Authorization": f"token {self.access_token}",
             "Accept": "application/vnd.github.v3+json"
         }
-        self.client = httpx.AsyncClient(
+        self.client = http_client or create_http_client(
             headers=self.headers,
             timeout=30.0
         )
+        self.cache = cache or ResponseCache(
+            max_entries=settings.github_cache_max_entries,
+            persist=settings.github_cache_persist
+        )
+        self.scheduler = scheduler or rate_limit_scheduler
+        self.rate_limit_key = hashlib.sha256(self.access_token.encode()).hexdigest()[:16]
+        self._missing_files: "OrderedDict[Tuple[str, str, str], None]" = OrderedDict()
+
+    async def _request(
+            self,
+            method: str,
+            url: str,
+            priority: Priority = Priority.NORMAL,
+            rate_limit_key: Optional[str] = None,
+            **kwargs: Any
+    ) -> httpx.Response:
+        """Send a request through the shared rate-limit scheduler.
+
+        Responses rejected by a primary or secondary rate limit are retried
+        once the scheduler allows calls for this token again.
+        """
+        send = self.client.post if method == "POST" else self.client.get
+        key = rate_limit_key or self.rate_limit_key
+        retries = settings.github_rate_limit_retries
+        for attempt in range(retries + 1):
+            await self.scheduler.acquire(key, priority)
+            response = await send(url, **kwargs)
+            if not self.scheduler.update(key, response) or attempt == retries:
+                return response
+        return response
+
+    async def _cached_get(
+            self,
+            url: str,
+            params: Optional[Dict[str, Any]] = None,
+            priority: Priority = Priority.NORMAL
+    ) -> CachedResponse:
+        """GET a JSON resource, revalidating a cached copy when there is one."""
+        key = url if not params else f"{url}?{httpx.QueryParams(params)}"
+        cached = await self.cache.get(key)
+
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+            self.cache.revalidations += 1
+
+        response = await self._request(
+            "GET", url, priority, params=params, headers=headers or None
+        )
+        if cached is not None and response.status_code == 304:
+            self.cache.hits += 1
+            return cached
+
+        response.raise_for_status()
+        self.cache.misses += 1
+        entry = CachedResponse(
+            body=response.json(),
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            next_url=response.links.get("next", {}).get("url")
+        )
+        if entry.etag or entry.last_modified:
+            await self.cache.set(key, entry)
+        return entry
 
     async def get_open_pull_requests(self, repository: str, head: str = None) -> List[Dict[str, Any]]:
-        endpoint = f"/repos/{repository}/pulls"
+        url = f"{self.base_url}/repos/{repository}/pulls"
         params = {"state": "open"}
 
         if head:
             params["head"] = head
 
         try:
-            response = await self.client.get(endpoint, params=params)
-            response.raise_for_status()
-            return response.json()
+            return (await self._cached_get(url, params=params)).body
         except Exception as e:
             logger.error(f"Failed to get open PRs for {repository}: {e}")
             return []
 
-    async def get_pull_request(self, repo: str, pr_number: int) -> PullRequestData:
-        url = f"{self.base_url}/repos/{repo}/pulls/{pr_number}"
-        response = await self.client.get(url)
+    async def get_pull_requests_for_branch(
+            self,
+            repository: str,
+            branch: str
+    ) -> List[PullRequestData]:
+        """Snapshot every open PR whose head is `branch` of `repository`.
+
+        Metadata and file lists for all of them come from a single GraphQL
+        query; only the diffs are fetched per PR, concurrently. PRs from forks
+        with a branch of the same name are skipped. A PR whose snapshot fails
+        is logged and left out. Falls back to the REST endpoints when the
+        GraphQL request fails.
+        """
+        try:
+            started = time.perf_counter()
+            nodes = await self._query_pull_requests_for_branch(repository, branch)
+            elapsed = time.perf_counter() - started
+        except Exception as e:
+            logger.warning(f"GraphQL lookup for {repository}:{branch} failed, using REST: {e}")
+            return await self._get_pull_requests_for_branch_rest(repository, branch)
+
+        nodes = [
+            node for node in nodes
+            if ((node.get("headRepository") or {}).get("nameWithOwner") or "").lower()
+            == repository.lower()
+        ]
+        return await self._gather_snapshots(repository, [
+            (node["number"], self._snapshot_from_graphql(repository, node, elapsed))
+            for node in nodes
+        ])
+
+    @staticmethod
+    async def _gather_snapshots(
+            repository: str,
+            fetches: List[Tuple[int, Awaitable[PullRequestData]]]
+    ) -> List[PullRequestData]:
+        results = await asyncio.gather(
+            *(fetch for _, fetch in fetches), return_exceptions=True
+        )
+        snapshots = []
+        for (pr_number, _), result in zip(fetches, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Failed to fetch PR #{pr_number} of {repository}: {result!r}")
+            else:
+                snapshots.append(result)
+        return snapshots
+
+    async def _query_pull_requests_for_branch(
+            self,
+            repository: str,
+            branch: str
+    ) -> List[Dict[str, Any]]:
+        owner, name = repository.split("/", 1)
+        payload = {
+            "query": PULL_REQUESTS_FOR_BRANCH_QUERY,
+            "variables": {
+                "owner": owner,
+                "name": name,
+                "headRefName": branch,
+                "filesPerPr": 100,
+            },
+        }
+        response = await self._request(
+            "POST",
+            self.graphql_url,
+            rate_limit_key=f"{self.rate_limit_key}:graphql",
+            json=payload
+        )
         response.raise_for_status()
-        pr_data = response.json()
+        body = response.json()
+        if body.get("errors"):
+            raise GraphQLError(body["errors"][0].get("message", "GraphQL error"))
+
+        repository_data = (body.get("data") or {}).get("repository")
+        if repository_data is None:
+            raise GraphQLError(f"Repository {repository} not found")
+        return repository_data["pullRequests"]["nodes"]
+
+    async def _snapshot_from_graphql(
+            self,
+            repository: str,
+            node: Dict[str, Any],
+            query_time: float
+    ) -> PullRequestData:
+        pr_number = node["number"]
+        timings = {"graphql": query_time}
+        files = node.get("files") or {}
+
+        if (files.get("pageInfo") or {}).get("hasNextPage"):
+            files_changed, diff = await asyncio.gather(
+                self._timed_fetch("files", timings, self.get_pr_files(repository, pr_number)),
+                self._timed_fetch("diff", timings, self.stream_pr_diff(repository, pr_number)),
+            )
+        else:
+            files_changed = [self._file_from_graphql(file) for file in files.get("nodes") or []]
+            diff = await self._timed_fetch(
+                "diff", timings, self.stream_pr_diff(repository, pr_number)
+            )
+
+        pr_data = {
+            "title": node.get("title", ""),
+            "user": node.get("author") or {},
+            "diff_url": f"{node['url']}.diff" if node.get("url") else "",
+            "base": {"sha": node.get("baseRefOid", "")},
+            "head": {"sha": node.get("headRefOid", "")},
+            "updated_at": node.get("updatedAt", ""),
+        }
+        return self._build_pull_request_data(
+            repository, pr_number, pr_data,
+            files_changed=files_changed,
+            diff=diff,
+            timings=timings
+        )
+
+    @staticmethod
+    def _file_from_graphql(file: Dict[str, Any]) -> Dict[str, Any]:
+        additions = file.get("additions", 0)
+        deletions = file.get("deletions", 0)
+        return {
+            "filename": file.get("path", ""),
+            "status": GRAPHQL_CHANGE_TYPES.get(file.get("changeType", ""), "modified"),
+            "additions": additions,
+            "deletions": deletions,
+            "changes": additions + deletions,
+        }
+
+    async def _get_pull_requests_for_branch_rest(
+            self,
+            repository: str,
+            branch: str
+    ) -> List[PullRequestData]:
+        owner = repository.split("/", 1)[0]
+        pull_requests = await self.get_open_pull_requests(repository, head=f"{owner}:{branch}")
+        return await self._gather_snapshots(repository, [
+            (pr["number"], self.get_pull_request_from_payload(repository, pr))
+            for pr in pull_requests
+            if pr.get("number")
+        ])
+
+    async def get_pull_request(self, repo: str, pr_number: int) -> PullRequestData:
+        """Fetch PR metadata, file list and diff concurrently.
+
+        The three requests are independent, so they run in one task group with
+        a per-request deadline. The first failure cancels the remaining
+        requests and is re-raised as is.
+        """
+        return await self._fetch_snapshot(repo, pr_number)
+
+    async def get_pull_request_from_payload(
+            self,
+            repo: str,
+            pr_payload: Dict[str, Any]
+    ) -> PullRequestData:
+        """Build a PR snapshot from a `pull_request` webhook payload.
+
+        The payload already carries the title, author and base/head SHAs, so
+        only the file list and the diff are fetched. Payloads missing those
+        fields fall back to a full fetch.
+        """
+        pr_number = pr_payload.get("number")
+        if not self._is_complete_pr_payload(pr_payload):
+            logger.debug(f"Incomplete payload for PR #{pr_number}, fetching metadata")
+            return await self._fetch_snapshot(repo, pr_number)
+        return await self._fetch_snapshot(repo, pr_number, pr_payload)
+
+    @staticmethod
+    def _is_complete_pr_payload(pr_payload: Dict[str, Any]) -> bool:
+        return bool(
+            pr_payload.get("number")
+            and "title" in pr_payload
+            and (pr_payload.get("user") or {}).get("login")
+            and (pr_payload.get("base") or {}).get("sha")
+            and (pr_payload.get("head") or {}).get("sha")
+        )
+
+    async def _fetch_snapshot(
+            self,
+            repo: str,
+            pr_number: int,
+            pr_data: Optional[Dict[str, Any]] = None
+    ) -> PullRequestData:
+        timings: Dict[str, float] = {}
+        pr_task = None
+        try:
+            async with asyncio.TaskGroup() as group:
+                if pr_data is None:
+                    pr_task = group.create_task(self._timed_fetch(
+                        "pull_request", timings, self._get_pr_metadata(repo, pr_number)
+                    ))
+                files_task = group.create_task(self._timed_fetch(
+                    "files", timings, self.get_pr_files(repo, pr_number)
+                ))
+                diff_task = group.create_task(self._timed_fetch(
+                    "diff", timings, self.stream_pr_diff(repo, pr_number)
+                ))
+        except ExceptionGroup as group_error:
+            raise group_error.exceptions[0]
+
+        logger.debug(
+            f"Fetched PR #{pr_number} snapshot for {repo}: "
+            + ", ".join(f"{name}={elapsed:.3f}s" for name, elapsed in timings.items())
+        )
+
+        return self._build_pull_request_data(
+            repo,
+            pr_number,
+            pr_task.result() if pr_task is not None else pr_data,
+            files_changed=files_task.result(),
+            diff=diff_task.result(),
+            timings=timings
+        )
 
-        diff_url = pr_data.get("diff_url", "")
-        base_commit = pr_data.get("base", {}).get("sha", "")
-        head_commit = pr_data.get("head", {}).get("sha", "")
+    async def _get_pr_metadata(self, repo: str, pr_number: int) -> Dict[str, Any]:
+        url = f"{self.base_url}/repos/{repo}/pulls/{pr_number}"
+        return (await self._cached_get(url)).body
 
-        files_changed = await self.get_pr_files(repo, pr_number)
-        diff_text = await self.get_pr_diff(repo, pr_number)
+    async def _timed_fetch(
+            self,
+            name: str,
+            timings: Dict[str, float],
+            request: Awaitable[T]
+    ) -> T:
+        started = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.request_timeout):
+                return await request
+        except TimeoutError:
+            logger.warning(f"GitHub request '{name}' timed out after {self.request_timeout}s")
+            raise
+        finally:
+            timings[name] = time.perf_counter() - started
 
+    @staticmethod
+    def _build_pull_request_data(
+            repo: str,
+            pr_number: int,
+            pr_data: Dict[str, Any],
+            files_changed: List[Dict[str, Any]],
+            diff: DiffDownload,
+            timings: Dict[str, float]
+    ) -> PullRequestData:
         return PullRequestData(
             pr_id=pr_number,
             repository=repo,
             title=pr_data.get("title", ""),
-            author=pr_data.get("user", {}).get("login", ""),
-            diff_url=diff_url,
-            base_commit=base_commit,
-            head_commit=head_commit,
+            author=(pr_data.get("user") or {}).get("login", ""),
+            diff_url=pr_data.get("diff_url", ""),
+            base_commit=(pr_data.get("base") or {}).get("sha", ""),
+            head_commit=(pr_data.get("head") or {}).get("sha", ""),
             files_changed=files_changed,
-            diff_text=diff_text
+            diff_text=diff.text,
+            timings=timings,
+            diff_truncated=diff.truncated,
+            updated_at=pr_data.get("updated_at") or ""
         )
 
     async def get_pr_files(self, repo: str, pr_number: int) -> List[Dict[str, Any]]:
+        return [file async for file in self.iter_pr_files(repo, pr_number)]
+
+    async def iter_pr_files(
+            self,
+            repo: str,
+            pr_number: int,
+            per_page: Optional[int] = None,
+            max_pages: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield changed files of a PR, following the `Link: rel="next"` pages.
+
+        The next page is requested as soon as the current one arrives, so it
+        downloads while the caller consumes the current page. At most
+        `max_pages` pages are read.
+        """
+        per_page = per_page or settings.github_files_per_page
+        max_pages = max_pages or settings.github_files_max_pages
         url = f"{self.base_url}/repos/{repo}/pulls/{pr_number}/files"
-        response = await self.client.get(url)
-        response.raise_for_status()
-        return response.json()
+
+        pending = asyncio.ensure_future(self._get_files_page(url, {"per_page": per_page}))
+        pages_read = 0
+        try:
+            while pending is not None:
+                files, next_url = await pending
+                pages_read += 1
+                pending = None
+
+                if next_url and pages_read < max_pages:
+                    pending = asyncio.ensure_future(self._get_files_page(next_url))
+                elif next_url:
+                    logger.warning(
+                        f"PR #{pr_number} in {repo} has more than {max_pages} pages "
+                        f"of files, the file list is truncated"
+                    )
+
+                for file in files:
+                    yield file
+        finally:
+            if pending is not None and not pending.done():
+                pending.cancel()
+
+    async def _get_files_page(
+            self,
+            url: str,
+            params: Optional[Dict[str, Any]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        entry = await self._cached_get(url, params=params)
+        return entry.body, entry.next_url
 
     async def get_pr_diff(self, repo: str, pr_number: int) -> str:
+        return (await self.stream_pr_diff(repo, pr_number)).text
+
+    async def stream_pr_diff(
+            self,
+            repo: str,
+            pr_number: int,
+            max_bytes: Optional[int] = None,
+            max_tokens: Optional[int] = None
+    ) -> DiffDownload:
+        """Download a PR diff as per-file segments within a size budget.
+
+        The response is parsed while it streams in and the download is
+        aborted once the byte or token budget is spent, so a huge PR never
+        has to be held in memory.
+        """
         url = f"{self.base_url}/repos/{repo}/pulls/{pr_number}"
+        download = await self._stream_diff(url, max_bytes, max_tokens)
+        if download.truncated:
+            logger.warning(
+                f"Diff of PR #{pr_number} in {repo} exceeds the size budget, "
+                f"stopped after {download.bytes_read} bytes"
+            )
+        return download
+
+    async def get_compare_diff(
+            self,
+            repo: str,
+            base: str,
+            head: str,
+            max_bytes: Optional[int] = None,
+            max_tokens: Optional[int] = None
+    ) -> DiffDownload:
+        """Download the diff between two commits, with the same budget as PR diffs."""
+        url = f"{self.base_url}/repos/{repo}/compare/{base}...{head}"
+        download = await self._stream_diff(url, max_bytes, max_tokens)
+        if download.truncated:
+            logger.warning(
+                f"Diff {base[:7]}...{head[:7]} in {repo} exceeds the size budget, "
+                f"stopped after {download.bytes_read} bytes"
+            )
+        return download
+
+    async def _stream_diff(
+            self,
+            url: str,
+            max_bytes: Optional[int],
+            max_tokens: Optional[int]
+    ) -> DiffDownload:
         headers = {
             "Accept": "application/vnd.github.v3.diff",
             "Authorization": f"token {self.access_token}",
         }
-        response = await self.client.get(url, headers=headers)
-        response.raise_for_status()
-        return response.text
+        parser = DiffStreamParser(
+            max_bytes=max_bytes or settings.github_diff_max_bytes,
+            max_tokens=max_tokens or settings.github_diff_max_tokens
+        )
+
+        retries = settings.github_rate_limit_retries
+        for attempt in range(retries + 1):
+            await self.scheduler.acquire(self.rate_limit_key, Priority.NORMAL)
+            async with self.client.stream("GET", url, headers=headers) as response:
+                if response.status_code == 403:
+                    await response.aread()
+                limited = self.scheduler.update(self.rate_limit_key, response)
+                if limited and attempt < retries:
+                    continue
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes():
+                    if not parser.feed(chunk):
+                        break
+                break
+
+        return parser.finish()
 
     async def add_comment_to_pr(self, repo: str, pr_number: int, comment: str) -> bool:
         url = f"{self.base_url}/repos/{repo}/issues/{pr_number}/comments"
         payload = {"body": comment}
 
         try:
-            response = await self.client.post(url, json=payload)
+            response = await self._request("POST", url, Priority.HIGH, json=payload)
             response.raise_for_status()
             logger.info(f"Successfully added comment to PR #{pr_number}")
             return True
@@ -103,11 +670,50 @@ class GitHubClient:
             logger.error(f"Failed to add comment to PR #{pr_number}: {e}")
             return False
 
+    async def get_file_content(
+            self,
+            repo: str,
+            path: str,
+            ref: Optional[str] = None,
+            priority: Priority = Priority.LOW
+    ) -> Optional[str]:
+        """Text of a file in the repository, or None when it does not exist.
+
+        A file missing at a commit SHA stays missing, so that answer is
+        remembered and not requested again; a 404 carries no ETag to revalidate.
+        """
+        url = f"{self.base_url}/repos/{repo}/contents/{path}"
+        missing_key = (repo, path, ref) if ref and COMMIT_SHA.fullmatch(ref) else None
+        if missing_key in self._missing_files:
+            self._missing_files.move_to_end(missing_key)
+            return None
+        try:
+            body = (await self._cached_get(
+                url, params={"ref": ref} if ref else None, priority=priority
+            )).body
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                if missing_key is not None:
+                    self._missing_files[missing_key] = None
+                    while len(self._missing_files) > MISSING_FILES_MAX_ENTRIES:
+                        self._missing_files.popitem(last=False)
+                return None
+            raise
+        if not isinstance(body, dict) or body.get("encoding") != "base64":
+            return None
+        return base64.b64decode(body.get("content", "")).decode("utf-8", errors="replace")
+
     async def get_repository_info(self, repo: str) -> Dict[str, Any]:
         url = f"{self.base_url}/repos/{repo}"
-        response = await self.client.get(url)
-        response.raise_for_status()
-        return response.json()
+        return (await self._cached_get(url, priority=Priority.LOW)).body
+
+    async def warm_up(self) -> None:
+        """Open a pooled connection to the API; /rate_limit does not use quota."""
+        try:
+            response = await self.client.get(f"{self.base_url}/rate_limit")
+            self.scheduler.update(self.rate_limit_key, response)
+        except Exception as e:
+            logger.warning(f"GitHub connection warm-up failed: {e}")
 
     async def close(self):
         await self.client.aclose()
\ No newline at end of file
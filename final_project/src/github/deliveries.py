@@ -0,0 +1,120 @@
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+
+from ..config import settings
+from ..database import AsyncSessionLocal, WebhookDelivery
+
+logger = logging.getLogger(__name__)
+
+
+class DeliveryLog:
+    """Webhook delivery IDs seen in the last `ttl` seconds.
+
+    GitHub redelivers a webhook with the same `X-GitHub-Delivery` ID after
+    a timeout or when an operator redelivers it by hand. Recent IDs are kept
+    in a bounded in-memory set, so most duplicates are answered without a
+    query. With `persist` enabled every new ID is also inserted into the
+    `webhook_deliveries` table, whose unique index catches duplicates seen
+    by another process or before a restart.
+    """
+
+    def __init__(
+            self,
+            ttl: Optional[float] = None,
+            max_entries: Optional[int] = None,
+            persist: Optional[bool] = None
+    ):
+        self.ttl = ttl or settings.webhook_delivery_ttl
+        self.max_entries = max_entries or settings.webhook_delivery_max_entries
+        self.persist = persist if persist is not None else settings.webhook_delivery_persist
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+        self._pruned_at = 0.0
+        self.deliveries = 0
+        self.duplicates = 0
+
+    @property
+    def duplicate_rate(self) -> float:
+        return self.duplicates / self.deliveries if self.deliveries else 0.0
+
+    async def claim(self, delivery_id: str, event: str = "") -> bool:
+        """Record a delivery; False when it was already seen."""
+        self.deliveries += 1
+        now = time.time()
+        seen_at = self._seen.get(delivery_id)
+        if seen_at is not None and now - seen_at <= self.ttl:
+            return self._duplicate(delivery_id)
+
+        if self.persist and not await self._insert(delivery_id, event, now):
+            self._remember(delivery_id, now)
+            return self._duplicate(delivery_id)
+
+        self._remember(delivery_id, now)
+        return True
+
+    async def forget(self, delivery_id: str) -> None:
+        """Drop a delivery that was not acted on, so a redelivery is processed."""
+        self._seen.pop(delivery_id, None)
+        if not self.persist:
+            return
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(
+                    delete(WebhookDelivery).where(WebhookDelivery.delivery_id == delivery_id)
+                )
+                await session.commit()
+        except Exception as e:
+            logger.warning(f"Failed to forget webhook delivery {delivery_id}: {e}")
+
+    def clear(self) -> None:
+        self._seen.clear()
+        self.deliveries = 0
+        self.duplicates = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._seen),
+            "deliveries": self.deliveries,
+            "duplicates": self.duplicates,
+            "duplicate_rate": round(self.duplicate_rate, 3),
+        }
+
+    def _duplicate(self, delivery_id: str) -> bool:
+        self.duplicates += 1
+        logger.info(
+            f"Duplicate webhook delivery {delivery_id} ignored, "
+            f"duplicate rate {self.duplicate_rate:.0%}"
+        )
+        return False
+
+    def _remember(self, delivery_id: str, seen_at: float) -> None:
+        self._seen[delivery_id] = seen_at
+        self._seen.move_to_end(delivery_id)
+        while len(self._seen) > self.max_entries:
+            self._seen.popitem(last=False)
+
+    async def _insert(self, delivery_id: str, event: str, now: float) -> bool:
+        """False when the table already has the ID; a database error counts as new."""
+        try:
+            async with AsyncSessionLocal() as session:
+                if now - self._pruned_at > min(self.ttl, 3600):
+                    self._pruned_at = now
+                    cutoff = datetime.utcnow() - timedelta(seconds=self.ttl)
+                    await session.execute(
+                        delete(WebhookDelivery).where(WebhookDelivery.created_at < cutoff)
+                    )
+                session.add(WebhookDelivery(delivery_id=delivery_id, event=event))
+                await session.commit()
+        except IntegrityError:
+            return False
+        except Exception as e:
+            logger.warning(f"Failed to record webhook delivery {delivery_id}: {e}")
+        return True
+
+
+delivery_log = DeliveryLog()
@@ -0,0 +1,130 @@
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+DIFF_HEADER = b"diff --git "
+CHARS_PER_TOKEN = 4
+
+
+@dataclass
+class DiffSegment:
+    filename: str
+    text: str
+    truncated: bool = False
+
+
+@dataclass
+class DiffDownload:
+    segments: List[DiffSegment] = field(default_factory=list)
+    truncated: bool = False
+    bytes_read: int = 0
+
+    @property
+    def text(self) -> str:
+        return "".join(segment.text for segment in self.segments)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for code; about four characters per token."""
+    return _tokens_for_chars(len(text))
+
+
+def _tokens_for_chars(chars: int) -> int:
+    return (chars + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def parse_filename(header_line: str) -> str:
+    """Return the new path from a `diff --git a/<path> b/<path>` line."""
+    header = header_line.rstrip("\n")
+    if " b/" in header:
+        return header.rsplit(" b/", 1)[1]
+    return header[len("diff --git "):]
+
+
+def split_diff(diff_text: str) -> List[DiffSegment]:
+    parser = DiffStreamParser()
+    parser.feed(diff_text.encode("utf-8"))
+    return parser.finish().segments
+
+
+def split_hunks(segment_text: str) -> Tuple[str, List[str]]:
+    """Split one file's diff into its header lines and its `@@` hunks."""
+    header: List[str] = []
+    hunks: List[List[str]] = []
+    for line in segment_text.splitlines(keepends=True):
+        if line.startswith("@@"):
+            hunks.append([line])
+        elif hunks:
+            hunks[-1].append(line)
+        else:
+            header.append(line)
+    return "".join(header), ["".join(hunk) for hunk in hunks]
+
+
+class DiffStreamParser:
+    """Split a unified diff into per-file segments as bytes arrive.
+
+    Only complete lines are parsed. Once the next line would exceed the byte
+    or token budget, `feed` returns False and the rest of the diff is
+    dropped; the last segment is marked truncated.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, max_tokens: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.max_tokens = max_tokens
+        self.download = DiffDownload()
+        self._pending = b""
+        self._lines: List[str] = []
+        self._filename: Optional[str] = None
+        self._accepted_bytes = 0
+        self._accepted_chars = 0
+        self._stopped = False
+
+    def feed(self, chunk: bytes) -> bool:
+        if self._stopped:
+            return False
+        self.download.bytes_read += len(chunk)
+        data = self._pending + chunk
+        lines = data.split(b"\n")
+        self._pending = lines.pop()
+        for line in lines:
+            if not self._accept(line + b"\n"):
+                return False
+        return True
+
+    def finish(self) -> DiffDownload:
+        if self._pending and not self._stopped:
+            self._accept(self._pending)
+        self._pending = b""
+        self._flush(truncated=self._stopped)
+        return self.download
+
+    def _accept(self, line: bytes) -> bool:
+        if self._over_budget(line):
+            self._stopped = True
+            self.download.truncated = True
+            return False
+
+        text = line.decode("utf-8", errors="replace")
+        if line.startswith(DIFF_HEADER):
+            self._flush()
+            self._filename = parse_filename(text)
+        self._lines.append(text)
+        self._accepted_bytes += len(line)
+        self._accepted_chars += len(text)
+        return True
+
+    def _over_budget(self, line: bytes) -> bool:
+        if self.max_bytes is not None and self._accepted_bytes + len(line) > self.max_bytes:
+            return True
+        if self.max_tokens is not None:
+            return _tokens_for_chars(self._accepted_chars + len(line)) > self.max_tokens
+        return False
+
+    def _flush(self, truncated: bool = False) -> None:
+        if self._lines:
+            self.download.segments.append(DiffSegment(
+                filename=self._filename or "",
+                text="".join(self._lines),
+                truncated=truncated
+            ))
+        self._lines = []
@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Dict, Optional
+
+import httpx
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+SECONDARY_LIMIT_MARKERS = ("secondary rate limit", "abuse detection")
+SECONDARY_LIMIT_BACKOFF = 60.0
+SECONDARY_LIMIT_MAX_BACKOFF = 960.0
+
+
+class Priority(IntEnum):
+    LOW = 0
+    NORMAL = 1
+    HIGH = 2
+
+
+class RateLimitExceeded(Exception):
+    pass
+
+
+@dataclass
+class RateLimitBucket:
+    limit: Optional[int] = None
+    remaining: Optional[int] = None
+    reset_at: float = 0.0
+    blocked_until: float = 0.0
+    tokens: float = 0.0
+    refilled_at: float = 0.0
+    backoffs: int = 0
+
+
+class RateLimitScheduler:
+    """Paces GitHub API calls per token using the rate-limit response headers.
+
+    Every response updates the bucket of its token from `X-RateLimit-*` and
+    `Retry-After`. Once the remaining budget drops below the pacing threshold
+    calls are spread evenly until the reset; low-priority calls stop using
+    the last part of the budget, and a secondary limit or an exhausted budget
+    blocks all calls until GitHub allows them again. A secondary limit that
+    gives no wait time blocks for a minute, doubling on every further hit
+    until a call gets through.
+    """
+
+    burst = 10
+
+    def __init__(
+            self,
+            pacing_threshold: Optional[float] = None,
+            low_priority_reserve: Optional[float] = None,
+            max_wait: Optional[float] = None
+    ):
+        self.pacing_threshold = (
+            pacing_threshold if pacing_threshold is not None
+            else settings.github_rate_limit_pacing_threshold
+        )
+        self.low_priority_reserve = (
+            low_priority_reserve if low_priority_reserve is not None
+            else settings.github_rate_limit_low_priority_reserve
+        )
+        self.max_wait = max_wait if max_wait is not None else settings.github_rate_limit_max_wait
+        self._buckets: Dict[str, RateLimitBucket] = {}
+        self.delayed_calls = 0
+
+    def bucket(self, key: str) -> RateLimitBucket:
+        if key not in self._buckets:
+            self._buckets[key] = RateLimitBucket()
+        return self._buckets[key]
+
+    async def acquire(self, key: str, priority: Priority = Priority.NORMAL) -> None:
+        waited = 0.0
+        while True:
+            delay = self._reserve(self.bucket(key), priority, time.time())
+            if delay <= 0:
+                if waited:
+                    logger.info(f"GitHub call ({priority.name}) delayed {waited:.1f}s by rate limit")
+                return
+            if waited + delay > self.max_wait:
+                raise RateLimitExceeded(
+                    f"GitHub rate limit would delay a {priority.name} call by more than "
+                    f"{self.max_wait:.0f}s"
+                )
+            if not waited:
+                self.delayed_calls += 1
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def update(self, key: str, response: httpx.Response) -> bool:
+        """Record the rate-limit headers of a response.
+
+        Returns True when the response was rejected by a primary or secondary
+        rate limit and the request may be retried after `acquire`.
+        """
+        bucket = self.bucket(key)
+        now = time.time()
+
+        limit = _header_int(response, "X-RateLimit-Limit")
+        remaining = _header_int(response, "X-RateLimit-Remaining")
+        reset_at = _header_int(response, "X-RateLimit-Reset")
+        retry_after = _header_int(response, "Retry-After")
+
+        if limit is not None:
+            bucket.limit = limit
+        if remaining is not None:
+            bucket.remaining = remaining
+        if reset_at is not None:
+            bucket.reset_at = float(reset_at)
+
+        if response.status_code not in (403, 429):
+            bucket.backoffs = 0
+            return False
+
+        if retry_after is not None:
+            blocked_until = now + retry_after
+        elif remaining == 0 and reset_at is not None:
+            blocked_until = float(reset_at)
+        elif response.status_code == 429 or _is_secondary_limit(response):
+            backoff = SECONDARY_LIMIT_BACKOFF * 2 ** bucket.backoffs
+            blocked_until = now + min(backoff, SECONDARY_LIMIT_MAX_BACKOFF)
+            bucket.backoffs += 1
+        else:
+            # Any other 403 is a permission error.
+            return False
+
+        bucket.blocked_until = max(bucket.blocked_until, blocked_until)
+        logger.warning(
+            f"GitHub rate limit hit (status {response.status_code}), "
+            f"blocking calls for {blocked_until - now:.0f}s"
+        )
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "buckets": len(self._buckets),
+            "delayed_calls": self.delayed_calls,
+            "min_remaining": min(
+                (bucket.remaining for bucket in self._buckets.values() if bucket.remaining is not None),
+                default=-1
+            ),
+        }
+
+    def _reserve(self, bucket: RateLimitBucket, priority: Priority, now: float) -> float:
+        """Take a slot from the bucket or return how long to wait for one."""
+        if bucket.blocked_until > now:
+            return bucket.blocked_until - now
+
+        if bucket.reset_at and now >= bucket.reset_at:
+            bucket.remaining = bucket.limit
+            bucket.reset_at = 0.0
+        if bucket.remaining is None or not bucket.limit:
+            return 0.0
+
+        until_reset = max(bucket.reset_at - now, 1.0)
+        if bucket.remaining <= 0:
+            return until_reset
+        if priority == Priority.LOW and bucket.remaining <= bucket.limit * self.low_priority_reserve:
+            return until_reset
+
+        if bucket.remaining <= bucket.limit * self.pacing_threshold and priority != Priority.HIGH:
+            rate = bucket.remaining / until_reset
+            if bucket.refilled_at:
+                bucket.tokens = min(
+                    self.burst, bucket.tokens + (now - bucket.refilled_at) * rate
+                )
+            else:
+                bucket.tokens = 1.0
+            bucket.refilled_at = now
+            if bucket.tokens < 1:
+                return (1 - bucket.tokens) / rate
+            bucket.tokens -= 1
+
+        bucket.remaining -= 1
+        return 0.0
+
+
+def _is_secondary_limit(response: httpx.Response) -> bool:
+    """A 403 whose message says a secondary rate limit was hit."""
+    try:
+        text = response.text.lower()
+    except httpx.ResponseNotRead:
+        return False
+    return any(marker in text for marker in SECONDARY_LIMIT_MARKERS)
+
+
+def _header_int(response: httpx.Response, name: str) -> Optional[int]:
+    try:
+        return int(response.headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+rate_limit_scheduler = RateLimitScheduler()
@@ -1,26 +1,32 @@
 import hashlib
 import hmac
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
-from fastapi import APIRouter, Request, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Request, HTTPException
 
+from ..clients import get_ai_client, get_github_client
 from ..config import settings
 from ..database import get_db
-from ..github.client import GitHubClient
+from ..review.admission import (
+    DEFER_BOTS,
+    LEVEL_NAMES,
+    REJECT,
+    SUMMARY_ONLY,
+    admission_controller,
+    is_bot_author,
+)
+from ..review.coordinator import review_registry
+from ..review.queue import review_queue
 from ..review.service import ReviewService
+from .deliveries import delivery_log
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
-def get_ai_client():
-    if settings.ai_api_key:
-        from ..ai.client import AIClient
-        return AIClient()
-    else:
-        from ..ai.mock_client import MockAIClient
-        return MockAIClient()
+class ReviewFailed(Exception):
+    """A review finished unsuccessfully; raised so the queue retries the job."""
 
 
 def verify_github_signature(payload_body: bytes, signature: str) -> bool:
@@ -39,30 +45,44 @@ async def process_pull_request_async(
         repository_full_name: str,
         pr_number: int,
         action: str,
-        pr_data: Dict[str, Any]
+        pr_data: Dict[str, Any],
+        summary_only: bool = False
 ) -> None:
     try:
-        github_client = GitHubClient()
+        github_client = get_github_client()
         ai_client = get_ai_client()
+        head_sha = (pr_data.get("head") or {}).get("sha", "")
+        incremental = settings.review_incremental and action == "synchronize"
 
         async for db_session in get_db():
             service = ReviewService(github_client, ai_client)
 
-            result = await service.review_pull_request(
-                repository=repository_full_name,
-                pr_number=pr_number,
-                db_session=db_session
+            result = await review_registry.run(
+                (repository_full_name, pr_number, head_sha),
+                lambda: service.review_pull_request(
+                    repository=repository_full_name,
+                    pr_number=pr_number,
+                    db_session=db_session,
+                    pr_payload=pr_data,
+                    incremental=incremental,
+                    summary_only=summary_only
+                ),
+                updated_at=pr_data.get("updated_at") or ""
             )
 
             logger.info(
                 f"PR #{pr_number} processed. "
                 f"Critical issues: {result.critical_issues_count}, "
-                f"Suggestions: {result.suggestions_count}, "
+                f"Suggestions: {result.suggestions_count}"
+                f"{' (truncated)' if result.findings_truncated else ''}, "
                 f"Success: {result.success}"
             )
+            if not result.success and not result.superseded:
+                raise ReviewFailed(f"Review of PR #{pr_number} failed: {result.summary}")
 
     except Exception as e:
         logger.error(f"Failed to process PR #{pr_number}: {e}")
+        raise
 
 
 async def process_push_event_async(
@@ -70,55 +90,122 @@ async def process_push_event_async(
         ref: str,
         commits: List[Dict[str, Any]],
         before: str,
-        after: str
+        after: str,
+        summary_only: bool = False
 ) -> None:
     try:
         branch = ref.replace("refs/heads/", "")
         logger.info(f"Processing push event for branch: {branch}")
 
-        github_client = GitHubClient()
-        pull_requests = await github_client.get_open_pull_requests(
+        github_client = get_github_client()
+        snapshots = await github_client.get_pull_requests_for_branch(
             repository_full_name,
-            head=branch
+            branch
         )
 
-        if not pull_requests:
+        if not snapshots:
             logger.info(f"No open PRs found for branch: {branch}")
             return
 
         ai_client = get_ai_client()
+        incremental = settings.review_incremental and bool(before.strip("0"))
+        failed = []
 
-        for pr in pull_requests:
-            pr_number = pr.get("number")
-            if not pr_number:
-                continue
-
+        for pr_data in snapshots:
             try:
                 async for db_session in get_db():
                     service = ReviewService(github_client, ai_client)
-                    result = await service.review_pull_request(
-                        repository=repository_full_name,
-                        pr_number=pr_number,
-                        db_session=db_session
+                    result = await review_registry.run(
+                        (repository_full_name, pr_data.pr_id, pr_data.head_commit),
+                        lambda: service.review_snapshot(
+                            pr_data, db_session, incremental=incremental,
+                            summary_only=summary_only
+                        ),
+                        updated_at=pr_data.updated_at
                     )
 
                     logger.info(
-                        f"PR #{pr_number} processed after push. "
+                        f"PR #{pr_data.pr_id} processed after push. "
                         f"Critical issues: {result.critical_issues_count}, "
                         f"Suggestions: {result.suggestions_count}"
+                        f"{' (truncated)' if result.findings_truncated else ''}"
                     )
+                    if not result.success and not result.superseded:
+                        failed.append(pr_data.pr_id)
             except Exception as e:
-                logger.error(f"Failed to process PR #{pr_number} after push: {e}")
+                logger.error(f"Failed to process PR #{pr_data.pr_id} after push: {e}")
+                failed.append(pr_data.pr_id)
+
+        if failed:
+            raise ReviewFailed(
+                f"Review of {len(failed)} of {len(snapshots)} PRs failed after push: "
+                + ", ".join(f"#{pr_id}" for pr_id in failed)
+            )
 
     except Exception as e:
         logger.error(f"Failed to process push event for {repository_full_name}: {e}")
+        raise
+
+
+async def run_pull_request_job(payload: Dict[str, Any]) -> None:
+    await process_pull_request_async(
+        payload["repository"], payload["pr_number"], payload["action"], payload["pull_request"],
+        summary_only=payload.get("summary_only", False)
+    )
+
+
+async def run_push_job(payload: Dict[str, Any]) -> None:
+    await process_push_event_async(
+        payload["repository"], payload["ref"], payload["commits"],
+        payload["before"], payload["after"],
+        summary_only=payload.get("summary_only", False)
+    )
+
+
+JOB_HANDLERS = {
+    "pull_request": run_pull_request_job,
+    "push": run_push_job,
+}
+
+
+def job_group(repository: str, branch: str) -> str:
+    """Queue group of the reviews triggered by one branch; they never run concurrently."""
+    return f"{repository}:{branch}"
+
+
+async def enqueue_job(
+        kind: str,
+        repository: str,
+        payload: Dict[str, Any],
+        pr_id: Optional[int] = None,
+        delay: float = 0.0,
+        group_key: Optional[str] = None,
+        updated_at: Optional[str] = None
+) -> int:
+    try:
+        return await review_queue.enqueue(
+            kind, repository, payload, pr_id=pr_id, delay=delay, group_key=group_key,
+            updated_at=updated_at
+        )
+    except Exception as e:
+        logger.error(f"Failed to queue {kind} job for {repository}: {e}")
+        raise HTTPException(status_code=503, detail="Review queue unavailable")
+
+
+async def admit() -> int:
+    """Current admission level; raises 503 with Retry-After when work is refused."""
+    level = await admission_controller.level()
+    if level >= REJECT:
+        raise HTTPException(
+            status_code=503,
+            detail="Review backlog is full, retry later",
+            headers={"Retry-After": str(admission_controller.retry_after)},
+        )
+    return level
 
 
 @router.post("/github")
-async def handle_github_webhook(
-        request: Request,
-        background_tasks: BackgroundTasks,
-) -> Dict[str, Any]:
+async def handle_github_webhook(request: Request) -> Dict[str, Any]:
     signature = request.headers.get("X-Hub-Signature-256")
     payload_body = await request.body()
 
@@ -127,13 +214,13 @@ async def handle_github_webhook(
         raise HTTPException(status_code=401, detail="Invalid signature")
 
     event_type = request.headers.get("X-GitHub-Event", "ping")
-    delivery_id = request.headers.get("X-GitHub-Delivery", "unknown")
+    delivery_id = request.headers.get("X-GitHub-Delivery")
 
     payload = await request.json()
 
     logger.info(
         f"GitHub webhook received: event={event_type}, "
-        f"delivery={delivery_id}"
+        f"delivery={delivery_id or 'unknown'}"
     )
 
     if event_type == "ping":
@@ -144,6 +231,23 @@ async def handle_github_webhook(
             "event": "ping"
         }
 
+    if delivery_id and not await delivery_log.claim(delivery_id, event_type):
+        return {
+            "status": "duplicate",
+            "delivery": delivery_id,
+            "event": event_type
+        }
+
+    try:
+        return await dispatch_event(event_type, payload)
+    except Exception:
+        # Nothing was queued; let GitHub's redelivery go through.
+        if delivery_id:
+            await delivery_log.forget(delivery_id)
+        raise
+
+
+async def dispatch_event(event_type: str, payload: Dict[str, Any]) -> Dict[str, Any]:
     if event_type == "pull_request":
         action = payload.get("action")
         pr_data = payload.get("pull_request", {})
@@ -151,24 +255,41 @@ async def handle_github_webhook(
         pr_number = pr_data.get("number")
 
         if action in ["opened", "reopened", "synchronize"]:
+            head = pr_data.get("head") or {}
+            head_repository = (head.get("repo") or {}).get("full_name") or repository
+            level = await admit()
+            deferred = level >= DEFER_BOTS and is_bot_author(pr_data)
             logger.info(
                 f"Processing PR #{pr_number} - {pr_data.get('title')} "
-                f"(action: {action})"
+                f"(action: {action}, mode: {LEVEL_NAMES[level]})"
             )
 
-            background_tasks.add_task(
-                process_pull_request_async,
+            job_id = await enqueue_job(
+                "pull_request",
                 repository,
-                pr_number,
-                action,
-                pr_data
+                {
+                    "repository": repository,
+                    "pr_number": pr_number,
+                    "action": action,
+                    "pull_request": pr_data,
+                    "summary_only": level >= SUMMARY_ONLY,
+                },
+                pr_id=pr_number,
+                delay=admission_controller.defer_seconds if deferred else 0.0,
+                group_key=(
+                    job_group(head_repository, head["ref"]) if head.get("ref")
+                    else f"{repository}#{pr_number}"
+                ),
+                updated_at=pr_data.get("updated_at")
             )
 
             return {
-                "status": "processing",
+                "status": "deferred" if deferred else "processing",
+                "job_id": job_id,
                 "pr_id": pr_number,
                 "repository": repository,
-                "action": action
+                "action": action,
+                "review_mode": LEVEL_NAMES[level]
             }
         else:
             return {
@@ -197,17 +318,25 @@ async def handle_github_webhook(
                 "reason": "No commits in push"
             }
 
-        background_tasks.add_task(
-            process_push_event_async,
+        level = await admit()
+        job_id = await enqueue_job(
+            "push",
             repository,
-            ref,
-            commits,
-            before,
-            after
+            {
+                "repository": repository,
+                "ref": ref,
+                "commits": commits,
+                "before": before,
+                "after": after,
+                "summary_only": level >= SUMMARY_ONLY,
+            },
+            group_key=job_group(repository, branch)
         )
 
         return {
             "status": "processing",
+            "job_id": job_id,
+            "review_mode": LEVEL_NAMES[level],
             "repository": repository,
             "branch": branch,
             "commits_count": len(commits)
@@ -0,0 +1,38 @@
+import importlib.util
+import logging
+from typing import Dict, Optional
+
+import httpx
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def create_http_client(
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 30.0,
+        base_url: str = ""
+) -> httpx.AsyncClient:
+    """Create an httpx client with the connection-pool settings from `Settings`."""
+    limits = httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry,
+    )
+    return httpx.AsyncClient(
+        headers=headers,
+        timeout=timeout,
+        base_url=base_url,
+        limits=limits,
+        http2=_http2_available(),
+    )
+
+
+def _http2_available() -> bool:
+    if not settings.http2_enabled:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP2_ENABLED is set but the 'h2' package is not installed, using HTTP/1.1")
+        return False
+    return True
@@ -5,9 +5,18 @@ from fastapi import FastAPI, Depends, HTTPException, status
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from .ai.cache import file_findings_cache, review_cache
+from .ai.limiter import ai_hedge_limiter, ai_limiter
+from .ai.routing import model_router
+from .clients import client_pool, get_github_client
 from .config import settings
 from .database import get_db, init_db
-from .github.webhook import router as webhook_router
+from .review.admission import admission_controller
+from .review.coordinator import review_registry
+from .review.queue import review_queue
+from .review.worker import ReviewWorker
+from .github.deliveries import delivery_log
+from .github.webhook import JOB_HANDLERS, router as webhook_router
 
 logging.basicConfig(
     level=logging.DEBUG if settings.debug else logging.INFO,
@@ -24,6 +33,8 @@ app = FastAPI(
 
 app.include_router(webhook_router, prefix="/webhooks", tags=["webhooks"])
 
+review_worker = ReviewWorker(review_queue, JOB_HANDLERS)
+
 
 @app.on_event("startup")
 async def startup_event():
@@ -32,12 +43,19 @@ async def startup_event():
 
     await init_db()
     logger.info("Database initialized")
+
+    await client_pool.start(warm_up=settings.http_warm_up)
     logger.info("GitHub webhook handler ready")
 
+    if settings.review_worker_in_process:
+        review_worker.start()
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down AI Code Reviewer Bot...")
+    await review_worker.stop()
+    await client_pool.close()
 
 
 @app.get("/")
@@ -61,9 +79,11 @@ async def health_check(db: AsyncSession = Depends(get_db)):
         result = await db.execute(text("SELECT 1"))
         result.scalar()
 
+        await admission_controller.level()
         return {
             "status": "healthy",
             "database": "connected",
+            "admission": admission_controller.status(),
             "timestamp": datetime.utcnow().isoformat()
         }
     except Exception as e:
@@ -74,6 +94,23 @@ async def health_check(db: AsyncSession = Depends(get_db)):
         )
 
 
+@app.get("/metrics")
+async def get_metrics():
+    return {
+        "github_cache": get_github_client().cache.stats(),
+        "github_rate_limit": get_github_client().scheduler.stats(),
+        "review_registry": review_registry.stats(),
+        "review_cache": review_cache.stats(),
+        "file_findings_cache": file_findings_cache.stats(),
+        "ai_limiter": ai_limiter.stats(),
+        "ai_hedge_limiter": ai_hedge_limiter.stats(),
+        "ai_routes": model_router.stats(),
+        "review_queue": await review_queue.stats(),
+        "review_worker": review_worker.stats(),
+        "webhook_deliveries": delivery_log.stats(),
+    }
+
+
 @app.get("/config")
 async def get_config():
     """Получение конфигурации (только для отладки)"""
@@ -0,0 +1,100 @@
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from ..config import settings
+from .queue import ReviewQueue, review_queue
+
+logger = logging.getLogger(__name__)
+
+FULL = 0
+SUMMARY_ONLY = 1
+DEFER_BOTS = 2
+REJECT = 3
+LEVEL_NAMES = ("full", "summary_only", "defer_bots", "reject")
+
+
+def is_bot_author(pr_data: Dict[str, Any]) -> bool:
+    user = pr_data.get("user") or {}
+    return user.get("type") == "Bot" or str(user.get("login", "")).endswith("[bot]")
+
+
+class AdmissionController:
+    """Decides how much review work the webhook accepts.
+
+    The level rises with the number of jobs ready to run and with the number
+    of jobs running, which is the number of reviews holding AI calls in all
+    worker processes. Both are read from the `review_jobs` table, so the web
+    process sees the load of a separate worker pool. Each list of thresholds
+    gives the value at which levels 1, 2 and 3 start, and the higher of the
+    two levels wins:
+
+    0. full reviews;
+    1. summary-only reviews on the summary model route;
+    2. as 1, and reviews of bot-authored PRs are deferred by `defer_seconds`;
+    3. new work is refused with 503 and `Retry-After`.
+
+    The counts are read from the database at most every `refresh_interval`
+    seconds.
+    """
+
+    def __init__(
+            self,
+            queue: ReviewQueue,
+            queue_depths: Optional[List[int]] = None,
+            running_jobs: Optional[List[int]] = None,
+            refresh_interval: Optional[float] = None,
+            retry_after: Optional[int] = None,
+            defer_seconds: Optional[float] = None
+    ):
+        self.queue = queue
+        self.queue_depths = queue_depths or settings.review_shed_queue_depths
+        self.running_jobs = running_jobs or settings.review_shed_running_jobs
+        self.refresh_interval = (
+            refresh_interval if refresh_interval is not None
+            else settings.review_shed_refresh_interval
+        )
+        self.retry_after = retry_after or settings.review_shed_retry_after
+        self.defer_seconds = (
+            defer_seconds if defer_seconds is not None else settings.review_shed_defer_seconds
+        )
+        self.queue_depth = 0
+        self.running = 0
+        self.current_level = FULL
+        self._checked_at: Optional[float] = None
+
+    async def level(self) -> int:
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= self.refresh_interval:
+            self._checked_at = now
+            try:
+                self.queue_depth, self.running = await self.queue.load()
+            except Exception as e:
+                logger.warning(f"Could not read review queue load: {e}")
+
+        level = self.level_for(self.queue_depth, self.running)
+        if level != self.current_level:
+            log = logger.warning if level > self.current_level else logger.info
+            log(
+                f"Review admission level {LEVEL_NAMES[self.current_level]} -> {LEVEL_NAMES[level]} "
+                f"(queued {self.queue_depth}, running {self.running})"
+            )
+            self.current_level = level
+        return level
+
+    def level_for(self, queue_depth: int, running: int) -> int:
+        return max(
+            sum(queue_depth >= threshold for threshold in self.queue_depths[:REJECT]),
+            sum(running >= threshold for threshold in self.running_jobs[:REJECT]),
+        )
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "level": self.current_level,
+            "mode": LEVEL_NAMES[self.current_level],
+            "queue_depth": self.queue_depth,
+            "running": self.running,
+        }
+
+
+admission_controller = AdmissionController(review_queue)
@@ -0,0 +1,191 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from ..config import settings
+from .service import ReviewResult
+
+logger = logging.getLogger(__name__)
+
+ReviewKey = Tuple[str, int, str]
+
+
+class ReviewRegistry:
+    """Single-flight registry of reviews keyed by (repository, PR number, head SHA).
+
+    A trigger for a commit that is already being reviewed waits for the
+    running review instead of starting another one. Successful results are
+    remembered for `ttl` seconds so late duplicates (the second event of a
+    push, GitHub redeliveries) are answered without a new review.
+
+    A newer head SHA for a PR supersedes the older one: its pending or
+    running review is cancelled, including the AI request it is waiting on.
+    "Newer" is decided by the PR's `updated_at` from the event, so a stale
+    event (a queue retry, a deferred job, a manual redelivery) never cancels
+    the review of the current head; it is dropped as superseded instead.
+    Events without `updated_at` supersede nothing. Reviews start after a
+    `quiet_period`, so a burst of pushes only reviews the last commit. A
+    review whose every caller was cancelled (its queue job was superseded
+    or lost its lease) is cancelled too.
+
+    The registry is per process; across worker processes, jobs of one
+    branch are serialized by the `ReviewQueue`, which also cancels the
+    running job of a PR when a newer head is queued.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, quiet_period: Optional[float] = None):
+        self.ttl = ttl if ttl is not None else settings.review_dedup_ttl
+        self.quiet_period = (
+            quiet_period if quiet_period is not None else settings.review_quiet_period
+        )
+        self._in_flight: Dict[ReviewKey, "asyncio.Task[ReviewResult]"] = {}
+        self._completed: "OrderedDict[ReviewKey, Tuple[float, ReviewResult]]" = OrderedDict()
+        self._superseded: "OrderedDict[ReviewKey, float]" = OrderedDict()
+        self._updated_at: Dict[ReviewKey, str] = {}
+        self._latest: "OrderedDict[Tuple[str, int], Tuple[float, str, str]]" = OrderedDict()
+        self._waiters: Dict[ReviewKey, int] = {}
+        self.started = 0
+        self.coalesced = 0
+        self.superseded = 0
+
+    async def run(
+            self,
+            key: ReviewKey,
+            review: Callable[[], Awaitable[ReviewResult]],
+            updated_at: str = ""
+    ) -> ReviewResult:
+        if not key[2]:
+            return await review()
+
+        now = time.monotonic()
+        self._expire(now)
+
+        if key in self._superseded or self._is_stale(key, updated_at):
+            logger.info(f"Review for {_describe(key)} was superseded by a newer commit")
+            return _superseded_result(key)
+        latest = self._latest.get(key[:2])
+        if updated_at and (latest is None or updated_at >= latest[1]):
+            self._latest[key[:2]] = (now, updated_at, key[2])
+            self._latest.move_to_end(key[:2])
+
+        completed = self._completed.get(key)
+        if completed is not None:
+            self.coalesced += 1
+            logger.info(f"Review for {_describe(key)} already completed, skipping")
+            return completed[1]
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            logger.info(f"Review for {_describe(key)} already running, attaching to it")
+        else:
+            self._supersede_older(key, updated_at)
+            self.started += 1
+            task = asyncio.ensure_future(self._after_quiet_period(review))
+            self._in_flight[key] = task
+            self._updated_at[key] = updated_at
+            task.add_done_callback(lambda done: self._finish(key, done))
+
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if task.cancelled() and not asyncio.current_task().cancelling():
+                return _superseded_result(key)
+            if self._waiters[key] == 1:
+                task.cancel()
+            raise
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._in_flight),
+            "completed": len(self._completed),
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "superseded": self.superseded,
+        }
+
+    async def _after_quiet_period(
+            self,
+            review: Callable[[], Awaitable[ReviewResult]]
+    ) -> ReviewResult:
+        if self.quiet_period > 0:
+            await asyncio.sleep(self.quiet_period)
+        return await review()
+
+    def _is_stale(self, key: ReviewKey, updated_at: str) -> bool:
+        latest = self._latest.get(key[:2])
+        return bool(
+            updated_at and latest is not None
+            and latest[2] != key[2] and updated_at < latest[1]
+        )
+
+    def _supersede_older(self, key: ReviewKey, updated_at: str) -> None:
+        repository, pr_number, _ = key
+        for other_key, task in list(self._in_flight.items()):
+            if other_key[:2] != (repository, pr_number) or other_key == key:
+                continue
+            other_updated_at = self._updated_at.get(other_key, "")
+            if not updated_at or not other_updated_at or updated_at < other_updated_at:
+                continue
+            logger.info(f"Cancelling review for {_describe(other_key)}, superseded by {key[2][:7]}")
+            self._superseded[other_key] = time.monotonic()
+            self.superseded += 1
+            task.cancel()
+
+    def _finish(self, key: ReviewKey, task: "asyncio.Task[ReviewResult]") -> None:
+        self._in_flight.pop(key, None)
+        self._updated_at.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        result = task.result()
+        if result.success:
+            self._completed[key] = (time.monotonic(), result)
+            self._completed.move_to_end(key)
+
+    def _expire(self, now: float) -> None:
+        while self._completed:
+            key, (finished_at, _) = next(iter(self._completed.items()))
+            if now - finished_at < self.ttl:
+                break
+            self._completed.popitem(last=False)
+
+        while self._superseded:
+            key, superseded_at = next(iter(self._superseded.items()))
+            if now - superseded_at < self.ttl:
+                break
+            self._superseded.popitem(last=False)
+
+        while self._latest:
+            _, (seen_at, _, _) = next(iter(self._latest.items()))
+            if now - seen_at < self.ttl:
+                break
+            self._latest.popitem(last=False)
+
+
+def _superseded_result(key: ReviewKey) -> ReviewResult:
+    repository, pr_number, _ = key
+    return ReviewResult(
+        pr_id=pr_number,
+        repository=repository,
+        review_text="",
+        summary="Superseded by a newer commit",
+        success=False,
+        critical_issues_count=0,
+        suggestions_count=0,
+        superseded=True
+    )
+
+
+def _describe(key: ReviewKey) -> str:
+    repository, pr_number, head_sha = key
+    return f"{repository}#{pr_number}@{head_sha[:7]}"
+
+
+review_registry = ReviewRegistry()
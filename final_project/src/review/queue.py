@@ -0,0 +1,411 @@
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, case, func, or_, select, true, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from ..config import settings
+from ..database import AsyncSessionLocal, ReviewJob
+from .scheduler import Candidate, FairScheduler, estimate_job_cost
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+SUPERSEDED = "superseded"
+
+
+@dataclass
+class QueuedJob:
+    id: int
+    kind: str
+    repository: str
+    pr_id: Optional[int]
+    payload: Dict[str, Any]
+    attempts: int
+    max_attempts: int
+    worker_id: str
+
+
+class ReviewQueue:
+    """Review jobs stored in the `review_jobs` table.
+
+    A worker claims a job by taking a lease on it. While the lease is held
+    the job is invisible to other workers; a worker that dies without
+    finishing lets the lease expire and the job becomes claimable again.
+    Failed jobs are retried with exponential backoff until `max_attempts`
+    claims have been made, then stay `failed`.
+
+    Jobs with the same `group_key` (one branch of one repository) never run
+    at the same time, in any process: a job is not claimable while another
+    job of its group is running. Enqueueing a job supersedes the queued
+    jobs of the same kind, group and PR, since the newest event covers them;
+    two PRs opened from one branch are still reviewed separately. A running
+    job of the same kind, group and PR is asked to stop: its worker notices
+    on the next heartbeat, cancels the handler and marks the job superseded.
+    Jobs carry the PR's `updated_at`, so an event older than the job it
+    would replace (a manual redelivery) supersedes and cancels nothing.
+
+    The order of claims comes from the `FairScheduler`. On PostgreSQL a
+    claim locks the job row with `FOR UPDATE SKIP LOCKED` and takes a
+    transaction-level advisory lock on the group, so workers in many
+    processes never wait on each other. Elsewhere (SQLite) it is a
+    conditional UPDATE that only one worker can win.
+    """
+
+    def __init__(
+            self,
+            lease_seconds: Optional[float] = None,
+            max_attempts: Optional[int] = None,
+            retry_base_delay: Optional[float] = None,
+            retry_max_delay: Optional[float] = None,
+            scheduler: Optional[FairScheduler] = None,
+            candidates_per_repository: int = 20
+    ):
+        self.lease_seconds = lease_seconds or settings.review_queue_lease_seconds
+        self.max_attempts = max_attempts or settings.review_queue_max_attempts
+        self.retry_base_delay = (
+            retry_base_delay if retry_base_delay is not None
+            else settings.review_queue_retry_base_delay
+        )
+        self.retry_max_delay = retry_max_delay or settings.review_queue_retry_max_delay
+        self.scheduler = scheduler or FairScheduler()
+        self.candidates_per_repository = candidates_per_repository
+        self._listeners: List[Callable[[], None]] = []
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        """Call `listener` after every enqueue, so local workers wake up without polling."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    async def enqueue(
+            self,
+            kind: str,
+            repository: str,
+            payload: Dict[str, Any],
+            pr_id: Optional[int] = None,
+            delay: float = 0.0,
+            group_key: Optional[str] = None,
+            updated_at: Optional[str] = None
+    ) -> int:
+        async with AsyncSessionLocal() as session:
+            job = ReviewJob(
+                kind=kind,
+                repository=repository,
+                pr_id=pr_id,
+                group_key=group_key,
+                head_updated_at=updated_at or None,
+                payload=json.dumps(payload),
+                cost=estimate_job_cost(kind, payload),
+                status=QUEUED,
+                max_attempts=self.max_attempts,
+                run_after=datetime.utcnow() + timedelta(seconds=delay),
+            )
+            session.add(job)
+            await session.flush()
+            job_id = job.id
+            superseded = cancelled = 0
+            if group_key is not None:
+                same_work = [
+                    ReviewJob.kind == kind,
+                    ReviewJob.group_key == group_key,
+                    ReviewJob.id != job_id,
+                ]
+                if pr_id is not None:
+                    same_work.append(ReviewJob.pr_id == pr_id)
+                superseded = (await session.execute(
+                    update(ReviewJob)
+                    .where(
+                        *same_work,
+                        ReviewJob.status == QUEUED,
+                        self._older_than(updated_at, or_equal=True),
+                    )
+                    .values(status=SUPERSEDED, last_error=f"Superseded by job #{job_id}")
+                )).rowcount
+                cancelled = (await session.execute(
+                    update(ReviewJob)
+                    .where(
+                        *same_work,
+                        ReviewJob.status == RUNNING,
+                        ReviewJob.cancel_requested.is_(False),
+                        self._older_than(updated_at, or_equal=False),
+                    )
+                    .values(cancel_requested=True, last_error=f"Superseded by job #{job_id}")
+                )).rowcount
+            await session.commit()
+
+        logger.info(
+            f"Queued {kind} job #{job_id} for {repository}"
+            + (f", superseding {superseded} queued jobs" if superseded else "")
+            + (f", cancelling {cancelled} running jobs" if cancelled else "")
+        )
+        for listener in list(self._listeners):
+            listener()
+        return job_id
+
+    async def claim(self, worker_id: str) -> Optional[QueuedJob]:
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(ReviewJob)
+                .where(self._expired(now), ReviewJob.attempts >= ReviewJob.max_attempts)
+                .values(status=FAILED, lease_owner=None, last_error="Lease expired")
+            )
+            candidates = [
+                Candidate(*row) for row in (await session.execute(self.candidates_query(now))).all()
+            ]
+            locking = session.get_bind().dialect.name == "postgresql"
+
+            claimed = None
+            for candidate in self.scheduler.order(candidates, now):
+                if locking:
+                    if candidate.group_key is not None and not (await session.execute(
+                        select(func.pg_try_advisory_xact_lock(func.hashtext(candidate.group_key)))
+                    )).scalar_one():
+                        continue
+                    claimed = await self._claim_locked(session, candidate.id, worker_id, now)
+                else:
+                    claimed = await self._claim_leased(session, candidate.id, worker_id, now)
+                if claimed is not None:
+                    self.scheduler.charge(candidate, now)
+                    break
+            await session.commit()
+        return claimed
+
+    def candidates_query(self, now: datetime):
+        """Claimable jobs for the scheduler: per repository, the cheapest and the oldest few."""
+        by_cost = func.row_number().over(
+            partition_by=ReviewJob.repository, order_by=(ReviewJob.cost, ReviewJob.id)
+        )
+        by_age = func.row_number().over(
+            partition_by=ReviewJob.repository, order_by=(ReviewJob.created_at, ReviewJob.id)
+        )
+        ranked = (
+            select(
+                ReviewJob.id, ReviewJob.repository, ReviewJob.cost, ReviewJob.created_at,
+                ReviewJob.group_key, by_cost.label("by_cost"), by_age.label("by_age"),
+            )
+            .where(self._claimable(now))
+            .subquery()
+        )
+        return (
+            select(
+                ranked.c.id, ranked.c.repository, ranked.c.cost, ranked.c.created_at,
+                ranked.c.group_key,
+            )
+            .where(or_(
+                ranked.c.by_cost <= self.candidates_per_repository,
+                ranked.c.by_age <= self.candidates_per_repository,
+            ))
+        )
+
+    def claim_query(self, job_id: int, now: datetime):
+        """The job, row-locked, if still claimable; a row locked by another worker is skipped."""
+        return (
+            select(ReviewJob)
+            .where(ReviewJob.id == job_id, self._claimable(now))
+            .with_for_update(skip_locked=True)
+        )
+
+    async def _claim_locked(
+            self,
+            session: AsyncSession,
+            job_id: int,
+            worker_id: str,
+            now: datetime
+    ) -> Optional[QueuedJob]:
+        job = (await session.execute(self.claim_query(job_id, now))).scalar_one_or_none()
+        if job is None:
+            return None
+        job.status = RUNNING
+        job.lease_owner = worker_id
+        job.lease_expires_at = now + timedelta(seconds=self.lease_seconds)
+        job.attempts += 1
+        await session.flush()
+        return self._to_queued(job, worker_id)
+
+    async def _claim_leased(
+            self,
+            session: AsyncSession,
+            job_id: int,
+            worker_id: str,
+            now: datetime
+    ) -> Optional[QueuedJob]:
+        """Claim without row locks (SQLite): the UPDATE only wins if the job is still claimable."""
+        result = await session.execute(
+            update(ReviewJob)
+            .where(ReviewJob.id == job_id, self._claimable(now))
+            .values(
+                status=RUNNING,
+                lease_owner=worker_id,
+                lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+                attempts=ReviewJob.attempts + 1,
+            )
+        )
+        if result.rowcount != 1:
+            return None
+        job = (await session.execute(
+            select(ReviewJob).where(ReviewJob.id == job_id)
+        )).scalar_one()
+        return self._to_queued(job, worker_id)
+
+    async def heartbeat(self, job: QueuedJob) -> bool:
+        """Extend the lease; False when it was lost or the job was asked to stop."""
+        return await self._update_owned(
+            job,
+            ReviewJob.cancel_requested.is_(False),
+            lease_expires_at=datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+        )
+
+    async def supersede(self, job: QueuedJob) -> bool:
+        """Settle a job that stopped because a newer one cancelled it."""
+        return await self._update_owned(
+            job,
+            ReviewJob.cancel_requested.is_(True),
+            status=SUPERSEDED,
+            lease_owner=None,
+            lease_expires_at=None
+        )
+
+    async def complete(self, job: QueuedJob) -> bool:
+        return await self._update_owned(
+            job, status=DONE, lease_owner=None, lease_expires_at=None, last_error=""
+        )
+
+    async def fail(self, job: QueuedJob, error: str) -> bool:
+        if job.attempts >= job.max_attempts:
+            logger.error(f"Job #{job.id} failed after {job.attempts} attempts: {error}")
+            return await self._update_owned(
+                job, status=FAILED, lease_owner=None, lease_expires_at=None, last_error=error
+            )
+
+        delay = self.retry_delay(job.attempts)
+        logger.warning(f"Job #{job.id} failed (attempt {job.attempts}), retrying in {delay:.0f}s: {error}")
+        return await self._update_owned(
+            job,
+            status=case((ReviewJob.cancel_requested.is_(True), SUPERSEDED), else_=QUEUED),
+            lease_owner=None,
+            lease_expires_at=None,
+            run_after=datetime.utcnow() + timedelta(seconds=delay),
+            last_error=error,
+        )
+
+    def retry_delay(self, attempts: int) -> float:
+        return min(self.retry_base_delay * 2 ** max(attempts - 1, 0), self.retry_max_delay)
+
+    async def load(self) -> Tuple[int, int]:
+        """Jobs ready to be claimed and jobs running, across all workers.
+
+        Jobs scheduled for later (retries, deferred bot reviews) are not
+        counted as ready.
+        """
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as session:
+            counts = dict((await session.execute(
+                select(ReviewJob.status, func.count())
+                .where(or_(
+                    and_(ReviewJob.status == QUEUED, ReviewJob.run_after <= now),
+                    ReviewJob.status == RUNNING,
+                ))
+                .group_by(ReviewJob.status)
+            )).all())
+        return counts.get(QUEUED, 0), counts.get(RUNNING, 0)
+
+    async def stats(self) -> Dict[str, Any]:
+        try:
+            async with AsyncSessionLocal() as session:
+                counts = dict((await session.execute(
+                    select(ReviewJob.status, func.count()).group_by(ReviewJob.status)
+                )).all())
+                oldest = (await session.execute(
+                    select(func.min(ReviewJob.created_at)).where(ReviewJob.status == QUEUED)
+                )).scalar_one()
+        except Exception as e:
+            logger.warning(f"Could not read review queue stats: {e}")
+            return {}
+
+        return {
+            **{status: counts.get(status, 0) for status in (QUEUED, RUNNING, DONE, FAILED, SUPERSEDED)},
+            "oldest_queued_age": (
+                round((datetime.utcnow() - oldest).total_seconds(), 1) if oldest else None
+            ),
+            "scheduler": self.scheduler.stats(),
+        }
+
+    async def _update_owned(self, job: QueuedJob, *conditions: Any, **values: Any) -> bool:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                update(ReviewJob)
+                .where(
+                    ReviewJob.id == job.id,
+                    ReviewJob.status == RUNNING,
+                    ReviewJob.lease_owner == job.worker_id,
+                    *conditions,
+                )
+                .values(**values)
+            )
+            await session.commit()
+        if result.rowcount != 1:
+            if not conditions:
+                logger.warning(f"Lost the lease on job #{job.id}")
+            return False
+        return True
+
+    @staticmethod
+    def _older_than(updated_at: Optional[str], or_equal: bool):
+        """Jobs for an older event than `updated_at`; all jobs when it is unknown."""
+        if not updated_at:
+            return true()
+        column = ReviewJob.head_updated_at
+        newest = column <= updated_at if or_equal else column < updated_at
+        return or_(column.is_(None), newest)
+
+    @staticmethod
+    def _expired(now: datetime):
+        return and_(ReviewJob.status == RUNNING, ReviewJob.lease_expires_at < now)
+
+    @classmethod
+    def _claimable(cls, now: datetime):
+        running = aliased(ReviewJob)
+        group_busy = (
+            select(running.id)
+            .where(
+                running.group_key == ReviewJob.group_key,
+                running.id != ReviewJob.id,
+                running.status == RUNNING,
+                running.lease_expires_at >= now,
+            )
+            .exists()
+        )
+        return and_(
+            or_(
+                and_(ReviewJob.status == QUEUED, ReviewJob.run_after <= now),
+                and_(cls._expired(now), ReviewJob.attempts < ReviewJob.max_attempts),
+            ),
+            or_(ReviewJob.group_key.is_(None), ~group_busy),
+        )
+
+    @staticmethod
+    def _to_queued(job: ReviewJob, worker_id: str) -> QueuedJob:
+        return QueuedJob(
+            id=job.id,
+            kind=job.kind,
+            repository=job.repository,
+            pr_id=job.pr_id,
+            payload=json.loads(job.payload or "{}"),
+            attempts=job.attempts,
+            max_attempts=job.max_attempts,
+            worker_id=worker_id,
+        )
+
+
+review_queue = ReviewQueue()
@@ -0,0 +1,113 @@
+import logging
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_job_cost(kind: str, payload: Dict[str, Any]) -> float:
+    """Expected cost of a review in changed-line units.
+
+    Uses `additions`, `deletions` and `changed_files` from the pull request
+    payload; every file adds a fixed overhead (fetching, prompt framing) and
+    every job a fixed base cost. A push does not say how large its PRs are,
+    so it gets the default cost.
+    """
+    pull_request = payload.get("pull_request") or {}
+    if kind != "pull_request" or "additions" not in pull_request:
+        return float(settings.review_default_job_cost)
+    lines = (pull_request.get("additions") or 0) + (pull_request.get("deletions") or 0)
+    files = pull_request.get("changed_files") or 0
+    return float(
+        settings.review_job_base_cost + lines + files * settings.review_job_file_cost
+    )
+
+
+@dataclass
+class Candidate:
+    id: int
+    repository: str
+    cost: float
+    created_at: datetime
+    group_key: Optional[str] = None
+
+
+class FairScheduler:
+    """Orders claimable jobs: weighted fair queuing across repositories,
+    shortest expected job first inside each repository.
+
+    Every repository has a virtual finish time that grows by cost / weight
+    for each job it is served, so a repository with 40 queued PRs gets its
+    share and no more. Inside a repository the cheapest job goes first;
+    waiting lowers a job's effective cost by `aging_rate` per second, so a
+    large job is not starved by a stream of small ones.
+
+    The state is per process; with several worker processes each one is
+    fair over the jobs it claims.
+    """
+
+    def __init__(
+            self,
+            weights: Optional[Dict[str, float]] = None,
+            aging_rate: Optional[float] = None,
+            window: int = 500
+    ):
+        self.weights = weights if weights is not None else dict(settings.review_repo_weights)
+        self.aging_rate = aging_rate if aging_rate is not None else settings.review_scheduler_aging_rate
+        self.virtual_time = 0.0
+        self._finish: Dict[str, float] = {}
+        self._waits: Deque[float] = deque(maxlen=window)
+
+    def order(self, candidates: List[Candidate], now: datetime) -> List[Candidate]:
+        """Candidates in the order they should be tried; does not change any state."""
+        by_repository: Dict[str, List[Candidate]] = {}
+        for candidate in candidates:
+            by_repository.setdefault(candidate.repository, []).append(candidate)
+        for jobs in by_repository.values():
+            jobs.sort(key=lambda job: (self.effective_cost(job, now), job.created_at, job.id))
+
+        start = {repository: self._start(repository) for repository in by_repository}
+        finish = dict(start)
+        positions = {repository: 0 for repository in by_repository}
+        ordered: List[Candidate] = []
+        while len(ordered) < len(candidates):
+            repository = min(
+                (r for r in by_repository if positions[r] < len(by_repository[r])),
+                key=lambda r: (finish[r], by_repository[r][positions[r]].created_at)
+            )
+            job = by_repository[repository][positions[repository]]
+            positions[repository] += 1
+            finish[repository] += job.cost / self._weight(repository)
+            ordered.append(job)
+        return ordered
+
+    def charge(self, candidate: Candidate, now: datetime) -> None:
+        """Record that `candidate` was claimed."""
+        start = self._start(candidate.repository)
+        self.virtual_time = start
+        self._finish[candidate.repository] = start + candidate.cost / self._weight(candidate.repository)
+        for repository in [r for r, f in self._finish.items() if f <= self.virtual_time]:
+            del self._finish[repository]
+        self._waits.append(max((now - candidate.created_at).total_seconds(), 0.0))
+
+    def effective_cost(self, candidate: Candidate, now: datetime) -> float:
+        waited = max((now - candidate.created_at).total_seconds(), 0.0)
+        return candidate.cost - waited * self.aging_rate
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._waits)
+        return {
+            "virtual_time": round(self.virtual_time, 1),
+            "repositories": len(self._finish),
+            "median_wait": round(waits[len(waits) // 2], 2) if waits else None,
+        }
+
+    def _start(self, repository: str) -> float:
+        return max(self.virtual_time, self._finish.get(repository, 0.0))
+
+    def _weight(self, repository: str) -> float:
+        return max(self.weights.get(repository, 1.0), 1e-6)
@@ -1,10 +1,19 @@
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Optional, Tuple
 
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..ai.models import ReviewAnalysis, to_analysis
+from ..database import Review
+from ..github.client import PullRequestData
+from ..github.rate_limit import Priority
+
 logger = logging.getLogger(__name__)
 
+REVIEWED_STATUSES = ("completed", "completed_summary")
+
 
 @dataclass
 class ReviewResult:
@@ -15,6 +24,8 @@ class ReviewResult:
     success: bool
     critical_issues_count: int
     suggestions_count: int
+    superseded: bool = False
+    findings_truncated: bool = False
 
 
 class ReviewService:
@@ -26,64 +37,272 @@ class ReviewService:
             self,
             repository: str,
             pr_number: int,
-            db_session: AsyncSession
+            db_session: AsyncSession,
+            pr_payload: Optional[Dict[str, Any]] = None,
+            incremental: bool = False,
+            summary_only: bool = False
     ) -> ReviewResult:
         try:
             logger.info(f"Starting review for PR #{pr_number} in {repository}")
 
-            pr_data = await self.github_client.get_pull_request(repository, pr_number)
+            if pr_payload:
+                pr_data = await self.github_client.get_pull_request_from_payload(
+                    repository, pr_payload
+                )
+            else:
+                pr_data = await self.github_client.get_pull_request(repository, pr_number)
+
+            return await self._review(
+                repository, pr_number, pr_data, db_session, incremental, summary_only
+            )
+
+        except Exception as e:
+            logger.error(f"Error reviewing PR #{pr_number}: {e}")
+            return self._error_result(repository, pr_number, f"Error: {e}")
+
+    async def review_snapshot(
+            self,
+            pr_data: PullRequestData,
+            db_session: AsyncSession,
+            incremental: bool = False,
+            summary_only: bool = False
+    ) -> ReviewResult:
+        """Review a PR snapshot that has already been fetched."""
+        try:
+            logger.info(f"Starting review for PR #{pr_data.pr_id} in {pr_data.repository}")
+            return await self._review(
+                pr_data.repository, pr_data.pr_id, pr_data, db_session, incremental, summary_only
+            )
+        except Exception as e:
+            logger.error(f"Error reviewing PR #{pr_data.pr_id}: {e}")
+            return self._error_result(pr_data.repository, pr_data.pr_id, f"Error: {e}")
 
+    async def _review(
+            self,
+            repository: str,
+            pr_number: int,
+            pr_data: PullRequestData,
+            db_session: AsyncSession,
+            incremental: bool = False,
+            summary_only: bool = False
+    ) -> ReviewResult:
+        # The push and pull_request events of one commit become two queue
+        # jobs, often run by different workers; only the first one comments.
+        reviewed = await self._last_review(
+            db_session, repository, pr_number, statuses=REVIEWED_STATUSES
+        )
+        head = pr_data.head_commit
+        if reviewed is not None and head and reviewed.head_commit == head:
+            logger.info(
+                f"PR #{pr_number} was already reviewed at {head[:7]}, "
+                f"not commenting again"
+            )
+            return ReviewResult(
+                pr_id=pr_number,
+                repository=repository,
+                review_text=reviewed.review_text,
+                summary=reviewed.summary,
+                success=True,
+                critical_issues_count=reviewed.critical_issues,
+                suggestions_count=reviewed.suggestions
+            )
+
+        gitattributes = await self._gitattributes(repository, pr_data.head_commit)
+        ai_analysis = None
+        if incremental:
+            ai_analysis = await self._analyze_increment(
+                repository, pr_number, pr_data, db_session, gitattributes, summary_only
+            )
+        if ai_analysis is None:
             ai_analysis = await self.ai_client.analyze_code_diff(
                 diff_text=pr_data.diff_text,
                 pr_title=pr_data.title,
                 repo_name=repository,
-                files_changed=pr_data.files_changed
+                files_changed=pr_data.files_changed,
+                gitattributes=gitattributes,
+                summary_only=summary_only
             )
+            ai_analysis = to_analysis(ai_analysis)
 
-            if not ai_analysis.get("success", False):
-                logger.error(f"AI analysis failed for PR #{pr_number}")
-                return ReviewResult(
-                    pr_id=pr_number,
-                    repository=repository,
-                    review_text="",
-                    summary="AI analysis failed",
-                    success=False,
-                    critical_issues_count=0,
-                    suggestions_count=0
-                )
+        if not ai_analysis.success:
+            logger.error(f"AI analysis failed for PR #{pr_number}")
+            await self._save_review(
+                db_session, repository, pr_number, pr_data.head_commit, ai_analysis, "", "failed"
+            )
+            return self._error_result(repository, pr_number, "AI analysis failed")
+
+        comment_text = await self.ai_client.generate_comment_text(ai_analysis)
+
+        comment_success = await self.github_client.add_comment_to_pr(
+            repository, pr_number, comment_text
+        )
+
+        if comment_success:
+            logger.info(f"Comment posted successfully to PR #{pr_number}")
+        else:
+            logger.error(f"Failed to post comment to PR #{pr_number}")
 
-            comment_text = await self.ai_client.generate_comment_text(ai_analysis)
+        critical_count = len(ai_analysis.critical_issues)
+        suggestions_count = len(ai_analysis.suggestions)
 
-            comment_success = await self.github_client.add_comment_to_pr(
-                repository, pr_number, comment_text
+        # A summary-only review is never the base of an incremental review,
+        # so the next push reviews its code in full.
+        if not comment_success:
+            status = "failed"
+        elif ai_analysis.summary_only:
+            status = "completed_summary"
+        else:
+            status = "completed"
+        await self._save_review(
+            db_session, repository, pr_number, pr_data.head_commit, ai_analysis,
+            comment_text, status
+        )
+
+        return ReviewResult(
+            pr_id=pr_number,
+            repository=repository,
+            review_text=comment_text,
+            summary=ai_analysis.summary,
+            success=comment_success,
+            critical_issues_count=critical_count,
+            suggestions_count=suggestions_count,
+            findings_truncated=bool(ai_analysis.truncated_lists)
+        )
+
+    async def _analyze_increment(
+            self,
+            repository: str,
+            pr_number: int,
+            pr_data: PullRequestData,
+            db_session: AsyncSession,
+            gitattributes: str = "",
+            summary_only: bool = False
+    ) -> Optional[ReviewAnalysis]:
+        """Review only the commits pushed since the last completed review.
+
+        Returns None when there is nothing to build on (no previous review,
+        same head, empty or failed compare), so the caller falls back to a
+        full review.
+        """
+        previous = await self._last_review(db_session, repository, pr_number)
+        if previous is None or not previous.head_commit or not pr_data.head_commit:
+            return None
+        if previous.head_commit == pr_data.head_commit:
+            return None
+
+        try:
+            download = await self.github_client.get_compare_diff(
+                repository, previous.head_commit, pr_data.head_commit
             )
+        except Exception as e:
+            logger.warning(f"Compare diff for PR #{pr_number} failed, doing a full review: {e}")
+            return None
 
-            if comment_success:
-                logger.info(f"Comment posted successfully to PR #{pr_number}")
-            else:
-                logger.error(f"Failed to post comment to PR #{pr_number}")
+        if not download.segments:
+            return None
 
-            critical_count = len(ai_analysis.get("critical_issues", []))
-            suggestions_count = len(ai_analysis.get("suggestions", []))
+        logger.info(
+            f"Incremental review of PR #{pr_number}: "
+            f"{previous.head_commit[:7]}..{pr_data.head_commit[:7]}, "
+            f"{len(download.segments)} files"
+        )
+        analysis = await self.ai_client.analyze_code_diff(
+            diff_text=download.text,
+            pr_title=pr_data.title,
+            repo_name=repository,
+            files_changed=[{"filename": s.filename} for s in download.segments],
+            previous_review=self._previous_review_text(previous),
+            gitattributes=gitattributes,
+            summary_only=summary_only
+        )
+        return replace(to_analysis(analysis), incremental={
+            "base": previous.head_commit,
+            "head": pr_data.head_commit,
+        })
 
-            return ReviewResult(
-                pr_id=pr_number,
-                repository=repository,
-                review_text=comment_text,
-                summary=ai_analysis.get("summary", ""),
-                success=comment_success,
-                critical_issues_count=critical_count,
-                suggestions_count=suggestions_count
+    async def _gitattributes(self, repository: str, ref: str) -> str:
+        """`.gitattributes` at the PR head, used to skip generated and vendored files.
+
+        Fetched at normal priority: the review waits for it, so it must not
+        be held back like background requests when the rate budget is low.
+        """
+        try:
+            text = await self.github_client.get_file_content(
+                repository, ".gitattributes", ref or None, priority=Priority.NORMAL
             )
+        except Exception as e:
+            logger.warning(f"Could not fetch .gitattributes of {repository}: {e}")
+            return ""
+        return text if isinstance(text, str) else ""
 
+    @staticmethod
+    def _previous_review_text(review: Review) -> str:
+        return (
+            f"Previous review of commit {review.head_commit[:7]}: {review.summary} "
+            f"({review.critical_issues} critical issues, {review.suggestions} suggestions). "
+            f"Only the changes made since that review are shown below."
+        )
+
+    @staticmethod
+    async def _last_review(
+            db_session: AsyncSession,
+            repository: str,
+            pr_number: int,
+            statuses: Tuple[str, ...] = ("completed",)
+    ) -> Optional[Review]:
+        try:
+            result = await db_session.execute(
+                select(Review)
+                .where(
+                    Review.repository == repository,
+                    Review.pr_id == pr_number,
+                    Review.status.in_(statuses),
+                )
+                .order_by(Review.created_at.desc(), Review.id.desc())
+                .limit(1)
+            )
+            return result.scalars().first()
         except Exception as e:
-            logger.error(f"Error reviewing PR #{pr_number}: {e}")
-            return ReviewResult(
+            logger.error(f"Could not load previous review of PR #{pr_number}: {e}")
+            return None
+
+    @staticmethod
+    async def _save_review(
+            db_session: AsyncSession,
+            repository: str,
+            pr_number: int,
+            head_commit: str,
+            analysis: ReviewAnalysis,
+            review_text: str,
+            status: str
+    ) -> None:
+        try:
+            db_session.add(Review(
                 pr_id=pr_number,
                 repository=repository,
-                review_text="",
-                summary=f"Error: {e}",
-                success=False,
-                critical_issues_count=0,
-                suggestions_count=0
-            )
+                head_commit=head_commit or "",
+                summary=analysis.summary,
+                review_text=review_text,
+                critical_issues=len(analysis.critical_issues),
+                suggestions=len(analysis.suggestions),
+                status=status,
+            ))
+            await db_session.commit()
+        except Exception as e:
+            logger.error(f"Could not store review of PR #{pr_number}: {e}")
+            try:
+                await db_session.rollback()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _error_result(repository: str, pr_number: int, summary: str) -> ReviewResult:
+        return ReviewResult(
+            pr_id=pr_number,
+            repository=repository,
+            review_text="",
+            summary=summary,
+            success=False,
+            critical_issues_count=0,
+            suggestions_count=0
+        )
@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from ..config import settings
+from .queue import QueuedJob, ReviewQueue
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class ReviewWorker:
+    """Runs jobs from a `ReviewQueue` with at most `concurrency` at a time.
+
+    Each job's lease is renewed every `poll_interval` while its handler
+    runs. If the lease is lost to another worker, the handler is cancelled
+    so the job never runs twice at once. If a newer job of the same PR asks
+    the job to stop, the handler is cancelled and the job is marked
+    superseded. A handler that raises sends the job back to the queue for
+    a retry.
+
+    `stop` stops claiming new jobs and waits up to `drain_timeout` for
+    running ones. Jobs still running after that are cancelled and their
+    leases expire, so another worker picks them up.
+    """
+
+    def __init__(
+            self,
+            queue: ReviewQueue,
+            handlers: Dict[str, JobHandler],
+            concurrency: Optional[int] = None,
+            poll_interval: Optional[float] = None,
+            drain_timeout: Optional[float] = None,
+            worker_id: Optional[str] = None
+    ):
+        self.queue = queue
+        self.handlers = handlers
+        self.concurrency = concurrency or settings.review_worker_concurrency
+        self.poll_interval = poll_interval or settings.review_worker_poll_interval
+        self.drain_timeout = (
+            drain_timeout if drain_timeout is not None else settings.review_worker_drain_timeout
+        )
+        self.worker_id = worker_id or default_worker_id()
+        self.completed = 0
+        self.failed = 0
+        self.lost = 0
+        self.superseded = 0
+        self._running: Set["asyncio.Task[None]"] = set()
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._stopping = False
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._task = asyncio.ensure_future(self.run())
+
+    async def run(self) -> None:
+        self._wakeup = asyncio.Event()
+        self.queue.add_listener(self._wakeup.set)
+        logger.info(f"Review worker {self.worker_id} started, concurrency {self.concurrency}")
+        try:
+            while not self._stopping:
+                if len(self._running) >= self.concurrency:
+                    await asyncio.wait(self._running, return_when=asyncio.FIRST_COMPLETED)
+                    continue
+
+                try:
+                    job = await self.queue.claim(self.worker_id)
+                except Exception as e:
+                    logger.error(f"Could not claim a review job: {e}")
+                    job = None
+
+                if job is None:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                task = asyncio.ensure_future(self._execute(job))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+        finally:
+            self.queue.remove_listener(self._wakeup.set)
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+        await self.drain()
+
+    async def drain(self) -> None:
+        if not self._running:
+            return
+        logger.info(f"Waiting up to {self.drain_timeout:.0f}s for {len(self._running)} review jobs")
+        _, pending = await asyncio.wait(self._running, timeout=self.drain_timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning(f"Cancelled {len(pending)} review jobs; their leases will expire")
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "running": len(self._running),
+            "concurrency": self.concurrency,
+            "completed": self.completed,
+            "failed": self.failed,
+            "lost": self.lost,
+            "superseded": self.superseded,
+        }
+
+    async def _execute(self, job: QueuedJob) -> None:
+        handler = self.handlers.get(job.kind)
+        if handler is None:
+            self.failed += 1
+            await self._settle(self.queue.fail(job, f"No handler for job kind '{job.kind}'"))
+            return
+
+        work = asyncio.ensure_future(handler(job.payload))
+        heartbeat = asyncio.ensure_future(self._heartbeat(job, work))
+        try:
+            await work
+        except asyncio.CancelledError:
+            if not work.cancelled() or asyncio.current_task().cancelling():
+                raise
+            if await self._settle(self.queue.supersede(job)):
+                self.superseded += 1
+                logger.info(f"Stopped job #{job.id}: superseded by a newer commit")
+            else:
+                self.lost += 1
+                logger.warning(f"Stopped job #{job.id}: its lease was lost to another worker")
+        except Exception as e:
+            self.failed += 1
+            await self._settle(self.queue.fail(job, str(e) or type(e).__name__))
+        else:
+            self.completed += 1
+            await self._settle(self.queue.complete(job))
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, job: QueuedJob, work: "asyncio.Future[None]") -> None:
+        while True:
+            await asyncio.sleep(min(self.queue.lease_seconds / 3, self.poll_interval))
+            try:
+                if not await self.queue.heartbeat(job):
+                    work.cancel()
+                    return
+            except Exception as e:
+                logger.warning(f"Could not renew the lease on job #{job.id}: {e}")
+
+    @staticmethod
+    async def _settle(update: Awaitable[bool]) -> bool:
+        try:
+            return await update
+        except Exception as e:
+            logger.error(f"Could not record a review job result: {e}")
+            return False
@@ -1,4 +1,5 @@
 import pytest
+import pytest_asyncio
 import asyncio
 from unittest.mock import AsyncMock, MagicMock
 import os
@@ -8,7 +9,8 @@ os.environ.update({
     "GITHUB_WEBHOOK_SECRET": "test_secret",
     "AI_BASE_URL": "https://api.test.com",
     "AI_API_KEY": "test_ai_key",
-    "POSTGRES_PASSWORD": "test_password"
+    "POSTGRES_PASSWORD": "test_password",
+    "WEBHOOK_DELIVERY_PERSIST": "false"
 })
 
 
@@ -19,6 +21,43 @@ def event_loop():
     loop.close()
 
 
+@pytest_asyncio.fixture
+async def temp_database(tmp_path, monkeypatch):
+    """A fresh SQLite database; call it with a module to point that module's sessions at it."""
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from final_project.src.database import Base
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/test.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine)
+
+    def use(module):
+        monkeypatch.setattr(module, "AsyncSessionLocal", sessions)
+        return module
+
+    yield use
+    await engine.dispose()
+
+
+@pytest.fixture
+def idle_review_queue(monkeypatch):
+    """An empty shared review queue, so app-level tests never open the real database."""
+    from final_project.src.review.queue import review_queue
+
+    monkeypatch.setattr(review_queue, "load", AsyncMock(return_value=(0, 0)))
+    monkeypatch.setattr(review_queue, "stats", AsyncMock(return_value={}))
+
+
+@pytest.fixture(autouse=True)
+def clear_webhook_deliveries():
+    from final_project.src.github.deliveries import delivery_log
+
+    delivery_log.clear()
+    yield
+
+
 @pytest.fixture
 def mock_db_session():
     session = AsyncMock()
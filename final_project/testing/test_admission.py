@@ -0,0 +1,91 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+def _controller(depth=0, running=0):
+    from final_project.src.review.admission import AdmissionController
+
+    queue = MagicMock()
+    queue.load = AsyncMock(return_value=(depth, running))
+    return AdmissionController(
+        queue, queue_depths=[10, 20, 30], running_jobs=[4, 8, 16],
+        refresh_interval=60, retry_after=90, defer_seconds=600
+    )
+
+
+def test_level_follows_the_higher_pressure_signal():
+    controller = _controller()
+
+    assert controller.level_for(0, 0) == 0
+    assert controller.level_for(10, 0) == 1
+    assert controller.level_for(25, 4) == 2
+    assert controller.level_for(5, 16) == 3
+    assert controller.level_for(1000, 0) == 3
+
+
+@pytest.mark.asyncio
+async def test_queue_load_is_read_at_most_once_per_refresh_interval():
+    controller = _controller(depth=25, running=3)
+
+    assert await controller.level() == 2
+    controller.queue.load.return_value = (0, 0)
+    assert await controller.level() == 2
+    assert controller.queue.load.await_count == 1
+    assert controller.status() == {
+        "level": 2, "mode": "defer_bots", "queue_depth": 25, "running": 3
+    }
+
+
+def test_is_bot_author():
+    from final_project.src.review.admission import is_bot_author
+
+    assert is_bot_author({"user": {"login": "dependabot[bot]", "type": "Bot"}})
+    assert is_bot_author({"user": {"login": "renovate[bot]"}})
+    assert not is_bot_author({"user": {"login": "alice", "type": "User"}})
+    assert not is_bot_author({})
+
+
+def _post_pull_request(user, delivery_id="d1"):
+    from final_project.src.main import app
+
+    return TestClient(app).post(
+        "/webhooks/github",
+        headers={"X-GitHub-Event": "pull_request", "X-GitHub-Delivery": delivery_id},
+        json={
+            "action": "opened",
+            "pull_request": {"number": 5, "title": "Bump", "user": user},
+            "repository": {"full_name": "owner/repo"},
+        },
+    )
+
+
+@patch('final_project.src.github.webhook.review_queue.enqueue', new_callable=AsyncMock)
+@patch('final_project.src.github.webhook.admission_controller.level', new_callable=AsyncMock)
+def test_webhook_defers_bot_pull_requests_under_load(mock_level, mock_enqueue):
+    mock_level.return_value = 2
+    mock_enqueue.return_value = 3
+
+    response = _post_pull_request({"login": "dependabot[bot]", "type": "Bot"})
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "deferred"
+    assert response.json()["review_mode"] == "defer_bots"
+    assert mock_enqueue.call_args.args[2]["summary_only"] is True
+    assert mock_enqueue.call_args.kwargs["delay"] > 0
+
+    _post_pull_request({"login": "alice", "type": "User"}, delivery_id="d2")
+    assert mock_enqueue.call_args.kwargs["delay"] == 0
+
+
+@patch('final_project.src.github.webhook.review_queue.enqueue', new_callable=AsyncMock)
+@patch('final_project.src.github.webhook.admission_controller.level', new_callable=AsyncMock)
+def test_webhook_refuses_work_with_retry_after(mock_level, mock_enqueue):
+    mock_level.return_value = 3
+
+    response = _post_pull_request({"login": "alice", "type": "User"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"].isdigit()
+    mock_enqueue.assert_not_called()
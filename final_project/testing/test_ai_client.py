@@ -0,0 +1,387 @@
+import asyncio
+import json
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+
+def _completion(content, finish_reason="stop"):
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = content
+    response.choices[0].finish_reason = finish_reason
+    return response
+
+
+def _analysis(summary="Fine", critical_issues=None, suggestions=None, score=80):
+    return json.dumps({
+        "success": True,
+        "summary": summary,
+        "critical_issues": critical_issues or [],
+        "suggestions": suggestions or [],
+        "overall_quality_score": score,
+    })
+
+
+@pytest.fixture
+def ai_client():
+    from final_project.src.ai.cache import ReviewCache
+    from final_project.src.ai.client import AIClient
+    from final_project.src.ai.limiter import AdaptiveLimiter
+
+    client = AIClient(
+        cache=ReviewCache(max_entries=16, ttl=60, persist=False),
+        file_cache=ReviewCache(max_entries=16, ttl=60, persist=False),
+        limiter=AdaptiveLimiter()
+    )
+    client.client = MagicMock()
+    client.client.chat.completions.create = AsyncMock(return_value=_completion(_analysis()))
+    return client
+
+
+@pytest.mark.asyncio
+async def test_analyze_code_diff_single_prompt(ai_client):
+    result = await ai_client.analyze_code_diff(
+        diff_text="diff --git a/a.py b/a.py\n+x\n",
+        pr_title="Test PR",
+        repo_name="owner/repo",
+        files_changed=[{"filename": "a.py", "changes": 1}]
+    )
+
+    assert result.success is True
+    ai_client.client.chat.completions.create.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_response_without_required_fields_is_a_failure(ai_client):
+    ai_client.client.chat.completions.create.return_value = _completion('{"summary": "x"}')
+
+    result = await ai_client.analyze_code_diff("diff --git a/a.py b/a.py\n+x\n", "PR", "o/r", [])
+
+    assert result.success is False
+    assert result.error == "Missing required fields in response"
+
+
+@pytest.mark.asyncio
+async def test_analyze_code_diff_chunks_large_diffs(ai_client):
+    ai_client.chunk_max_tokens = 50
+    ai_client.chunk_concurrency = 2
+    running = []
+    peak = []
+
+    async def create(**kwargs):
+        running.append(1)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.pop()
+        prompt = kwargs["messages"][1]["content"]
+        filename = "a.py" if "a/a.py" in prompt else "b.py"
+        return _completion(_analysis(
+            summary=f"Reviewed {filename}.",
+            critical_issues=[{"file": filename, "line": 1, "issue": "bug", "severity": "high"}]
+        ))
+
+    ai_client.client.chat.completions.create = AsyncMock(side_effect=create)
+    diff = "".join(
+        f"diff --git a/{name} b/{name}\n@@ -1 +1 @@\n" + "+code line\n" * 20
+        for name in ("a.py", "b.py")
+    )
+
+    result = await ai_client.analyze_code_diff(
+        diff_text=diff,
+        pr_title="Test PR",
+        repo_name="owner/repo",
+        files_changed=[{"filename": "a.py"}, {"filename": "b.py"}]
+    )
+
+    assert result.success is True
+    assert result.chunks == ai_client.client.chat.completions.create.await_count
+    assert result.chunks > 2
+    assert max(peak) <= 2
+    assert [issue.file for issue in result.critical_issues] == ["a.py", "b.py"]
+
+
+@pytest.mark.asyncio
+async def test_analyze_code_diff_reuses_cached_review_after_rebase(ai_client):
+    original = "diff --git a/a.py b/a.py\nindex 111..222 100644\n@@ -1,2 +1,2 @@ def f():\n+x\n"
+    rebased = "diff --git a/a.py b/a.py\nindex 333..444 100644\n@@ -10,2 +10,2 @@ def g():\n+x\n"
+
+    first = await ai_client.analyze_code_diff(original, "Test PR", "owner/repo", [])
+    second = await ai_client.analyze_code_diff(rebased, "Test PR", "owner/repo", [])
+
+    assert first == second
+    ai_client.client.chat.completions.create.assert_awaited_once()
+    assert ai_client.review_cache.stats()["hit_ratio"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_analyze_code_diff_does_not_cache_failures(ai_client):
+    ai_client.client.chat.completions.create.return_value = _completion("not json")
+
+    await ai_client.analyze_code_diff("diff --git a/a.py b/a.py\n+x\n", "PR", "owner/repo", [])
+    await ai_client.analyze_code_diff("diff --git a/a.py b/a.py\n+x\n", "PR", "owner/repo", [])
+
+    assert ai_client.client.chat.completions.create.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_analyze_code_diff_does_not_cache_reviews_with_failed_chunks(ai_client):
+    ai_client.chunk_max_tokens = 50
+
+    async def create(**kwargs):
+        if "b/b.py" in kwargs["messages"][1]["content"]:
+            raise RuntimeError("upstream 502")
+        return _completion(_analysis())
+
+    ai_client.client.chat.completions.create = AsyncMock(side_effect=create)
+    diff = "".join(
+        f"diff --git a/{name} b/{name}\n@@ -1 +1 @@\n" + "+code line\n" * 20
+        for name in ("a.py", "b.py")
+    )
+
+    first = await ai_client.analyze_code_diff(diff, "PR", "owner/repo", [])
+    calls = ai_client.client.chat.completions.create.await_count
+    second = await ai_client.analyze_code_diff(diff, "PR", "owner/repo", [])
+
+    assert first.failed_chunks > 0
+    assert second.failed_chunks == first.failed_chunks
+    assert ai_client.client.chat.completions.create.await_count == 2 * calls
+
+
+@pytest.mark.asyncio
+async def test_analyze_code_diff_only_sends_changed_files(ai_client):
+    def file_diff(name, body):
+        return f"diff --git a/{name} b/{name}\n@@ -1 +1 @@\n+{body}\n"
+
+    ai_client.client.chat.completions.create.return_value = _completion(_analysis(
+        summary="First pass.",
+        critical_issues=[{"file": "a.py", "line": 1, "issue": "bug in a", "severity": "high"}],
+        suggestions=[{"file": "b.py", "line": 1, "suggestion": "tidy b"}],
+        score=70
+    ))
+    await ai_client.analyze_code_diff(
+        file_diff("a.py", "one") + file_diff("b.py", "two"), "PR", "owner/repo",
+        [{"filename": "a.py"}, {"filename": "b.py"}]
+    )
+
+    ai_client.client.chat.completions.create.return_value = _completion(_analysis(
+        summary="Second pass.", score=90
+    ))
+    result = await ai_client.analyze_code_diff(
+        file_diff("a.py", "one") + file_diff("b.py", "changed"), "PR", "owner/repo",
+        [{"filename": "a.py"}, {"filename": "b.py"}]
+    )
+
+    second_prompt = ai_client.client.chat.completions.create.await_args.kwargs["messages"][1]["content"]
+    assert "b/b.py" in second_prompt
+    assert "b/a.py" not in second_prompt
+    assert [issue.issue for issue in result.critical_issues] == ["bug in a"]
+    assert result.suggestions == []
+    assert result.summary == "Second pass."
+    assert result.overall_quality_score == 80
+    assert result.cached_files == 1
+
+
+@pytest.mark.asyncio
+async def test_analyze_code_diff_includes_previous_review(ai_client):
+    diff = "diff --git a/a.py b/a.py\n+x\n"
+    await ai_client.analyze_code_diff(diff, "Test PR", "owner/repo", [], "Earlier: all good")
+
+    messages = ai_client.client.chat.completions.create.call_args.kwargs["messages"]
+    assert "Earlier: all good" in messages[-1]["content"]
+
+
+@pytest.mark.asyncio
+async def test_previous_review_and_omitted_files_are_separate_paragraphs(ai_client):
+    diff = (
+        "diff --git a/a.py b/a.py\n@@ -1 +1 @@\n+x = 1\n"
+        "diff --git a/yarn.lock b/yarn.lock\n@@ -1 +1 @@\n+lodash@4\n"
+    )
+    await ai_client.analyze_code_diff(
+        diff, "Test PR", "owner/repo", [], previous_review="Earlier: all good."
+    )
+
+    prompt = ai_client.client.chat.completions.create.call_args.kwargs["messages"][-1]["content"]
+    assert "Earlier: all good.\n\nOmitted from this diff" in prompt
+
+
+@pytest.mark.asyncio
+async def test_generate_comment_text_marks_incremental_update(ai_client):
+    comment = await ai_client.generate_comment_text({
+        "success": True,
+        "summary": "Delta",
+        "critical_issues": [],
+        "suggestions": [],
+        "incremental": {"base": "aaaaaaaaaa", "head": "bbbbbbbbbb"},
+    })
+
+    assert "(update)" in comment
+    assert "`aaaaaaa..bbbbbbb`" in comment
+
+
+class _CompletionStream:
+    """Stand-in for the openai AsyncStream of chat completion chunks."""
+
+    def __init__(self, text, piece_size=5):
+        self.pieces = [text[i:i + piece_size] for i in range(0, len(text), piece_size)]
+        self.sent = 0
+        self.closed = False
+
+    async def __aiter__(self):
+        for piece in self.pieces:
+            self.sent += 1
+            chunk = MagicMock()
+            chunk.choices = [MagicMock()]
+            chunk.choices[0].delta.content = piece
+            chunk.choices[0].finish_reason = None
+            yield chunk
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_streaming_analysis_parses_full_completion(ai_client):
+    ai_client.stream = True
+    ai_client.stream_max_findings = 0
+    stream = _CompletionStream(_analysis(
+        critical_issues=[{"file": "a.py", "line": 1, "issue": "bug"}],
+        suggestions=[{"file": "a.py", "line": 2, "suggestion": "rename"}],
+    ))
+    ai_client.client.chat.completions.create = AsyncMock(return_value=stream)
+
+    result = await ai_client.analyze_code_diff(
+        "diff --git a/a.py b/a.py\n+x\n", "Test PR", "owner/repo", []
+    )
+
+    assert result.success is True
+    assert len(result.critical_issues) == 1
+    assert len(result.suggestions) == 1
+    assert result.stopped_early is False
+    assert set(result.stream_timings) == {
+        "time_to_first_token", "time_to_first_finding", "total"
+    }
+    assert ai_client.client.chat.completions.create.call_args.kwargs["stream"] is True
+    assert stream.closed is True
+
+
+@pytest.mark.asyncio
+async def test_streaming_analysis_stops_after_enough_findings(ai_client):
+    ai_client.stream = True
+    ai_client.stream_max_findings = 2
+    suggestions = [{"file": "a.py", "line": i, "suggestion": f"s{i}"} for i in range(50)]
+    stream = _CompletionStream(_analysis(summary="Many", suggestions=suggestions, score=60))
+    ai_client.client.chat.completions.create = AsyncMock(return_value=stream)
+
+    result = await ai_client.analyze_code_diff(
+        "diff --git a/a.py b/a.py\n+x\n", "Test PR", "owner/repo", []
+    )
+
+    assert result.success is True
+    assert result.stopped_early is True
+    assert result.summary == "Many"
+    assert result.critical_issues == []
+    assert [s.line for s in result.suggestions] == [0, 1]
+    assert result.truncated_lists == ["suggestions"]
+    assert stream.sent < len(stream.pieces) / 2
+    assert stream.closed is True
+
+    comment = await ai_client.generate_comment_text(result)
+    assert "### 💡 Suggestions (2+)" in comment
+    assert "lower bounds" in comment
+    assert ai_client.review_cache.stats()["entries"] == 0
+    assert ai_client.file_cache.stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_streaming_analysis_reads_on_until_required_fields_arrive(ai_client):
+    ai_client.stream = True
+    ai_client.stream_max_findings = 2
+    suggestions = [{"file": "a.py", "line": i, "suggestion": f"s{i}"} for i in range(10)]
+    stream = _CompletionStream(json.dumps({
+        "critical_issues": [], "suggestions": suggestions, "success": True, "summary": "Late",
+    }))
+    ai_client.client.chat.completions.create = AsyncMock(return_value=stream)
+
+    result = await ai_client.analyze_code_diff(
+        "diff --git a/a.py b/a.py\n+x\n", "Test PR", "owner/repo", []
+    )
+
+    assert result.success is True
+    assert result.stopped_early is False
+    assert result.summary == "Late"
+    assert len(result.suggestions) == 10
+
+
+@pytest.mark.asyncio
+async def test_analyze_code_diff_omits_low_value_files(ai_client):
+    diff = (
+        "diff --git a/a.py b/a.py\n@@ -1 +1 @@\n+x = 1\n"
+        "diff --git a/yarn.lock b/yarn.lock\n@@ -1 +1 @@\n+lodash@4\n"
+        "diff --git a/gen/api.py b/gen/api.py\n@@ -1 +1 @@\n+y = 2\n"
+    )
+
+    result = await ai_client.analyze_code_diff(
+        diff, "Test PR", "owner/repo",
+        [{"filename": "a.py"}, {"filename": "yarn.lock"}, {"filename": "gen/api.py"}],
+        gitattributes="gen/** linguist-generated\n"
+    )
+
+    prompt = ai_client.client.chat.completions.create.call_args.kwargs["messages"][-1]["content"]
+    assert "+lodash@4" not in prompt
+    assert "+y = 2" not in prompt
+    assert "- yarn.lock: lockfile, whole file" in prompt
+    assert [item.reason for item in result.omitted_files] == ["lockfile", "generated"]
+    comment = await ai_client.generate_comment_text(result)
+    assert "Not reviewed (2)" in comment
+    assert "`gen/api.py` - generated" in comment
+
+
+@pytest.mark.asyncio
+async def test_truncated_response_is_completed_by_continuation(ai_client):
+    full = _analysis(suggestions=[{"file": "a.py", "line": i, "suggestion": "s"} for i in range(3)])
+    cut = len(full) - 40
+    ai_client.client.chat.completions.create = AsyncMock(side_effect=[
+        _completion(full[:cut], finish_reason="length"),
+        _completion(full[cut:]),
+    ])
+
+    result = await ai_client.analyze_code_diff(
+        "diff --git a/a.py b/a.py\n+x\n", "PR", "owner/repo", []
+    )
+
+    assert result.success is True
+    assert result.partial is False
+    assert len(result.suggestions) == 3
+    continuation = ai_client.client.chat.completions.create.call_args_list[1].kwargs
+    assert continuation["messages"][-2] == {"role": "assistant", "content": full[:cut]}
+    assert continuation["max_tokens"] == ai_client.continuation_max_tokens
+
+
+@pytest.mark.asyncio
+async def test_truncated_response_is_salvaged_as_partial(ai_client):
+    from final_project.src.ai.models import CriticalIssue
+
+    ai_client.continuation_max_tokens = 0
+    full = _analysis(
+        summary="Cut",
+        critical_issues=[{"file": "a.py", "line": 1, "issue": "bug"}],
+        suggestions=[{"file": "a.py", "line": 2, "suggestion": "rename it"}],
+    )
+    ai_client.client.chat.completions.create.return_value = _completion(
+        full[:full.index("rename")], finish_reason="length"
+    )
+
+    result = await ai_client.analyze_code_diff(
+        "diff --git a/a.py b/a.py\n+x\n", "PR", "owner/repo", []
+    )
+
+    assert result.success is True
+    assert result.partial is True
+    assert result.summary == "Cut"
+    assert result.critical_issues == [CriticalIssue(file="a.py", line=1, issue="bug")]
+    assert result.suggestions == []
+    assert "cut off" in await ai_client.generate_comment_text(result)
+
+    await ai_client.analyze_code_diff("diff --git a/a.py b/a.py\n+x\n", "PR", "owner/repo", [])
+    assert ai_client.client.chat.completions.create.await_count == 2
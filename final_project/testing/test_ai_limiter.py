@@ -0,0 +1,219 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+
+@pytest.fixture
+def limiter():
+    from final_project.src.ai.limiter import AdaptiveLimiter
+    return AdaptiveLimiter(initial_limit=2, min_limit=1, max_limit=4, latency_target=1.0)
+
+
+class _FakeOpenAIServer:
+    """OpenAI-compatible /chat/completions endpoint served through httpx.MockTransport."""
+
+    def __init__(self, delays=None, status_codes=None):
+        self.delays = delays or {}
+        self.status_codes = status_codes or {}
+        self.requests = {}
+        self.in_flight = 0
+        self.peak = 0
+
+    async def handler(self, request):
+        host = request.url.host
+        self.requests[host] = self.requests.get(host, 0) + 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays.get(host, 0.01))
+        finally:
+            self.in_flight -= 1
+        status_code = self.status_codes.get(host, 200)
+        if status_code != 200:
+            return httpx.Response(status_code, json={"error": {"message": "overloaded"}})
+        content = json.dumps({
+            "success": True,
+            "summary": f"Reviewed by {host}",
+            "critical_issues": [],
+            "suggestions": [],
+            "overall_quality_score": 90,
+        })
+        return httpx.Response(200, json={
+            "id": "chatcmpl-test",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "test-model",
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+        })
+
+    def client(self, limiter, hedge=False, hedge_limiter=None):
+        from openai import AsyncOpenAI
+        from final_project.src.ai.cache import ReviewCache
+        from final_project.src.ai.client import AIClient
+        from final_project.src.ai.limiter import AdaptiveLimiter
+        from final_project.src.ai.routing import ModelRoute, ModelRouter
+
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+        client = AIClient(
+            http_client=http_client,
+            cache=ReviewCache(max_entries=16, ttl=60, persist=False),
+            file_cache=ReviewCache(max_entries=16, ttl=60, persist=False),
+            limiter=limiter,
+            router=ModelRouter([], ModelRoute(name="default", model="test-model")),
+            hedge_limiter=hedge_limiter or AdaptiveLimiter(initial_limit=1, max_limit=1),
+        )
+        client.client = AsyncOpenAI(
+            api_key="test", base_url="http://primary.test/v1",
+            http_client=http_client, max_retries=0
+        )
+        if hedge:
+            client.hedge_client = AsyncOpenAI(
+                api_key="test", base_url="http://secondary.test/v1",
+                http_client=http_client, max_retries=0
+            )
+            client.hedge_min_samples = 5
+        return client
+
+
+def _seed_latency(client, latency, samples=10):
+    for _ in range(samples):
+        client.router.record(client.router.default, latency)
+
+
+def _diff(i):
+    return f"diff --git a/f{i}.py b/f{i}.py\n@@ -1 +1 @@\n+x = {i}\n"
+
+
+@pytest.mark.asyncio
+async def test_limiter_increases_additively_and_halves_on_overload(limiter):
+    for _ in range(4):
+        async with limiter.slot():
+            pass
+    grown = limiter.limit
+    assert 2 < grown <= 4
+
+    class Overloaded(Exception):
+        status_code = 429
+
+    with pytest.raises(Overloaded):
+        async with limiter.slot():
+            raise Overloaded()
+
+    assert limiter.limit == pytest.approx(grown / 2)
+    assert limiter.overloads == 1
+
+
+@pytest.mark.asyncio
+async def test_limiter_decreases_once_per_round(limiter):
+    limiter.limit = 4
+
+    async def slow_failure():
+        with pytest.raises(TimeoutError):
+            async with limiter.slot():
+                await asyncio.sleep(0.01)
+                raise TimeoutError()
+
+    await asyncio.gather(*(slow_failure() for _ in range(4)))
+
+    assert limiter.overloads == 4
+    assert limiter.decreases == 1
+    assert limiter.limit == 2
+
+
+@pytest.mark.asyncio
+async def test_fake_server_sees_bounded_concurrency(limiter):
+    server = _FakeOpenAIServer(delays={"primary.test": 0.05})
+    client = server.client(limiter)
+
+    results = await asyncio.gather(*(
+        client.analyze_code_diff(_diff(i), "PR", "owner/repo", []) for i in range(8)
+    ))
+
+    assert all(result.success for result in results)
+    assert server.requests["primary.test"] == 8
+    assert server.peak <= 4
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_fake_server_429_lowers_the_limit(limiter):
+    server = _FakeOpenAIServer(status_codes={"primary.test": 429})
+    client = server.client(limiter)
+
+    result = await client.analyze_code_diff(_diff(0), "PR", "owner/repo", [])
+
+    assert result.success is False
+    assert limiter.overloads == 1
+    assert limiter.limit == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged_to_secondary_endpoint(limiter):
+    server = _FakeOpenAIServer(delays={"primary.test": 2.0, "secondary.test": 0.01})
+    client = server.client(limiter, hedge=True)
+    _seed_latency(client, 0.05)
+
+    result = await asyncio.wait_for(
+        client.analyze_code_diff(_diff(0), "PR", "owner/repo", []), timeout=1.0
+    )
+
+    assert result.summary == "Reviewed by secondary.test"
+    assert server.requests == {"primary.test": 1, "secondary.test": 1}
+    assert (limiter.hedges_sent, limiter.hedges_won) == (1, 1)
+    assert limiter.in_flight == 0
+    assert len(client.hedge_limiter.latencies) == 1
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_before_enough_latency_samples(limiter):
+    server = _FakeOpenAIServer()
+    client = server.client(limiter, hedge=True)
+
+    result = await client.analyze_code_diff(_diff(0), "PR", "owner/repo", [])
+
+    assert result.summary == "Reviewed by primary.test"
+    assert "secondary.test" not in server.requests
+
+
+@pytest.mark.asyncio
+async def test_hedge_delay_starts_when_the_call_gets_a_slot(limiter):
+    server = _FakeOpenAIServer(delays={"primary.test": 0.01})
+    client = server.client(limiter, hedge=True)
+    _seed_latency(client, 0.1)
+    limiter.limit = 1
+
+    async def hold_slot():
+        async with limiter.slot():
+            await asyncio.sleep(0.3)
+
+    holder = asyncio.ensure_future(hold_slot())
+    await asyncio.sleep(0)
+    result = await client.analyze_code_diff(_diff(0), "PR", "owner/repo", [])
+    await holder
+
+    assert result.summary == "Reviewed by primary.test"
+    assert "secondary.test" not in server.requests
+    assert limiter.hedges_sent == 0
+
+
+@pytest.mark.asyncio
+async def test_hedge_is_skipped_when_the_hedge_budget_is_used(limiter):
+    from final_project.src.ai.limiter import AdaptiveLimiter
+
+    hedge_limiter = AdaptiveLimiter(initial_limit=1, max_limit=1)
+    server = _FakeOpenAIServer(delays={"primary.test": 0.2, "secondary.test": 0.01})
+    client = server.client(limiter, hedge=True, hedge_limiter=hedge_limiter)
+    _seed_latency(client, 0.05)
+
+    async with hedge_limiter.slot():
+        result = await client.analyze_code_diff(_diff(0), "PR", "owner/repo", [])
+
+    assert result.summary == "Reviewed by primary.test"
+    assert "secondary.test" not in server.requests
+    assert (limiter.hedges_sent, limiter.hedges_skipped) == (0, 1)
@@ -0,0 +1,92 @@
+def _file_diff(name, lines, prefix="+"):
+    text = f"diff --git a/{name} b/{name}\n--- a/{name}\n+++ b/{name}\n"
+    text += f"@@ -1,{len(lines)} +1,{len(lines)} @@\n"
+    text += "".join(f"{prefix}{line}\n" for line in lines)
+    return text
+
+
+def test_classify_file_by_path_and_content():
+    from final_project.src.ai.budget import classify_file
+
+    assert classify_file("web/package-lock.json") == "lockfile"
+    assert classify_file("static/app.min.js") == "minified"
+    assert classify_file("api/service_pb2.py") == "generated"
+    assert classify_file("ui/__snapshots__/button.test.js.snap") == "snapshot"
+    assert classify_file("vendor/lib/util.go") == "vendored"
+    assert classify_file("src/app.py") is None
+    assert classify_file("src/models.py", _file_diff("src/models.py", ["# @generated by sqlc"])) == "generated"
+    assert classify_file("src/bundle.js", _file_diff("src/bundle.js", ["x" * 1000])) == "minified"
+    assert classify_file("logo.png", "Binary files a/logo.png and b/logo.png differ\n") == "binary"
+    assert classify_file("src/diff.py", _file_diff("src/diff.py", ['if "Binary files " in text:'])) is None
+
+
+def test_long_lines_and_markers_in_source_files_do_not_hide_the_file():
+    from final_project.src.ai.budget import apply_budget, classify_file
+
+    query = "QUERY = '" + "SELECT id FROM users WHERE " * 30 + "'"
+    assert classify_file("src/db.py", _file_diff("src/db.py", [query])) is None
+
+    middle = _file_diff("src/api.py", ["x = 1"]).replace("@@ -1,1 +1,1 @@", "@@ -40,3 +40,3 @@")
+    middle += "+# Do not edit the handler below without a migration\n"
+    assert classify_file("src/api.py", middle) is None
+
+    diff = _file_diff("src/db.py", ["def load():"]) + "@@ -50,1 +50,1 @@\n+" + query + "\n"
+    result = apply_budget(diff, [], max_tokens=10_000)
+
+    assert "def load():" in result.diff_text
+    assert query not in result.diff_text
+    assert [(item.filename, item.reason, item.partial) for item in result.omitted] == [
+        ("src/db.py", "long lines", True)
+    ]
+
+
+def test_gitattributes_markers_override_path_patterns():
+    from final_project.src.ai.budget import GitAttributes, classify_file
+
+    attributes = GitAttributes(
+        "# linguist overrides\n"
+        "api/schema/** linguist-generated=true\n"
+        "*.gen.ts linguist-generated\n"
+        "vendor/ours/** -linguist-vendored\n"
+    )
+
+    assert classify_file("api/schema/user.py", attributes=attributes) == "generated"
+    assert classify_file("web/client.gen.ts", attributes=attributes) == "generated"
+    assert classify_file("vendor/ours/tool.py", attributes=attributes) is None
+    assert classify_file("vendor/theirs/tool.py", attributes=attributes) == "vendored"
+
+
+def test_apply_budget_keeps_most_valuable_hunks():
+    from final_project.src.ai.budget import apply_budget
+    from final_project.src.github.diff import estimate_tokens
+
+    source = _file_diff("src/auth.py", [f"check_password(user, {i})" for i in range(20)])
+    removal = _file_diff("src/old.py", [f"legacy_call({i})" for i in range(40)], prefix="-")
+    docs = _file_diff("README.md", [f"Line {i} of the docs" for i in range(40)])
+    lockfile = _file_diff("poetry.lock", ["hash = 'abc'"] * 50)
+    diff = source + removal + docs + lockfile
+    files = [{"filename": name, "changes": 1, "patch": ""} for name in
+             ("src/auth.py", "src/old.py", "README.md", "poetry.lock")]
+
+    result = apply_budget(diff, files, max_tokens=estimate_tokens(source) + 200)
+
+    assert result.diff_text.startswith(source)
+    assert "poetry.lock" not in result.diff_text
+    assert result.tokens <= estimate_tokens(source) + 200
+    reasons = {item.filename: item.reason for item in result.omitted}
+    assert reasons["poetry.lock"] == "lockfile"
+    assert reasons["README.md"] == "token budget"
+    assert "poetry.lock" not in [f["filename"] for f in result.files_changed]
+    assert "poetry.lock: lockfile, whole file" in result.omitted_summary()
+
+
+def test_apply_budget_is_noop_when_everything_fits():
+    from final_project.src.ai.budget import apply_budget
+
+    diff = _file_diff("a.py", ["x = 1"]) + _file_diff("b.py", ["y = 2"])
+
+    result = apply_budget(diff, [], max_tokens=10_000)
+
+    assert result.diff_text == diff
+    assert result.omitted == []
+    assert result.omitted_summary() == ""
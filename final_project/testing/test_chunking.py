@@ -0,0 +1,109 @@
+def _file_diff(name, hunks, lines_per_hunk=5):
+    text = f"diff --git a/{name} b/{name}\n--- a/{name}\n+++ b/{name}\n"
+    for hunk in range(hunks):
+        text += f"@@ -{hunk * 10},5 +{hunk * 10},5 @@\n"
+        text += "".join(f"+line {hunk}.{line} of {name}\n" for line in range(lines_per_hunk))
+    return text
+
+
+def test_chunk_diff_packs_small_files_together():
+    from final_project.src.ai.chunking import chunk_diff
+
+    diff = _file_diff("a.py", 1) + _file_diff("b.py", 1)
+
+    chunks = chunk_diff(diff, max_tokens=10_000)
+
+    assert chunks == [(diff, ["a.py", "b.py"])]
+
+
+def test_chunk_diff_splits_large_file_on_hunks():
+    from final_project.src.ai.chunking import chunk_diff
+    from final_project.src.github.diff import estimate_tokens
+
+    diff = _file_diff("big.py", 6) + _file_diff("small.py", 1)
+
+    chunks = chunk_diff(diff, max_tokens=100)
+
+    assert len(chunks) > 2
+    for chunk, filenames in chunks:
+        assert estimate_tokens(chunk) <= 100
+        assert chunk.startswith("diff --git ")
+    big_parts = [chunk for chunk, filenames in chunks if filenames == ["big.py"]]
+    assert all("+++ b/big.py\n@@" in part for part in big_parts)
+    assert sum(chunk.count("@@ -") for chunk, _ in chunks) == 7
+
+
+def test_merge_analyses_is_deterministic():
+    from final_project.src.ai.chunking import merge_analyses
+    from final_project.src.ai.models import ReviewAnalysis, to_analysis
+
+    first = {
+        "success": True,
+        "summary": "Part one.",
+        "critical_issues": [
+            {"file": "b.py", "line": 3, "issue": "leak", "severity": "medium"},
+            {"file": "a.py", "line": 1, "issue": "sql injection", "severity": "high"},
+        ],
+        "suggestions": [{"file": "a.py", "line": 2, "suggestion": "rename", "priority": "low"}],
+        "overall_quality_score": 60,
+    }
+    second = {
+        "success": True,
+        "summary": "Part two.",
+        "critical_issues": [{"file": "b.py", "line": 3, "issue": "leak", "severity": "medium"}],
+        "suggestions": [],
+        "overall_quality_score": 90,
+    }
+
+    first, second = to_analysis(first), to_analysis(second)
+    merged = merge_analyses([first, second], [1, 3])
+    reversed_merge = merge_analyses([second, first], [3, 1])
+
+    assert merged.critical_issues == reversed_merge.critical_issues
+    assert [issue.issue for issue in merged.critical_issues] == ["sql injection", "leak"]
+    assert merged.overall_quality_score == 82
+    assert merged.summary == "Reviewed in 2 parts:\n- Part one.\n- Part two."
+    assert merged.success is True
+
+
+def test_merge_analyses_lists_files_of_failed_chunks():
+    from final_project.src.ai.chunking import merge_analyses
+    from final_project.src.ai.models import ReviewAnalysis
+
+    merged = merge_analyses(
+        [ReviewAnalysis(summary="Fine."), ReviewAnalysis(summary="Fine."),
+         ReviewAnalysis.failure("timeout")],
+        [1, 1, 1],
+        [["a.py"], ["b.py"], ["b.py", "c.py"]]
+    )
+
+    assert merged.success is True
+    assert merged.summary == "Fine."
+    assert merged.failed_chunks == 1
+    assert [(f.filename, f.reason, f.partial) for f in merged.omitted_files] == [
+        ("b.py", "review failed", True), ("c.py", "review failed", False)
+    ]
+
+
+def test_merge_analyses_fails_when_most_chunks_failed():
+    from final_project.src.ai.chunking import merge_analyses
+    from final_project.src.ai.models import ReviewAnalysis
+
+    merged = merge_analyses(
+        [ReviewAnalysis(summary="Fine."), ReviewAnalysis.failure("timeout"),
+         ReviewAnalysis.failure("timeout")],
+        [1, 1, 1]
+    )
+
+    assert merged.success is False
+    assert merged.error == "2 of 3 chunks failed: timeout"
+
+
+def test_merge_analyses_fails_when_every_chunk_failed():
+    from final_project.src.ai.chunking import merge_analyses
+    from final_project.src.ai.models import ReviewAnalysis, to_analysis
+
+    merged = merge_analyses([ReviewAnalysis.failure("timeout")], [1])
+
+    assert merged.success is False
+    assert merged.error == "timeout"
@@ -0,0 +1,75 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+@pytest.fixture
+def client_pool():
+    from final_project.src.clients import ClientPool
+    return ClientPool()
+
+
+def test_client_pool_reuses_clients(client_pool):
+    assert client_pool.get_github_client() is client_pool.get_github_client()
+    assert client_pool.get_ai_client() is client_pool.get_ai_client()
+
+
+def test_client_pool_uses_mock_ai_client_without_key(client_pool):
+    with patch('final_project.src.clients.settings') as mock_settings:
+        mock_settings.ai_api_key = ""
+        from final_project.src.ai.mock_client import MockAIClient
+
+        assert isinstance(client_pool.get_ai_client(), MockAIClient)
+
+
+@pytest.mark.asyncio
+async def test_client_pool_start_warms_up_and_close_releases(client_pool):
+    github_client = MagicMock()
+    github_client.warm_up = AsyncMock()
+    github_client.close = AsyncMock()
+    ai_client = MagicMock()
+    ai_client.warm_up = AsyncMock()
+    ai_client.close = AsyncMock()
+    client_pool._github_client = github_client
+    client_pool._ai_client = ai_client
+
+    await client_pool.start()
+    await client_pool.close()
+
+    github_client.warm_up.assert_awaited_once()
+    ai_client.warm_up.assert_awaited_once()
+    github_client.close.assert_awaited_once()
+    ai_client.close.assert_awaited_once()
+    assert client_pool._github_client is None
+
+
+@pytest.mark.asyncio
+async def test_github_warm_up_failure_is_not_raised():
+    from final_project.src.github.client import GitHubClient
+
+    client = GitHubClient(http_client=AsyncMock())
+    client.client.get.side_effect = Exception("Network error")
+
+    await client.warm_up()
+
+    client.client.get.assert_called_once_with("https://api.github.com/rate_limit")
+
+
+def test_prompt_template_is_read_once():
+    from final_project.src.ai.client import load_prompt_template
+
+    load_prompt_template.cache_clear()
+    with patch('builtins.open', wraps=open) as mock_open:
+        first = load_prompt_template()
+        second = load_prompt_template()
+
+    assert first is second
+    assert mock_open.call_count == 1
+
+
+def test_http_client_falls_back_without_h2():
+    with patch('final_project.src.http_client.settings') as mock_settings, \
+            patch('final_project.src.http_client.importlib.util.find_spec', return_value=None):
+        mock_settings.http2_enabled = True
+        from final_project.src.http_client import _http2_available
+
+        assert _http2_available() is False
@@ -0,0 +1,27 @@
+def test_add_missing_columns_upgrades_an_existing_table(tmp_path):
+    from sqlalchemy import create_engine, inspect, text
+
+    from final_project.src.database import Base, add_missing_columns
+
+    engine = create_engine(f"sqlite:///{tmp_path}/old.db")
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE reviews (id INTEGER PRIMARY KEY, created_at DATETIME, "
+            "updated_at DATETIME, pr_id INTEGER, review_text TEXT, critical_issues INTEGER, "
+            "suggestions INTEGER, status VARCHAR(50))"
+        ))
+        connection.execute(text(
+            "INSERT INTO reviews (pr_id, review_text, status) VALUES (7, 'old', 'completed')"
+        ))
+        Base.metadata.create_all(connection)
+        add_missing_columns(connection)
+
+    with engine.connect() as connection:
+        columns = {column["name"] for column in inspect(connection).get_columns("reviews")}
+        indexes = {index["name"] for index in inspect(connection).get_indexes("reviews")}
+        row = connection.execute(text("SELECT repository, head_commit FROM reviews")).one()
+
+    assert {"repository", "head_commit", "summary"} <= columns
+    assert "ix_reviews_repository" in indexes
+    assert tuple(row) == ("", "")
+    engine.dispose()
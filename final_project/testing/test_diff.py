@@ -0,0 +1,45 @@
+def test_split_diff_by_file():
+    from final_project.src.github.diff import split_diff
+
+    diff = (
+        "diff --git a/src/app.py b/src/app.py\n"
+        "--- a/src/app.py\n"
+        "+++ b/src/app.py\n"
+        "@@ -1 +1 @@\n"
+        "-old\n"
+        "+new\n"
+        "diff --git a/docs/read me.md b/docs/read me.md\n"
+        "+text"
+    )
+
+    segments = split_diff(diff)
+
+    assert [segment.filename for segment in segments] == ["src/app.py", "docs/read me.md"]
+    assert "".join(segment.text for segment in segments) == diff
+
+
+def test_stream_parser_handles_lines_split_across_chunks():
+    from final_project.src.github.diff import DiffStreamParser
+
+    diff = b"diff --git a/a.py b/a.py\n+first\ndiff --git a/b.py b/b.py\n+second\n"
+    parser = DiffStreamParser()
+    for start in range(0, len(diff), 5):
+        assert parser.feed(diff[start:start + 5]) is True
+
+    download = parser.finish()
+
+    assert [segment.filename for segment in download.segments] == ["a.py", "b.py"]
+    assert download.truncated is False
+    assert download.bytes_read == len(diff)
+
+
+def test_stream_parser_stops_at_token_budget():
+    from final_project.src.github.diff import DiffStreamParser
+
+    parser = DiffStreamParser(max_tokens=10)
+    accepted = parser.feed(b"diff --git a/a.py b/a.py\n" + b"+" + b"x" * 100 + b"\n")
+    download = parser.finish()
+
+    assert accepted is False
+    assert download.truncated is True
+    assert download.text == "diff --git a/a.py b/a.py\n"
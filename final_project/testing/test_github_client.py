@@ -1,3 +1,6 @@
+import asyncio
+
+import httpx
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -6,8 +9,19 @@ from unittest.mock import AsyncMock, MagicMock, patch
 def github_client():
     with patch('final_project.src.github.client.settings') as mock_settings:
         mock_settings.github_access_token = "test_token"
+        mock_settings.github_request_timeout = 5.0
+        mock_settings.github_graphql_url = "http://graphql.test/graphql"
+        mock_settings.github_files_per_page = 100
+        mock_settings.github_files_max_pages = 30
+        mock_settings.github_cache_max_entries = 16
+        mock_settings.github_cache_persist = False
         from final_project.src.github.client import GitHubClient
-        client = GitHubClient()
+        from final_project.src.github.rate_limit import RateLimitScheduler
+        client = GitHubClient(
+            scheduler=RateLimitScheduler(
+                pacing_threshold=0.5, low_priority_reserve=0.1, max_wait=1.0
+            )
+        )
         client.client = AsyncMock()
         return client
 
@@ -35,6 +49,52 @@ async def test_get_open_pull_requests_failure(github_client):
     assert result == []
 
 
+def _route_get(pr=None, files=None):
+    """Side effect for client.get that answers by endpoint instead of call order."""
+    async def get(url, **kwargs):
+        handler = files if url.endswith("/files") else pr
+        if asyncio.iscoroutinefunction(handler):
+            return await handler(url, **kwargs)
+        return handler
+
+    return get
+
+
+class _StreamedDiff:
+    """Stand-in for the `client.stream(...)` context manager."""
+
+    def __init__(self, text="", chunk_size=16, delay=0.0):
+        self.body = text.encode()
+        self.chunk_size = chunk_size
+        self.delay = delay
+        self.chunks_sent = 0
+        self.cancelled = False
+        self.headers = {}
+        self.status_code = 200
+
+    def __call__(self, method, url, **kwargs):
+        return self
+
+    async def __aenter__(self):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    async def aiter_bytes(self):
+        for start in range(0, len(self.body), self.chunk_size):
+            self.chunks_sent += 1
+            yield self.body[start:start + self.chunk_size]
+
+
 @pytest.mark.asyncio
 async def test_get_pull_request(github_client):
     mock_pr_response = MagicMock()
@@ -45,17 +105,18 @@ async def test_get_pull_request(github_client):
         "base": {"sha": "base123"},
         "head": {"sha": "head123"}
     }
+    mock_pr_response.headers = {}
     mock_pr_response.raise_for_status = MagicMock()
 
     mock_files_response = MagicMock()
     mock_files_response.json.return_value = [{"filename": "test.py", "changes": 10}]
+    mock_files_response.headers = {}
+    mock_files_response.links = {}
 
-    mock_diff_response = MagicMock()
-    mock_diff_response.text = "diff --git a/test.py"
-
-    github_client.client.get.side_effect = [
-        mock_pr_response, mock_files_response, mock_diff_response
-    ]
+    github_client.client.stream = _StreamedDiff("diff --git a/test.py b/test.py\n")
+    github_client.client.get.side_effect = _route_get(
+        pr=mock_pr_response, files=mock_files_response
+    )
 
     from final_project.src.github.client import PullRequestData
     result = await github_client.get_pull_request("owner/repo", 123)
@@ -64,13 +125,110 @@ async def test_get_pull_request(github_client):
     assert result.pr_id == 123
     assert result.title == "Test PR"
     assert result.author == "testuser"
-    assert result.diff_text == "diff --git a/test.py"
+    assert result.diff_text == "diff --git a/test.py b/test.py\n"
+    assert result.diff_truncated is False
+    assert result.files_changed == [{"filename": "test.py", "changes": 10}]
+    assert set(result.timings) == {"pull_request", "files", "diff"}
+
+
+@pytest.mark.asyncio
+async def test_get_pull_request_cancels_siblings_on_failure(github_client):
+    cancelled = []
+
+    async def slow_get(url, **kwargs):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(url)
+            raise
+
+    async def failing_get(url, **kwargs):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    github_client.client.get.side_effect = _route_get(pr=failing_get, files=slow_get)
+    github_client.client.stream = _StreamedDiff(delay=10)
+
+    with pytest.raises(RuntimeError, match="boom"):
+        await github_client.get_pull_request("owner/repo", 123)
+
+    assert len(cancelled) == 1
+    assert github_client.client.stream.cancelled is True
+
+
+@pytest.mark.asyncio
+async def test_get_pull_request_timeout(github_client):
+    github_client.request_timeout = 0.01
+
+    async def slow_get(url, **kwargs):
+        await asyncio.sleep(1)
+
+    github_client.client.get.side_effect = slow_get
+    github_client.client.stream = _StreamedDiff(delay=1)
+
+    with pytest.raises(TimeoutError):
+        await github_client.get_pull_request("owner/repo", 123)
+
+
+@pytest.mark.asyncio
+async def test_get_pull_request_from_payload_skips_metadata(github_client):
+    mock_files_response = MagicMock()
+    mock_files_response.json.return_value = [{"filename": "test.py", "changes": 10}]
+    mock_files_response.headers = {}
+    mock_files_response.links = {}
+
+    github_client.client.stream = _StreamedDiff("diff --git a/test.py b/test.py\n")
+    github_client.client.get.side_effect = _route_get(files=mock_files_response)
+
+    payload = {
+        "number": 123,
+        "title": "Test PR",
+        "user": {"login": "testuser"},
+        "base": {"sha": "base123"},
+        "head": {"sha": "head123"},
+        "diff_url": "https://github.com/owner/repo/pull/123.diff"
+    }
+    result = await github_client.get_pull_request_from_payload("owner/repo", payload)
+
+    assert github_client.client.get.call_count == 1
+    assert result.title == "Test PR"
+    assert result.head_commit == "head123"
+    assert result.files_changed == [{"filename": "test.py", "changes": 10}]
+    assert "pull_request" not in result.timings
+
+
+@pytest.mark.asyncio
+async def test_get_pull_request_from_incomplete_payload_fetches_metadata(github_client):
+    mock_pr_response = MagicMock()
+    mock_pr_response.json.return_value = {
+        "title": "Test PR",
+        "user": {"login": "testuser"},
+        "base": {"sha": "base123"},
+        "head": {"sha": "head123"}
+    }
+    mock_pr_response.headers = {}
+    mock_files_response = MagicMock()
+    mock_files_response.json.return_value = []
+    mock_files_response.headers = {}
+    mock_files_response.links = {}
+    github_client.client.stream = _StreamedDiff("")
+    github_client.client.get.side_effect = _route_get(
+        pr=mock_pr_response, files=mock_files_response
+    )
+
+    result = await github_client.get_pull_request_from_payload(
+        "owner/repo", {"number": 123, "title": "Test PR"}
+    )
+
+    assert github_client.client.get.call_count == 2
+    assert result.author == "testuser"
 
 
 @pytest.mark.asyncio
 async def test_get_pr_files(github_client):
     mock_response = MagicMock()
     mock_response.json.return_value = [{"filename": "test.py", "changes": 5}]
+    mock_response.links = {}
     mock_response.raise_for_status = MagicMock()
     github_client.client.get.return_value = mock_response
 
@@ -80,18 +238,160 @@ async def test_get_pr_files(github_client):
     assert result[0]["filename"] == "test.py"
 
 
+def _files_page(files, next_url=None):
+    response = MagicMock()
+    response.json.return_value = files
+    response.headers = {}
+    response.links = {"next": {"url": next_url}} if next_url else {}
+    return response
+
+
+@pytest.mark.asyncio
+async def test_iter_pr_files_prefetches_next_page(github_client):
+    github_client.client.get.side_effect = [
+        _files_page([{"filename": "a.py"}, {"filename": "b.py"}], "https://next/2"),
+        _files_page([{"filename": "c.py"}]),
+    ]
+
+    seen = []
+    async for file in github_client.iter_pr_files("owner/repo", 123):
+        await asyncio.sleep(0)
+        seen.append((file["filename"], github_client.client.get.call_count))
+
+    assert [name for name, _ in seen] == ["a.py", "b.py", "c.py"]
+    assert seen[0][1] == 2
+    first_call = github_client.client.get.call_args_list[0]
+    assert first_call.kwargs["params"] == {"per_page": 100}
+
+
+@pytest.mark.asyncio
+async def test_iter_pr_files_respects_max_pages(github_client):
+    github_client.client.get.side_effect = [
+        _files_page([{"filename": "a.py"}], "https://next/2"),
+        _files_page([{"filename": "b.py"}], "https://next/3"),
+    ]
+
+    result = [
+        file async for file in github_client.iter_pr_files("owner/repo", 123, max_pages=2)
+    ]
+
+    assert [file["filename"] for file in result] == ["a.py", "b.py"]
+    assert github_client.client.get.call_count == 2
+
+
 @pytest.mark.asyncio
 async def test_get_pr_diff(github_client):
-    mock_response = MagicMock()
-    mock_response.text = "test diff content"
-    mock_response.raise_for_status = MagicMock()
-    github_client.client.get.return_value = mock_response
+    github_client.client.stream = _StreamedDiff("test diff content")
 
     result = await github_client.get_pr_diff("owner/repo", 123)
 
     assert result == "test diff content"
 
 
+@pytest.mark.asyncio
+async def test_stream_pr_diff_stops_at_byte_budget(github_client):
+    diff = "".join(
+        f"diff --git a/f{i}.py b/f{i}.py\n+line {i}\n" for i in range(100)
+    )
+    github_client.client.stream = _StreamedDiff(diff, chunk_size=32)
+
+    result = await github_client.stream_pr_diff("owner/repo", 123, max_bytes=100)
+
+    assert result.truncated is True
+    assert len(result.text) <= 100
+    assert [segment.filename for segment in result.segments] == ["f0.py", "f1.py", "f2.py"]
+    assert result.segments[-1].truncated is True
+    assert github_client.client.stream.chunks_sent < 10
+
+
+@pytest.mark.asyncio
+async def test_get_compare_diff(github_client):
+    calls = []
+    streamed = _StreamedDiff("diff --git a/a.py b/a.py\n+x\n")
+
+    def stream(method, url, **kwargs):
+        calls.append(url)
+        return streamed
+
+    github_client.client.stream = stream
+
+    result = await github_client.get_compare_diff("owner/repo", "old", "new")
+
+    assert calls == ["https://api.github.com/repos/owner/repo/compare/old...new"]
+    assert [segment.filename for segment in result.segments] == ["a.py"]
+
+
+def _json_response(body, status_code=200, etag=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = body
+    response.headers = {"ETag": etag} if etag else {}
+    response.links = {}
+    return response
+
+
+@pytest.mark.asyncio
+async def test_conditional_request_served_from_cache(github_client):
+    github_client.client.get.side_effect = [
+        _json_response({"name": "repo"}, etag='"abc"'),
+        _json_response(None, status_code=304),
+    ]
+
+    first = await github_client.get_repository_info("owner/repo")
+    second = await github_client.get_repository_info("owner/repo")
+
+    assert first == second == {"name": "repo"}
+    second_call = github_client.client.get.call_args_list[1]
+    assert second_call.kwargs["headers"] == {"If-None-Match": '"abc"'}
+    assert github_client.cache.stats() == {
+        "entries": 1, "hits": 1, "misses": 1, "revalidations": 1
+    }
+
+
+@pytest.mark.asyncio
+async def test_conditional_request_refreshes_changed_resource(github_client):
+    github_client.client.get.side_effect = [
+        _json_response({"name": "old"}, etag='"v1"'),
+        _json_response({"name": "new"}, etag='"v2"'),
+        _json_response(None, status_code=304),
+    ]
+
+    await github_client.get_repository_info("owner/repo")
+    changed = await github_client.get_repository_info("owner/repo")
+    cached = await github_client.get_repository_info("owner/repo")
+
+    assert changed == cached == {"name": "new"}
+    third_call = github_client.client.get.call_args_list[2]
+    assert third_call.kwargs["headers"] == {"If-None-Match": '"v2"'}
+
+
+@pytest.mark.asyncio
+async def test_response_cache_evicts_least_recently_used():
+    from final_project.src.github.client import ResponseCache, CachedResponse
+
+    cache = ResponseCache(max_entries=2)
+    await cache.set("a", CachedResponse(body=1, etag="a"))
+    await cache.set("b", CachedResponse(body=2, etag="b"))
+    await cache.get("a")
+    await cache.set("c", CachedResponse(body=3, etag="c"))
+
+    assert await cache.get("b") is None
+    assert (await cache.get("a")).body == 1
+    assert (await cache.get("c")).body == 3
+
+
+@pytest.mark.asyncio
+async def test_request_retries_after_secondary_rate_limit(github_client):
+    limited = _json_response({"message": "secondary rate limit"}, status_code=429)
+    limited.headers = {"Retry-After": "0"}
+    github_client.client.get.side_effect = [limited, _json_response({"name": "repo"})]
+
+    result = await github_client.get_repository_info("owner/repo")
+
+    assert result == {"name": "repo"}
+    assert github_client.client.get.call_count == 2
+
+
 @pytest.mark.asyncio
 async def test_add_comment_to_pr_success(github_client):
     mock_response = MagicMock()
@@ -128,10 +428,113 @@ async def test_get_repository_info(github_client):
     assert result["name"] == "repo"
 
 
+@pytest.mark.asyncio
+async def test_get_file_content(github_client):
+    github_client.client.get.return_value = _json_response(
+        {"encoding": "base64", "content": "Ki5sb2NrIGxpbmd1aXN0LWdlbmVyYXRlZAo=\n"}
+    )
+
+    result = await github_client.get_file_content("owner/repo", ".gitattributes", "abc")
+
+    assert result == "*.lock linguist-generated\n"
+    assert github_client.client.get.call_args.kwargs["params"] == {"ref": "abc"}
+
+
+@pytest.mark.asyncio
+async def test_get_file_content_missing(github_client):
+    request = httpx.Request("GET", "https://api.github.com/repos/owner/repo/contents/x")
+    response = _json_response({}, status_code=404)
+    response.raise_for_status.side_effect = httpx.HTTPStatusError(
+        "Not Found", request=request, response=httpx.Response(404, request=request)
+    )
+    github_client.client.get.return_value = response
+
+    assert await github_client.get_file_content("owner/repo", ".gitattributes") is None
+
+    sha = "a" * 40
+    assert await github_client.get_file_content("owner/repo", ".gitattributes", sha) is None
+    assert await github_client.get_file_content("owner/repo", ".gitattributes", sha) is None
+    assert github_client.client.get.await_count == 2
+
+
 @pytest.mark.asyncio
 async def test_close(github_client):
     github_client.client.aclose = AsyncMock()
 
     await github_client.close()
 
-    github_client.client.aclose.assert_called_once()
\ No newline at end of file
+    github_client.client.aclose.assert_called_once()
+
+
+def _local_github(graphql_body, requests):
+    """A local stand-in for the GitHub GraphQL and REST endpoints."""
+    def handler(request):
+        requests.append(request)
+        if request.url.path == "/graphql":
+            return httpx.Response(200, json=graphql_body)
+        if request.headers.get("Accept") == "application/vnd.github.v3.diff":
+            number = request.url.path.rsplit("/", 1)[1]
+            if number == "3":
+                return httpx.Response(500)
+            return httpx.Response(200, text=f"diff --git a/pr{number}.py b/pr{number}.py\n")
+        return httpx.Response(404)
+
+    from final_project.src.github.client import GitHubClient
+    from final_project.src.github.rate_limit import RateLimitScheduler
+    client = GitHubClient(
+        access_token="test_token",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        scheduler=RateLimitScheduler(pacing_threshold=0.5, low_priority_reserve=0.1, max_wait=1.0)
+    )
+    client.graphql_url = "http://localhost/graphql"
+    return client
+
+
+@pytest.mark.asyncio
+async def test_get_pull_requests_for_branch_uses_one_graphql_query():
+    graphql_body = {"data": {"repository": {"pullRequests": {"nodes": [
+        {
+            "number": number,
+            "title": f"PR {number}",
+            "url": f"https://github.com/owner/repo/pull/{number}",
+            "author": {"login": "dev"},
+            "baseRefOid": "base",
+            "headRefOid": "head",
+            "headRepository": {"nameWithOwner": "fork/repo" if number == 4 else "owner/repo"},
+            "updatedAt": "2024-05-01T10:00:00Z",
+            "files": {
+                "pageInfo": {"hasNextPage": False},
+                "nodes": [{"path": "a.py", "additions": 3, "deletions": 1, "changeType": "MODIFIED"}]
+            }
+        }
+        for number in (1, 2, 3, 4)
+    ]}}}}
+    requests = []
+    client = _local_github(graphql_body, requests)
+
+    snapshots = await client.get_pull_requests_for_branch("owner/repo", "feature")
+
+    assert [snapshot.pr_id for snapshot in snapshots] == [1, 2]
+    assert snapshots[0].files_changed == [{
+        "filename": "a.py", "status": "modified", "additions": 3, "deletions": 1, "changes": 4
+    }]
+    assert snapshots[1].diff_text == "diff --git a/pr2.py b/pr2.py\n"
+    assert snapshots[0].head_commit == "head"
+    assert snapshots[0].updated_at == "2024-05-01T10:00:00Z"
+    graphql_requests = [request for request in requests if request.url.path == "/graphql"]
+    assert len(graphql_requests) == 1
+    assert len(requests) == 4
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_get_pull_requests_for_branch_falls_back_to_rest():
+    requests = []
+    client = _local_github({"errors": [{"message": "Something went wrong"}]}, requests)
+    client.get_open_pull_requests = AsyncMock(return_value=[])
+
+    snapshots = await client.get_pull_requests_for_branch("owner/repo", "feature")
+
+    assert snapshots == []
+    client.get_open_pull_requests.assert_called_once_with("owner/repo", head="owner:feature")
+    await client.close()
@@ -3,6 +3,8 @@ from unittest.mock import AsyncMock, MagicMock, patch
 from fastapi.testclient import TestClient
 import asyncio
 
+pytestmark = pytest.mark.usefixtures("idle_review_queue")
+
 
 @pytest.fixture
 def client():
@@ -16,7 +18,7 @@ def client():
 
 
 @patch('final_project.src.github.webhook.get_ai_client')
-@patch('final_project.src.github.webhook.GitHubClient')
+@patch('final_project.src.github.webhook.get_github_client')
 @patch('final_project.src.github.webhook.get_db')
 @patch('final_project.src.github.webhook.ReviewService')
 def test_process_pull_request_async_success(
@@ -80,8 +82,9 @@ def test_handle_github_webhook_ping(mock_verify):
 
 
 @patch('final_project.src.github.webhook.verify_github_signature', return_value=True)
-@patch('final_project.src.github.webhook.process_pull_request_async')
-def test_handle_github_webhook_pr_opened(mock_process_async, mock_verify):
+@patch('final_project.src.github.webhook.review_queue.enqueue', new_callable=AsyncMock)
+def test_handle_github_webhook_pr_opened(mock_enqueue, mock_verify):
+    mock_enqueue.return_value = 7
     mock_settings = MagicMock()
     mock_settings.github_webhook_secret = "test_secret"
 
@@ -114,6 +117,84 @@ def test_handle_github_webhook_pr_opened(mock_process_async, mock_verify):
         data = response.json()
         assert data["status"] == "processing"
         assert data["pr_id"] == 123
+        assert data["job_id"] == 7
+        kind, repository, job_payload = mock_enqueue.call_args.args
+        assert (kind, repository) == ("pull_request", "owner/repo")
+        assert job_payload["pr_number"] == 123
+        assert job_payload["pull_request"]["title"] == "Test PR"
+        assert mock_enqueue.call_args.kwargs["group_key"] == "owner/repo#123"
+
+
+@patch('final_project.src.github.webhook.verify_github_signature', return_value=True)
+@patch('final_project.src.github.webhook.review_queue.enqueue', new_callable=AsyncMock)
+def test_handle_github_webhook_returns_503_when_queue_is_down(mock_enqueue, mock_verify):
+    mock_enqueue.side_effect = RuntimeError("database is locked")
+    from final_project.src.main import app
+    client = TestClient(app)
+
+    response = client.post(
+        "/webhooks/github",
+        headers={"X-GitHub-Event": "push", "X-GitHub-Delivery": "test_delivery"},
+        json={
+            "ref": "refs/heads/main",
+            "commits": [{"id": "abc"}],
+            "repository": {"full_name": "owner/repo"},
+        },
+    )
+
+    assert response.status_code == 503
+
+
+@patch('final_project.src.github.webhook.verify_github_signature', return_value=True)
+@patch('final_project.src.github.webhook.review_queue.enqueue', new_callable=AsyncMock)
+def test_handle_github_webhook_acknowledges_redeliveries(mock_enqueue, mock_verify):
+    mock_enqueue.side_effect = [RuntimeError("database is locked"), 8]
+    from final_project.src.main import app
+    client = TestClient(app)
+
+    def deliver():
+        return client.post(
+            "/webhooks/github",
+            headers={"X-GitHub-Event": "push", "X-GitHub-Delivery": "delivery-1"},
+            json={
+                "ref": "refs/heads/main",
+                "commits": [{"id": "abc"}],
+                "repository": {"full_name": "owner/repo"},
+            },
+        )
+
+    assert deliver().status_code == 503
+    assert deliver().json()["job_id"] == 8
+
+    response = deliver()
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "duplicate"
+    assert mock_enqueue.await_count == 2
+    assert client.get("/metrics").json()["webhook_deliveries"]["duplicates"] == 1
+
+
+@patch('final_project.src.github.webhook.review_queue.enqueue', new_callable=AsyncMock)
+@patch('final_project.src.github.webhook.admit', new_callable=AsyncMock)
+def test_handle_github_webhook_releases_delivery_on_unexpected_error(mock_admit, mock_enqueue):
+    mock_admit.side_effect = [RuntimeError("unexpected"), 0]
+    mock_enqueue.return_value = 9
+    from final_project.src.main import app
+    client = TestClient(app, raise_server_exceptions=False)
+
+    def deliver():
+        return client.post(
+            "/webhooks/github",
+            headers={"X-GitHub-Event": "push", "X-GitHub-Delivery": "delivery-2"},
+            json={
+                "ref": "refs/heads/main",
+                "commits": [{"id": "abc"}],
+                "repository": {"full_name": "owner/repo"},
+            },
+        )
+
+    assert deliver().status_code == 500
+    assert deliver().json()["job_id"] == 9
 
 
 def test_test_webhook():
@@ -1,7 +1,10 @@
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import pytest
 from fastapi.testclient import TestClient
 
+pytestmark = pytest.mark.usefixtures("idle_review_queue")
+
 
 def test_root():
     from final_project.src.main import app
@@ -15,8 +18,8 @@ def test_root():
     assert data["status"] == "running"
 
 
-@patch('final_project.src.main.get_db')
-def test_health_check_success(mock_get_db):
+def test_health_check_success():
+    from final_project.src.database import get_db
     from final_project.src.main import app
     client = TestClient(app)
 
@@ -31,13 +34,16 @@ def test_health_check_success(mock_get_db):
     async def mock_db_generator():
         yield mock_db_session
 
-    mock_get_db.return_value = mock_db_generator()
-
-    response = client.get("/health")
+    app.dependency_overrides[get_db] = mock_db_generator
+    try:
+        response = client.get("/health")
+    finally:
+        app.dependency_overrides.clear()
 
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "healthy"
+    assert data["admission"]["mode"] in ("full", "summary_only", "defer_bots", "reject")
 
 
 @patch('final_project.src.main.settings')
@@ -61,4 +67,14 @@ def test_get_config_production(mock_settings):
 
     response = client.get("/config")
 
-    assert response.status_code == 403
\ No newline at end of file
+    assert response.status_code == 403
+
+
+def test_metrics():
+    from final_project.src.main import app
+    client = TestClient(app)
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert set(response.json()["github_cache"]) == {"entries", "hits", "misses", "revalidations"}
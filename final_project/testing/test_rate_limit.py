@@ -0,0 +1,90 @@
+import time
+
+import httpx
+import pytest
+
+
+@pytest.fixture
+def scheduler():
+    from final_project.src.github.rate_limit import RateLimitScheduler
+    return RateLimitScheduler(pacing_threshold=0.5, low_priority_reserve=0.1, max_wait=0.5)
+
+
+def _response(status_code=200, **headers):
+    return httpx.Response(status_code, headers={k.replace("_", "-"): str(v) for k, v in headers.items()})
+
+
+def test_update_reads_rate_limit_headers(scheduler):
+    reset_at = int(time.time()) + 3600
+    limited = scheduler.update("token", _response(
+        X_RateLimit_Limit=5000, X_RateLimit_Remaining=4999, X_RateLimit_Reset=reset_at
+    ))
+
+    bucket = scheduler.bucket("token")
+    assert limited is False
+    assert (bucket.limit, bucket.remaining, bucket.reset_at) == (5000, 4999, reset_at)
+
+
+def test_update_honors_secondary_rate_limit(scheduler):
+    assert scheduler.update("token", _response(403, Retry_After=30)) is True
+    assert scheduler.bucket("token").blocked_until >= time.time() + 29
+
+
+def test_update_ignores_permission_errors(scheduler):
+    assert scheduler.update("token", _response(403)) is False
+
+
+def test_secondary_limit_without_headers_backs_off_exponentially(scheduler):
+    message = {"message": "You have exceeded a secondary rate limit. Please wait a few minutes."}
+    bucket = scheduler.bucket("token")
+
+    waits = []
+    for _ in range(3):
+        assert scheduler.update("token", httpx.Response(403, json=message)) is True
+        waits.append(round(bucket.blocked_until - time.time()))
+        bucket.blocked_until = 0.0
+
+    assert waits == [60, 120, 240]
+    scheduler.update("token", _response(200))
+    scheduler.update("token", httpx.Response(403, json=message))
+    assert round(bucket.blocked_until - time.time()) == 60
+
+
+@pytest.mark.asyncio
+async def test_acquire_waits_for_retry_after(scheduler):
+    scheduler.update("token", _response(429, Retry_After=0))
+    scheduler.bucket("token").blocked_until = time.time() + 0.05
+
+    started = time.monotonic()
+    await scheduler.acquire("token")
+
+    assert time.monotonic() - started >= 0.04
+    assert scheduler.stats()["delayed_calls"] == 1
+
+
+@pytest.mark.asyncio
+async def test_low_priority_calls_keep_off_the_reserve(scheduler):
+    from final_project.src.github.rate_limit import Priority, RateLimitExceeded
+
+    scheduler.update("token", _response(
+        X_RateLimit_Limit=100, X_RateLimit_Remaining=5, X_RateLimit_Reset=int(time.time()) + 3600
+    ))
+
+    with pytest.raises(RateLimitExceeded):
+        await scheduler.acquire("token", Priority.LOW)
+
+    await scheduler.acquire("token", Priority.HIGH)
+    assert scheduler.bucket("token").remaining == 4
+
+
+@pytest.mark.asyncio
+async def test_calls_are_paced_when_budget_runs_low(scheduler):
+    scheduler.update("token", _response(
+        X_RateLimit_Limit=100, X_RateLimit_Remaining=20, X_RateLimit_Reset=int(time.time()) + 1
+    ))
+
+    started = time.monotonic()
+    await scheduler.acquire("token")
+    await scheduler.acquire("token")
+
+    assert time.monotonic() - started >= 0.03
@@ -0,0 +1,56 @@
+import pytest
+
+
+def test_review_cache_key_depends_on_model_temperature_and_prompt():
+    from final_project.src.ai.cache import review_cache_key
+
+    diff = "diff --git a/a.py b/a.py\n+x\n"
+    base = review_cache_key(diff, "model-a", 0.2, "template")
+
+    assert review_cache_key(diff, "model-a", 0.2, "template") == base
+    assert review_cache_key(diff, "model-b", 0.2, "template") != base
+    assert review_cache_key(diff, "model-a", 0.7, "template") != base
+    assert review_cache_key(diff, "model-a", 0.2, "other template") != base
+    assert review_cache_key(diff + "+y\n", "model-a", 0.2, "template") != base
+
+
+def test_normalize_diff_ignores_shas_and_hunk_positions():
+    from final_project.src.ai.cache import normalize_diff
+
+    diff = "diff --git a/a.py b/a.py\nindex abc..def 100644\n@@ -3,4 +3,5 @@ class A:\n+x  \n"
+
+    assert normalize_diff(diff) == "diff --git a/a.py b/a.py\n@@\n+x"
+
+
+@pytest.mark.asyncio
+async def test_review_cache_expires_and_evicts():
+    from final_project.src.ai.cache import ReviewCache
+    from final_project.src.ai.models import ReviewAnalysis
+
+    cache = ReviewCache(max_entries=2, ttl=60, persist=False)
+    await cache.set("a", ReviewAnalysis(summary="a"), "model")
+    await cache.set("b", ReviewAnalysis(summary="b"), "model")
+    await cache.set("c", ReviewAnalysis(summary="c"), "model")
+
+    assert await cache.get("a") is None
+    assert await cache.get("c") == ReviewAnalysis(summary="c")
+
+    cache.ttl = -1
+    assert await cache.get("c") is None
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_review_cache_persists_to_database(temp_database):
+    from final_project.src.ai import cache as cache_module
+    from final_project.src.ai.models import ReviewAnalysis
+
+    temp_database(cache_module)
+
+    writer = cache_module.ReviewCache(max_entries=4, ttl=60, persist=True, db_max_entries=1)
+    await writer.set("old", ReviewAnalysis(summary="old"), "model")
+    await writer.set("new", ReviewAnalysis(summary="new"), "model")
+
+    reader = cache_module.ReviewCache(max_entries=4, ttl=60, persist=True)
+    assert await reader.get("new") == ReviewAnalysis(summary="new")
+    assert await reader.get("old") is None
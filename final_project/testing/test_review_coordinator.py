@@ -0,0 +1,174 @@
+import asyncio
+
+import pytest
+
+
+def _result(success=True):
+    from final_project.src.review.service import ReviewResult
+    return ReviewResult(
+        pr_id=1,
+        repository="owner/repo",
+        review_text="Comment",
+        summary="Summary",
+        success=success,
+        critical_issues_count=0,
+        suggestions_count=0
+    )
+
+
+def _counting_review(calls, result=None, delay=0.01):
+    async def review():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return result or _result()
+    return review
+
+
+@pytest.mark.asyncio
+async def test_concurrent_triggers_share_one_review():
+    from final_project.src.review.coordinator import ReviewRegistry
+
+    registry = ReviewRegistry(ttl=60, quiet_period=0)
+    calls = []
+    key = ("owner/repo", 1, "abc123")
+
+    first, second = await asyncio.gather(
+        registry.run(key, _counting_review(calls)),
+        registry.run(key, _counting_review(calls)),
+    )
+
+    assert first is second
+    assert len(calls) == 1
+    assert registry.stats()["coalesced"] == 1
+
+
+@pytest.mark.asyncio
+async def test_completed_review_is_reused_within_ttl():
+    from final_project.src.review.coordinator import ReviewRegistry
+
+    registry = ReviewRegistry(ttl=0.05, quiet_period=0)
+    calls = []
+    key = ("owner/repo", 1, "abc123")
+
+    await registry.run(key, _counting_review(calls))
+    await registry.run(key, _counting_review(calls))
+    await asyncio.sleep(0.06)
+    await registry.run(key, _counting_review(calls))
+
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_review_is_not_remembered():
+    from final_project.src.review.coordinator import ReviewRegistry
+
+    registry = ReviewRegistry(ttl=60, quiet_period=0)
+    calls = []
+    key = ("owner/repo", 1, "abc123")
+
+    await registry.run(key, _counting_review(calls, result=_result(success=False)))
+    await registry.run(key, _counting_review(calls))
+
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_reviews_without_head_sha_are_not_coalesced():
+    from final_project.src.review.coordinator import ReviewRegistry
+
+    registry = ReviewRegistry(ttl=60, quiet_period=0)
+    calls = []
+
+    await asyncio.gather(
+        registry.run(("owner/repo", 1, ""), _counting_review(calls)),
+        registry.run(("owner/repo", 1, ""), _counting_review(calls)),
+    )
+
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_newer_head_cancels_running_review():
+    from final_project.src.review.coordinator import ReviewRegistry
+
+    registry = ReviewRegistry(ttl=60, quiet_period=0)
+    cancelled = []
+
+    async def slow_review():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    old = asyncio.ensure_future(
+        registry.run(("owner/repo", 1, "old"), slow_review, updated_at="2024-05-01T10:00:00Z")
+    )
+    await asyncio.sleep(0.01)
+    new = await registry.run(
+        ("owner/repo", 1, "new"), _counting_review([]), updated_at="2024-05-01T10:05:00Z"
+    )
+    old_result = await old
+
+    assert new.success is True
+    assert old_result.superseded is True
+    assert cancelled == [True]
+    assert registry.stats()["superseded"] == 1
+
+    late_retry = await registry.run(("owner/repo", 1, "old"), _counting_review([]))
+    assert late_retry.superseded is True
+
+
+@pytest.mark.asyncio
+async def test_stale_event_does_not_cancel_current_head():
+    from final_project.src.review.coordinator import ReviewRegistry
+
+    registry = ReviewRegistry(ttl=60, quiet_period=0)
+    calls = []
+
+    current = asyncio.ensure_future(registry.run(
+        ("owner/repo", 1, "new"), _counting_review(calls, delay=0.05),
+        updated_at="2024-05-01T10:05:00Z"
+    ))
+    await asyncio.sleep(0.01)
+    stale = await registry.run(
+        ("owner/repo", 1, "old"), _counting_review(calls), updated_at="2024-05-01T10:00:00Z"
+    )
+
+    assert stale.superseded is True
+    assert (await current).success is True
+    assert len(calls) == 1
+    assert registry.stats()["superseded"] == 0
+
+
+@pytest.mark.asyncio
+async def test_events_without_updated_at_supersede_nothing():
+    from final_project.src.review.coordinator import ReviewRegistry
+
+    registry = ReviewRegistry(ttl=60, quiet_period=0)
+    calls = []
+
+    results = await asyncio.gather(
+        registry.run(("owner/repo", 1, "first"), _counting_review(calls)),
+        registry.run(("owner/repo", 1, "second"), _counting_review(calls)),
+    )
+
+    assert [result.superseded for result in results] == [False, False]
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_quiet_period_skips_intermediate_commits():
+    from final_project.src.review.coordinator import ReviewRegistry
+
+    registry = ReviewRegistry(ttl=60, quiet_period=0.05)
+    calls = []
+
+    results = await asyncio.gather(
+        registry.run(("owner/repo", 1, "first"), _counting_review(calls), "2024-05-01T10:00:00Z"),
+        registry.run(("owner/repo", 1, "second"), _counting_review(calls), "2024-05-01T10:00:01Z"),
+        registry.run(("owner/repo", 2, "other"), _counting_review(calls), "2024-05-01T10:00:00Z"),
+    )
+
+    assert [result.superseded for result in results] == [True, False, False]
+    assert len(calls) == 2
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+
+def test_decode_analysis_coerces_and_clamps_fields():
+    from final_project.src.ai.models import CriticalIssue, Suggestion, decode_analysis
+
+    analysis = decode_analysis(json.dumps({
+        "summary": "Mixed",
+        "overall_quality_score": "85/100",
+        "critical_issues": [
+            {"file": "a.py", "line": "L42-45", "issue": "bug", "severity": "Critical"},
+            {"path": "b.py", "line": -3, "issue": "leak", "severity": "whatever"},
+            "not a finding",
+        ],
+        "suggestions": [
+            {"filename": "c.py", "line": [7, 9], "suggestion": "rename", "type": "style",
+             "priority": "nit", "extra": {"ignored": True}},
+        ],
+        "unknown": 1,
+    }).encode("utf-8"))
+
+    assert analysis.success is True
+    assert analysis.overall_quality_score == 85
+    assert analysis.critical_issues == [
+        CriticalIssue(file="a.py", line=42, issue="bug", severity="high"),
+        CriticalIssue(file="b.py", line=0, issue="leak", severity="medium"),
+    ]
+    assert analysis.suggestions == [
+        Suggestion(file="c.py", line=7, suggestion="rename", kind="style", priority="low")
+    ]
+
+
+def test_decode_analysis_rejects_non_objects():
+    from final_project.src.ai.models import decode_analysis
+
+    with pytest.raises(ValueError):
+        decode_analysis("[1, 2]")
+    with pytest.raises(ValueError):
+        decode_analysis('{"summary": ')
+
+
+def test_encoded_analysis_round_trips():
+    from final_project.src.ai.budget import OmittedFile
+    from final_project.src.ai.models import (
+        ReviewAnalysis,
+        decode_analysis,
+        encode_analysis,
+        to_analysis,
+    )
+
+    analysis = to_analysis({
+        "summary": "Done",
+        "critical_issues": [{"file": "a.py", "line": 3, "issue": "bug", "suggestion": "fix"}],
+        "suggestions": [{"file": "a.py", "line": 4, "suggestion": "rename"}],
+    })
+    analysis.omitted_files = [OmittedFile("yarn.lock", "lockfile", 120)]
+    analysis.incremental = {"base": "abc", "head": "def"}
+
+    assert decode_analysis(encode_analysis(analysis)) == analysis
+    assert isinstance(analysis, ReviewAnalysis)
+    assert not hasattr(analysis, "__dict__")
@@ -0,0 +1,332 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def queue_module(temp_database):
+    from final_project.src.review import queue
+
+    return temp_database(queue)
+
+
+async def _job_row(queue_module, job_id):
+    from final_project.src.database import ReviewJob
+
+    async with queue_module.AsyncSessionLocal() as session:
+        return await session.get(ReviewJob, job_id)
+
+
+@pytest.mark.asyncio
+async def test_claimed_job_is_invisible_until_its_lease_expires(queue_module):
+    queue = queue_module.ReviewQueue(lease_seconds=60, max_attempts=3, retry_base_delay=0)
+    job_id = await queue.enqueue("pull_request", "owner/repo", {"pr_number": 1}, pr_id=1)
+
+    job = await queue.claim("worker-a")
+    assert job.id == job_id
+    assert job.payload == {"pr_number": 1}
+    assert job.attempts == 1
+    assert await queue.claim("worker-b") is None
+
+    queue.lease_seconds = -1
+    assert await queue.heartbeat(job) is True
+    stolen = await queue.claim("worker-b")
+    assert stolen.id == job_id
+    assert stolen.attempts == 2
+
+    assert await queue.complete(job) is False
+    assert await queue.complete(stolen) is True
+    assert (await _job_row(queue_module, job_id)).status == "done"
+    assert (await queue.stats())["done"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_job_is_retried_with_backoff_then_given_up(queue_module):
+    from final_project.src.database import ReviewJob
+
+    queue = queue_module.ReviewQueue(
+        lease_seconds=60, max_attempts=2, retry_base_delay=30, retry_max_delay=45
+    )
+    job_id = await queue.enqueue("push", "owner/repo", {})
+
+    await queue.fail(await queue.claim("worker"), "AI timeout")
+    row = await _job_row(queue_module, job_id)
+    assert row.status == "queued"
+    assert row.run_after > datetime.utcnow() + timedelta(seconds=25)
+    assert await queue.claim("worker") is None
+    assert [queue.retry_delay(n) for n in (1, 2, 3)] == [30, 45, 45]
+
+    async with queue_module.AsyncSessionLocal() as session:
+        (await session.get(ReviewJob, job_id)).run_after = datetime.utcnow()
+        await session.commit()
+    await queue.fail(await queue.claim("worker"), "still failing")
+    row = await _job_row(queue_module, job_id)
+    assert row.status == "failed"
+    assert row.attempts == 2
+    assert row.last_error == "still failing"
+
+
+@pytest.mark.asyncio
+async def test_worker_bounds_concurrency_and_retries_failures(queue_module):
+    from final_project.src.review.worker import ReviewWorker
+
+    queue = queue_module.ReviewQueue(lease_seconds=60, max_attempts=3, retry_base_delay=0)
+    running = 0
+    peak = 0
+    calls = []
+
+    async def handler(payload):
+        nonlocal running, peak
+        calls.append(payload["n"])
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.1)
+        running -= 1
+        if payload["n"] == 0 and calls.count(0) == 1:
+            raise RuntimeError("flaky")
+
+    worker = ReviewWorker(
+        queue, {"pull_request": handler}, concurrency=2, poll_interval=0.01, drain_timeout=1
+    )
+    for n in range(5):
+        await queue.enqueue("pull_request", "owner/repo", {"n": n})
+    worker.start()
+
+    for _ in range(200):
+        if worker.completed == 5:
+            break
+        await asyncio.sleep(0.01)
+    await worker.stop()
+
+    assert worker.completed == 5
+    assert worker.failed == 1
+    assert sorted(calls) == [0, 0, 1, 2, 3, 4]
+    assert peak == 2
+    stats = await queue.stats()
+    assert stats["done"] == 5
+    assert stats["queued"] == 0
+
+
+def test_postgres_claim_skips_locked_rows():
+    from sqlalchemy.dialects import postgresql
+
+    from final_project.src.review.queue import ReviewQueue
+
+    query = ReviewQueue(lease_seconds=60).claim_query(1, datetime.utcnow())
+    sql = str(query.compile(dialect=postgresql.dialect()))
+
+    assert "FOR UPDATE SKIP LOCKED" in sql
+
+
+@pytest.mark.asyncio
+async def test_concurrent_workers_never_claim_the_same_job(queue_module):
+    queues = [queue_module.ReviewQueue(lease_seconds=60) for _ in range(4)]
+    for n in range(10):
+        await queues[0].enqueue("pull_request", "owner/repo", {"n": n})
+
+    async def drain(queue, worker_id):
+        claimed = []
+        while (job := await queue.claim(worker_id)) is not None:
+            claimed.append(job.id)
+        return claimed
+
+    results = await asyncio.gather(*(drain(q, f"worker-{i}") for i, q in enumerate(queues)))
+    claimed = [job_id for ids in results for job_id in ids]
+
+    assert sorted(claimed) == list(range(1, 11))
+
+
+@pytest.mark.asyncio
+async def test_worker_retries_a_review_that_failed(queue_module, monkeypatch):
+    from unittest.mock import AsyncMock, MagicMock
+
+    from final_project.src.github import webhook
+    from final_project.src.review.service import ReviewResult
+    from final_project.src.review.worker import ReviewWorker
+
+    service = MagicMock()
+    service.review_pull_request = AsyncMock(return_value=ReviewResult(
+        pr_id=1, repository="owner/repo", review_text="", summary="AI analysis failed",
+        success=False, critical_issues_count=0, suggestions_count=0
+    ))
+
+    async def db():
+        yield AsyncMock()
+
+    monkeypatch.setattr(webhook, "ReviewService", MagicMock(return_value=service))
+    monkeypatch.setattr(webhook, "get_github_client", MagicMock())
+    monkeypatch.setattr(webhook, "get_ai_client", MagicMock())
+    monkeypatch.setattr(webhook, "get_db", db)
+
+    queue = queue_module.ReviewQueue(lease_seconds=60, max_attempts=3, retry_base_delay=30)
+    job_id = await queue.enqueue("pull_request", "owner/repo", {
+        "repository": "owner/repo", "pr_number": 1, "action": "opened", "pull_request": {}
+    }, pr_id=1)
+    worker = ReviewWorker(queue, webhook.JOB_HANDLERS, concurrency=1, poll_interval=0.01)
+    worker.start()
+
+    for _ in range(200):
+        if worker.failed:
+            break
+        await asyncio.sleep(0.01)
+    await worker.stop()
+
+    row = await _job_row(queue_module, job_id)
+    assert worker.completed == 0
+    assert row.status == "queued"
+    assert row.attempts == 1
+    assert "AI analysis failed" in row.last_error
+
+
+@pytest.mark.asyncio
+async def test_worker_stops_a_job_whose_lease_was_lost(queue_module):
+    from final_project.src.database import ReviewJob
+    from final_project.src.review.worker import ReviewWorker
+
+    queue = queue_module.ReviewQueue(lease_seconds=0.06, max_attempts=3)
+    cancelled = []
+
+    async def handler(payload):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    job_id = await queue.enqueue("pull_request", "owner/repo", {})
+    worker = ReviewWorker(queue, {"pull_request": handler}, concurrency=1, poll_interval=0.01)
+    worker.start()
+    for _ in range(100):
+        if worker.stats()["running"]:
+            break
+        await asyncio.sleep(0.01)
+
+    async with queue_module.AsyncSessionLocal() as session:
+        row = await session.get(ReviewJob, job_id)
+        row.lease_owner = "other-worker"
+        row.lease_expires_at = datetime.utcnow() + timedelta(minutes=5)
+        await session.commit()
+    for _ in range(100):
+        if worker.lost:
+            break
+        await asyncio.sleep(0.01)
+    await worker.stop()
+
+    assert cancelled == [True]
+    assert worker.lost == 1
+    assert worker.completed == worker.failed == 0
+    assert (await _job_row(queue_module, job_id)).lease_owner == "other-worker"
+
+
+@pytest.mark.asyncio
+async def test_load_counts_ready_and_running_jobs(queue_module):
+    queue = queue_module.ReviewQueue(lease_seconds=60)
+    await queue.enqueue("pull_request", "owner/repo", {})
+    await queue.enqueue("pull_request", "owner/repo", {})
+    await queue.enqueue("pull_request", "owner/bots", {}, delay=1800)
+
+    await queue.claim("worker")
+
+    assert await queue.load() == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_jobs_of_one_branch_run_one_at_a_time(queue_module):
+    queue = queue_module.ReviewQueue(lease_seconds=60)
+    push = await queue.enqueue("push", "owner/repo", {}, group_key="owner/repo:feature")
+    first = await queue.enqueue("pull_request", "owner/repo", {"n": 1}, group_key="owner/repo:feature")
+    second = await queue.enqueue("pull_request", "owner/repo", {"n": 2}, group_key="owner/repo:feature")
+    other = await queue.enqueue("pull_request", "owner/repo", {}, group_key="owner/repo:main")
+
+    assert (await _job_row(queue_module, first)).status == "superseded"
+    assert (await _job_row(queue_module, push)).status == "queued"
+
+    claimed = [await queue.claim(f"worker-{n}") for n in range(3)]
+    assert claimed[2] is None
+    assert other in {job.id for job in claimed[:2]}
+    feature = next(job for job in claimed[:2] if job.id != other)
+
+    await queue.complete(feature)
+    remaining = await queue.claim("worker-3")
+    assert {feature.id, remaining.id} == {push, second}
+
+
+@pytest.mark.asyncio
+async def test_prs_sharing_a_branch_do_not_supersede_each_other(queue_module):
+    queue = queue_module.ReviewQueue(lease_seconds=60)
+    group = "owner/repo:feature"
+    first = await queue.enqueue("pull_request", "owner/repo", {}, pr_id=1, group_key=group)
+    other = await queue.enqueue("pull_request", "owner/repo", {}, pr_id=2, group_key=group)
+    newer = await queue.enqueue("pull_request", "owner/repo", {}, pr_id=1, group_key=group)
+
+    assert (await _job_row(queue_module, first)).status == "superseded"
+    assert (await _job_row(queue_module, other)).status == "queued"
+    assert (await _job_row(queue_module, newer)).status == "queued"
+
+
+@pytest.mark.asyncio
+async def test_newer_head_cancels_the_running_review_of_its_pr(queue_module):
+    from final_project.src.review.coordinator import ReviewRegistry
+    from final_project.src.review.service import ReviewResult
+    from final_project.src.review.worker import ReviewWorker
+
+    queue = queue_module.ReviewQueue(lease_seconds=60)
+    registry = ReviewRegistry(ttl=60, quiet_period=0.5)
+    posted = []
+
+    async def handler(payload):
+        async def review():
+            posted.append(payload["sha"])
+            return ReviewResult(
+                pr_id=1, repository="owner/repo", review_text="", summary="",
+                success=True, critical_issues_count=0, suggestions_count=0
+            )
+
+        await registry.run(("owner/repo", 1, payload["sha"]), review, payload["updated_at"])
+
+    async def enqueue(sha, updated_at):
+        return await queue.enqueue(
+            "pull_request", "owner/repo", {"sha": sha, "updated_at": updated_at},
+            pr_id=1, group_key="owner/repo:feature", updated_at=updated_at
+        )
+
+    worker = ReviewWorker(queue, {"pull_request": handler}, concurrency=2, poll_interval=0.02)
+    first = await enqueue("AAA", "2026-01-01T00:00:01Z")
+    worker.start()
+    for _ in range(100):
+        if worker.stats()["running"]:
+            break
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.2)
+    stale = await enqueue("OLD", "2026-01-01T00:00:00Z")
+    second = await enqueue("BBB", "2026-01-01T00:00:02Z")
+    for _ in range(200):
+        if worker.completed:
+            break
+        await asyncio.sleep(0.01)
+    await worker.stop()
+
+    assert posted == ["BBB"]
+    assert worker.superseded == 1
+    assert (await _job_row(queue_module, first)).status == "superseded"
+    assert (await _job_row(queue_module, stale)).status == "superseded"
+    assert (await _job_row(queue_module, second)).status == "done"
+
+
+@pytest.mark.asyncio
+async def test_stale_event_does_not_cancel_the_running_job(queue_module):
+    queue = queue_module.ReviewQueue(lease_seconds=60)
+    group = "owner/repo:feature"
+    await queue.enqueue(
+        "pull_request", "owner/repo", {}, pr_id=1, group_key=group,
+        updated_at="2026-01-01T00:00:02Z"
+    )
+    job = await queue.claim("worker")
+
+    await queue.enqueue(
+        "pull_request", "owner/repo", {}, pr_id=1, group_key=group,
+        updated_at="2026-01-01T00:00:01Z"
+    )
+
+    assert await queue.heartbeat(job) is True
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+
+def _candidate(job_id, repository, cost, age=0.0, now=None):
+    from final_project.src.review.scheduler import Candidate
+
+    now = now or datetime(2024, 1, 1, 12, 0, 0)
+    return Candidate(job_id, repository, float(cost), now - timedelta(seconds=age))
+
+
+def test_estimate_job_cost_uses_pull_request_size():
+    from final_project.src.review.scheduler import estimate_job_cost
+
+    small = estimate_job_cost("pull_request", {"pull_request": {
+        "additions": 1, "deletions": 0, "changed_files": 1
+    }})
+    large = estimate_job_cost("pull_request", {"pull_request": {
+        "additions": 4000, "deletions": 1000, "changed_files": 80
+    }})
+
+    assert small < large
+    assert estimate_job_cost("push", {}) == estimate_job_cost("pull_request", {"pull_request": {}})
+
+
+def test_repositories_share_fairly_and_small_jobs_go_first():
+    from final_project.src.review.scheduler import FairScheduler
+
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    scheduler = FairScheduler(weights={}, aging_rate=0)
+    candidates = [
+        _candidate(1, "bot/monorepo", 500, age=60),
+        _candidate(2, "bot/monorepo", 100, age=50),
+        _candidate(3, "bot/monorepo", 300, age=40),
+        _candidate(4, "bot/monorepo", 200, age=30),
+        _candidate(5, "team/service", 150, age=1),
+    ]
+
+    order = [c.id for c in scheduler.order(candidates, now)]
+
+    assert order[:2] == [2, 5]
+    assert order[2:] == [4, 3, 1]
+
+
+def test_served_repository_yields_to_others():
+    from final_project.src.review.scheduler import FairScheduler
+
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    scheduler = FairScheduler(weights={}, aging_rate=0)
+    first = _candidate(1, "a/repo", 100)
+    scheduler.charge(first, now)
+
+    order = scheduler.order([_candidate(2, "a/repo", 100), _candidate(3, "b/repo", 100)], now)
+
+    assert [c.id for c in order] == [3, 2]
+    assert scheduler.stats()["median_wait"] == 0.0
+
+
+def test_weights_give_a_repository_a_larger_share():
+    from final_project.src.review.scheduler import FairScheduler
+
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    scheduler = FairScheduler(weights={"vip/repo": 3.0}, aging_rate=0)
+    candidates = [_candidate(i, "vip/repo", 100) for i in range(1, 5)]
+    candidates += [_candidate(i, "other/repo", 100) for i in range(5, 9)]
+
+    first_five = [c.repository for c in scheduler.order(candidates, now)[:5]]
+
+    assert first_five.count("vip/repo") == 4
+
+
+def test_aging_prevents_starving_a_large_job():
+    from final_project.src.review.scheduler import FairScheduler
+
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    scheduler = FairScheduler(weights={}, aging_rate=10)
+    fresh = _candidate(1, "a/repo", 10)
+
+    assert scheduler.order([_candidate(2, "a/repo", 5000, age=60), fresh], now)[0].id == 1
+    assert scheduler.order([_candidate(2, "a/repo", 5000, age=600), fresh], now)[0].id == 2
+
+
+@pytest.mark.asyncio
+async def test_queue_claims_in_scheduler_order(temp_database):
+    from final_project.src.review import queue as queue_module
+    from final_project.src.review.scheduler import FairScheduler
+
+    temp_database(queue_module)
+
+    queue = queue_module.ReviewQueue(scheduler=FairScheduler(weights={}, aging_rate=0))
+    for repository, additions in [("bot/mono", 3000), ("bot/mono", 2000), ("bot/mono", 10), ("team/app", 50)]:
+        await queue.enqueue("pull_request", repository, {"pull_request": {
+            "additions": additions, "deletions": 0, "changed_files": 1
+        }})
+
+    claimed = []
+    while (job := await queue.claim("worker")) is not None:
+        claimed.append(job.id)
+
+    assert claimed == [3, 4, 2, 1]
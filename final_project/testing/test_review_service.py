@@ -12,7 +12,46 @@ def review_service():
 
 @pytest.fixture
 def mock_db_session():
-    return AsyncMock()
+    session = AsyncMock()
+    session.add = MagicMock()
+    result = MagicMock()
+    result.scalars.return_value.first.return_value = None
+    session.execute.return_value = result
+    return session
+
+
+def _snapshot(head_commit="new-head"):
+    from final_project.src.github.client import PullRequestData
+
+    return PullRequestData(
+        pr_id=7,
+        repository="owner/repo",
+        title="Test PR",
+        author="dev",
+        diff_url="",
+        base_commit="base",
+        head_commit=head_commit,
+        files_changed=[{"filename": "a.py"}, {"filename": "b.py"}],
+        diff_text="full diff"
+    )
+
+
+def _previous_review(mock_db_session, head_commit="old-head"):
+    from final_project.src.database import Review
+
+    previous = Review(
+        pr_id=7,
+        repository="owner/repo",
+        head_commit=head_commit,
+        summary="Looks fine",
+        review_text="Earlier comment",
+        critical_issues=1,
+        suggestions=2,
+        status="completed",
+    )
+    result = MagicMock()
+    result.scalars.return_value.first.return_value = previous
+    mock_db_session.execute.return_value = result
 
 
 @pytest.mark.asyncio
@@ -52,6 +91,66 @@ async def test_review_pull_request_success(review_service, mock_db_session):
     review_service.github_client.add_comment_to_pr.assert_called_once()
 
 
+@pytest.mark.asyncio
+async def test_review_pull_request_uses_webhook_payload(review_service, mock_db_session):
+    mock_pr_data = MagicMock()
+    mock_pr_data.diff_text = "test diff"
+    mock_pr_data.title = "Test PR"
+    mock_pr_data.files_changed = []
+
+    review_service.github_client.get_pull_request_from_payload.return_value = mock_pr_data
+    review_service.ai_client.analyze_code_diff.return_value = {
+        "success": True, "summary": "Test", "critical_issues": [], "suggestions": []
+    }
+    review_service.ai_client.generate_comment_text.return_value = "Comment"
+    review_service.github_client.add_comment_to_pr.return_value = True
+
+    payload = {"number": 123, "title": "Test PR"}
+    result = await review_service.review_pull_request(
+        repository="owner/repo",
+        pr_number=123,
+        db_session=mock_db_session,
+        pr_payload=payload
+    )
+
+    assert result.success is True
+    review_service.github_client.get_pull_request_from_payload.assert_called_once_with(
+        "owner/repo", payload
+    )
+    review_service.github_client.get_pull_request.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_review_snapshot(review_service, mock_db_session):
+    from final_project.src.github.client import PullRequestData
+
+    pr_data = PullRequestData(
+        pr_id=7,
+        repository="owner/repo",
+        title="Test PR",
+        author="dev",
+        diff_url="",
+        base_commit="base",
+        head_commit="head",
+        files_changed=[],
+        diff_text="test diff"
+    )
+    review_service.ai_client.analyze_code_diff.return_value = {
+        "success": True, "summary": "Test", "critical_issues": [], "suggestions": []
+    }
+    review_service.ai_client.generate_comment_text.return_value = "Comment"
+    review_service.github_client.add_comment_to_pr.return_value = True
+
+    result = await review_service.review_snapshot(pr_data, mock_db_session)
+
+    assert result.success is True
+    assert result.pr_id == 7
+    review_service.github_client.get_pull_request.assert_not_called()
+    review_service.github_client.add_comment_to_pr.assert_called_once_with(
+        "owner/repo", 7, "Comment"
+    )
+
+
 @pytest.mark.asyncio
 async def test_review_pull_request_ai_failure(review_service, mock_db_session):
     mock_pr_data = MagicMock()
@@ -113,4 +212,115 @@ async def test_review_pull_request_exception(review_service, mock_db_session):
 
         assert result.success is False
         assert "Error: Test error" in result.summary
-        mock_logger.error.assert_called_once()
\ No newline at end of file
+        mock_logger.error.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_review_snapshot_stores_review(review_service, mock_db_session):
+    review_service.ai_client.analyze_code_diff.return_value = {
+        "success": True, "summary": "Stored", "critical_issues": [], "suggestions": [{}]
+    }
+    review_service.ai_client.generate_comment_text.return_value = "Comment"
+    review_service.github_client.add_comment_to_pr.return_value = True
+
+    await review_service.review_snapshot(_snapshot(), mock_db_session)
+
+    stored = mock_db_session.add.call_args[0][0]
+    assert stored.repository == "owner/repo"
+    assert stored.head_commit == "new-head"
+    assert stored.summary == "Stored"
+    assert stored.suggestions == 1
+    assert stored.status == "completed"
+    mock_db_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_summary_only_review_is_not_an_incremental_base(review_service, mock_db_session):
+    review_service.ai_client.analyze_code_diff.return_value = {
+        "success": True, "summary": "Short", "critical_issues": [], "suggestions": [],
+        "summary_only": True
+    }
+    review_service.ai_client.generate_comment_text.return_value = "Comment"
+    review_service.github_client.add_comment_to_pr.return_value = True
+
+    await review_service.review_snapshot(_snapshot(), mock_db_session, summary_only=True)
+
+    assert mock_db_session.add.call_args[0][0].status == "completed_summary"
+
+
+@pytest.mark.asyncio
+async def test_incremental_review_sends_only_compare_diff(review_service, mock_db_session):
+    from final_project.src.github.diff import DiffDownload, DiffSegment
+
+    _previous_review(mock_db_session)
+    review_service.github_client.get_compare_diff.return_value = DiffDownload(
+        segments=[DiffSegment("b.py", "diff --git a/b.py b/b.py\n+x\n")]
+    )
+    review_service.ai_client.analyze_code_diff.return_value = {
+        "success": True, "summary": "Delta", "critical_issues": [], "suggestions": []
+    }
+    review_service.ai_client.generate_comment_text.return_value = "Update"
+    review_service.github_client.add_comment_to_pr.return_value = True
+
+    result = await review_service.review_snapshot(
+        _snapshot(), mock_db_session, incremental=True
+    )
+
+    assert result.success is True
+    review_service.github_client.get_compare_diff.assert_awaited_once_with(
+        "owner/repo", "old-head", "new-head"
+    )
+    kwargs = review_service.ai_client.analyze_code_diff.call_args.kwargs
+    assert kwargs["diff_text"] == "diff --git a/b.py b/b.py\n+x\n"
+    assert kwargs["files_changed"] == [{"filename": "b.py"}]
+    assert "Looks fine" in kwargs["previous_review"]
+    analysis = review_service.ai_client.generate_comment_text.call_args[0][0]
+    assert analysis.incremental == {"base": "old-head", "head": "new-head"}
+
+
+@pytest.mark.asyncio
+async def test_already_reviewed_head_is_not_commented_again(review_service, mock_db_session):
+    _previous_review(mock_db_session, head_commit="new-head")
+
+    result = await review_service.review_snapshot(_snapshot(), mock_db_session)
+
+    assert result.success is True
+    assert result.review_text == "Earlier comment"
+    assert result.critical_issues_count == 1
+    review_service.ai_client.analyze_code_diff.assert_not_called()
+    review_service.github_client.add_comment_to_pr.assert_not_called()
+    mock_db_session.add.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_incremental_review_falls_back_to_full_review(review_service, mock_db_session):
+    review_service.ai_client.analyze_code_diff.return_value = {
+        "success": True, "summary": "Full", "critical_issues": [], "suggestions": []
+    }
+    review_service.ai_client.generate_comment_text.return_value = "Comment"
+    review_service.github_client.add_comment_to_pr.return_value = True
+
+    await review_service.review_snapshot(_snapshot(), mock_db_session, incremental=True)
+
+    review_service.github_client.get_compare_diff.assert_not_called()
+    kwargs = review_service.ai_client.analyze_code_diff.call_args.kwargs
+    assert kwargs["diff_text"] == "full diff"
+    assert "previous_review" not in kwargs
+
+
+@pytest.mark.asyncio
+async def test_incremental_review_falls_back_when_compare_fails(review_service, mock_db_session):
+    _previous_review(mock_db_session)
+    review_service.github_client.get_compare_diff.side_effect = Exception("404")
+    review_service.ai_client.analyze_code_diff.return_value = {
+        "success": True, "summary": "Full", "critical_issues": [], "suggestions": []
+    }
+    review_service.ai_client.generate_comment_text.return_value = "Comment"
+    review_service.github_client.add_comment_to_pr.return_value = True
+
+    result = await review_service.review_snapshot(
+        _snapshot(), mock_db_session, incremental=True
+    )
+
+    assert result.success is True
+    assert review_service.ai_client.analyze_code_diff.call_args.kwargs["diff_text"] == "full diff"
@@ -0,0 +1,120 @@
+import httpx
+import pytest
+from unittest.mock import patch
+
+
+@pytest.fixture
+def router():
+    from final_project.src.ai.routing import ModelRoute, ModelRouter
+
+    return ModelRouter(
+        routes=[
+            ModelRoute(name="docs", model="fast", max_tokens=500, extensions=[".md", ".rst"]),
+            ModelRoute(name="small", model="fast", max_tokens=1000, max_diff_tokens=500, max_files=3,
+                       input_cost_per_1k=0.1, output_cost_per_1k=0.2),
+        ],
+        default=ModelRoute(name="default", model="strong", max_tokens=4000),
+    )
+
+
+def test_select_uses_first_matching_route(router):
+    assert router.select(50_000, ["README.md", "docs/guide.rst"]).name == "docs"
+    assert router.select(200, ["a.py", "b.py"]).name == "small"
+    assert router.select(200, ["a.py", "b.py", "c.py", "d.py"]).name == "default"
+    assert router.select(5_000, ["a.py"]).name == "default"
+
+
+def test_record_tracks_latency_and_cost_per_route(router):
+    small = router.routes[1]
+    router.record(small, 1.0, input_tokens=2000, output_tokens=500)
+    router.record(small, 3.0, input_tokens=1000, output_tokens=500)
+    router.record(small, 9.0, success=False)
+
+    stats = router.stats()
+
+    assert stats["small"]["calls"] == 3
+    assert stats["small"]["failures"] == 1
+    assert stats["small"]["avg_latency"] == 2.0
+    assert stats["small"]["cost"] == pytest.approx(0.5)
+    assert stats["default"]["calls"] == 0
+
+
+def test_from_settings_skips_invalid_routes():
+    from final_project.src.ai.routing import ModelRouter
+
+    with patch("final_project.src.ai.routing.settings") as mock_settings:
+        mock_settings.ai_model = "strong"
+        mock_settings.ai_max_tokens = 4000
+        mock_settings.ai_input_cost_per_1k = 0.0
+        mock_settings.ai_output_cost_per_1k = 0.0
+        mock_settings.ai_routes = [
+            {"name": "small", "max_diff_tokens": 100, "max_tokens": 800},
+            {"name": "broken", "unknown_option": 1},
+        ]
+        router = ModelRouter.from_settings()
+
+    assert [route.name for route in router.routes] == ["small"]
+    assert router.routes[0].model == "strong"
+    assert router.default.max_tokens == 4000
+
+
+@pytest.mark.asyncio
+async def test_ai_client_sends_route_model_budget_and_endpoint():
+    import json
+    from final_project.src.ai.cache import ReviewCache
+    from final_project.src.ai.client import AIClient
+    from final_project.src.ai.limiter import AdaptiveLimiter
+    from final_project.src.ai.routing import ModelRoute, ModelRouter
+
+    requests = []
+
+    async def handler(request):
+        requests.append((request.url.host, json.loads(request.content)))
+        content = json.dumps({
+            "success": True, "summary": "ok", "critical_issues": [], "suggestions": [],
+        })
+        return httpx.Response(200, json={
+            "id": "x", "object": "chat.completion", "created": 0, "model": "fast",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                         "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 300, "completion_tokens": 40, "total_tokens": 340},
+        })
+
+    router = ModelRouter(
+        routes=[ModelRoute(name="small", model="fast", max_tokens=800, max_diff_tokens=100,
+                           prompt="prompt_template_small.txt", base_url="http://fast.test/v1")],
+        default=ModelRoute(name="default", model="strong", max_tokens=4000),
+        summary=ModelRoute(name="summary", model="strong", max_tokens=600,
+                           prompt="prompt_template_summary.txt"),
+    )
+    client = AIClient(
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        cache=ReviewCache(max_entries=16, ttl=60, persist=False),
+        file_cache=ReviewCache(max_entries=16, ttl=60, persist=False),
+        limiter=AdaptiveLimiter(),
+        router=router,
+    )
+
+    result = await client.analyze_code_diff(
+        "diff --git a/a.py b/a.py\n@@ -1 +1 @@\n+x = 1\n", "Typo", "owner/repo", []
+    )
+
+    assert result.success is True
+    host, body = requests[0]
+    assert host == "fast.test"
+    assert body["model"] == "fast"
+    assert body["max_tokens"] == 800
+    assert body["messages"][-1]["content"].startswith("Review this small Pull Request diff.")
+    assert router.stats()["small"]["input_tokens"] == 300
+    assert router.stats()["small"]["output_tokens"] == 40
+
+    summary = await client.analyze_code_diff(
+        "diff --git a/b.py b/b.py\n@@ -1 +1 @@\n+y = 2\n", "Typo", "owner/repo", [],
+        summary_only=True
+    )
+
+    assert summary.summary_only is True
+    host, body = requests[1]
+    assert body["model"] == "strong"
+    assert body["messages"][-1]["content"].startswith("Summarize this Pull Request")
+    assert "summary-only review" in await client.generate_comment_text(summary)
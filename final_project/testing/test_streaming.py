@@ -0,0 +1,85 @@
+import json
+
+
+REVIEW = {
+    "success": True,
+    "summary": "Escaped \"quotes\", braces {} and brackets ]",
+    "overall_quality_score": 72,
+    "critical_issues": [
+        {"file": "a.py", "line": 3, "issue": "Unclosed } in string", "severity": "high"},
+    ],
+    "suggestions": [
+        {"file": "b.py", "line": 1, "suggestion": "Nested", "meta": {"tags": ["x"]}},
+        {"file": "c.py", "line": 9, "suggestion": "Rename"},
+    ],
+}
+
+
+def test_parser_emits_findings_regardless_of_split_points():
+    from final_project.src.ai.streaming import FindingsStreamParser
+
+    text = "```json\n" + json.dumps(REVIEW, indent=2) + "\n```"
+    for size in (1, 2, 7, len(text)):
+        parser = FindingsStreamParser()
+        emitted = []
+        for start in range(0, len(text), size):
+            emitted.extend(parser.feed(text[start:start + size]))
+
+        assert [name for name, _ in emitted] == ["critical_issues", "suggestions", "suggestions"]
+        assert parser.closed is True
+        assert parser.result() == REVIEW
+
+
+def test_parser_returns_finding_once_its_object_closes():
+    from final_project.src.ai.streaming import FindingsStreamParser
+
+    parser = FindingsStreamParser()
+
+    assert parser.feed('{"summary": "ok", "critical_issues": [{"file": "a.py"') == []
+    assert parser.fields == {"summary": "ok"}
+    assert parser.feed('}, {"fi') == [("critical_issues", {"file": "a.py"})]
+    assert parser.lists_done(1) is False
+    parser.feed('le": "b.py"}], "suggestions": []')
+    assert parser.lists_done(5) is True
+    assert parser.closed is False
+
+
+def test_parser_buffers_only_the_open_value():
+    from final_project.src.ai.streaming import FindingsStreamParser
+
+    suggestions = [{"file": "a.py", "line": i, "suggestion": "x" * 50} for i in range(200)]
+    text = json.dumps({"summary": "ok", "suggestions": suggestions})
+    parser = FindingsStreamParser()
+    longest = 0
+    for start in range(0, len(text), 16):
+        parser.feed(text[start:start + 16])
+        longest = max(longest, len(parser._buffer))
+
+    assert len(parser.findings["suggestions"]) == 200
+    assert longest < 200
+    assert parser.text == text
+
+
+def test_salvage_review_keeps_complete_findings():
+    from final_project.src.ai.streaming import salvage_review
+
+    text = (
+        '{"summary": "ok", "critical_issues": [{"file": "a.py", "line": 1}, '
+        '{"file": broken}], "suggestions": [{"file": "b.py", "li'
+    )
+
+    data = salvage_review(text)
+
+    assert data["summary"] == "ok"
+    assert data["critical_issues"] == [{"file": "a.py", "line": 1}]
+    assert data["suggestions"] == []
+    assert data["partial"] is True
+
+
+def test_salvage_review_of_fenced_complete_json_is_not_partial():
+    from final_project.src.ai.streaming import salvage_review
+
+    data = salvage_review("```json\n" + json.dumps(REVIEW) + "\n```")
+
+    assert data["partial"] is False
+    assert salvage_review("no json here") is None
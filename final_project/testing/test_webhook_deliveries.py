@@ -0,0 +1,37 @@
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_delivery_log_expires_and_evicts():
+    from final_project.src.github.deliveries import DeliveryLog
+
+    log = DeliveryLog(ttl=60, max_entries=2, persist=False)
+
+    assert await log.claim("a")
+    assert not await log.claim("a")
+    assert await log.claim("b")
+    assert await log.claim("c")
+    assert await log.claim("a")
+
+    log.ttl = -1
+    assert await log.claim("c")
+    assert log.stats() == {
+        "entries": 2, "deliveries": 6, "duplicates": 1, "duplicate_rate": 0.167
+    }
+
+
+@pytest.mark.asyncio
+async def test_delivery_log_persists_to_database(temp_database):
+    from final_project.src.github import deliveries
+
+    temp_database(deliveries)
+
+    first = deliveries.DeliveryLog(ttl=60, max_entries=10, persist=True)
+    assert await first.claim("a", "push")
+    assert await first.claim("b", "push")
+
+    second = deliveries.DeliveryLog(ttl=60, max_entries=10, persist=True)
+    assert not await second.claim("a", "push")
+    await second.forget("b")
+    assert await second.claim("b", "push")
+    assert second.stats()["duplicates"] == 1